@@ -141,6 +141,7 @@ DEFAULT_SETTINGS = {
     "warmup_peer_min_delay_minutes": {"value": 5, "type": "integer", "description": "Minimum delay between peer emails (minutes)"},
     "warmup_peer_max_delay_minutes": {"value": 30, "type": "integer", "description": "Maximum delay between peer emails (minutes)"},
     "warmup_peer_max_emails_per_pair": {"value": 3, "type": "integer", "description": "Max warmup emails per mailbox pair per cycle"},
+    "warmup_peer_max_concurrency": {"value": 8, "type": "integer", "description": "Max mailboxes sending peer warmup emails at once"},
     "warmup_ai_provider": {"value": "groq", "type": "string", "description": "AI provider for warmup content generation"},
     "warmup_ai_temperature": {"value": 0.8, "type": "float", "description": "AI content generation temperature"},
     "warmup_content_max_length": {"value": 200, "type": "integer", "description": "Max word length for AI warmup content"},
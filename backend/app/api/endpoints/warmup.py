@@ -1,12 +1,11 @@
 """Warmup Engine API endpoints - Enterprise Edition."""
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from datetime import datetime, timedelta
 import json
-import io
 
 from app.api.deps import get_db, require_role
 from app.db.models.user import User, UserRole
@@ -39,7 +38,7 @@ from app.services.warmup.dns_checker import run_dns_health_check
 from app.services.warmup.blacklist_monitor import run_blacklist_check as run_bl_check
 from app.services.warmup.inbox_placement import run_placement_test
 from app.services.warmup.auto_recovery import start_recovery
-from app.services.warmup.report_exporter import export_csv, export_json
+from app.services.warmup.report_exporter import iter_csv, iter_json
 from app.services.warmup.scheduler import get_scheduler_status
 
 router = APIRouter(prefix="/warmup", tags=["Warmup Engine"])
@@ -880,22 +879,28 @@ async def export_report(
             raise HTTPException(status_code=400, detail="Invalid mailbox_ids format")
 
     if format == "csv":
-        csv_data = export_csv(parsed_ids, days, db)
-        stream = io.StringIO(csv_data)
         return StreamingResponse(
-            iter([stream.getvalue()]),
+            _stream_and_close(iter_csv(parsed_ids, days, db), db),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=warmup_report.csv"},
         )
     else:
-        json_data = export_json(parsed_ids, days, db)
         return StreamingResponse(
-            iter([json_data]),
+            _stream_and_close(iter_json(parsed_ids, days, db), db),
             media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=warmup_report.json"},
         )
 
 
+def _stream_and_close(chunks: Iterator[str], db: Session) -> Iterator[str]:
+    # get_db's cleanup runs before a streamed body is sent, so the export
+    # reopens the session and closes it again once the last chunk is out
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+
 # ---------------------------------------------------------------------------
 # 27. GET /scheduler/status
 # ---------------------------------------------------------------------------
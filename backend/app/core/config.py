@@ -72,6 +72,9 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_SEND_CONCURRENCY: int = 8  # Parallel SMTP sessions per outreach run
+    SMTP_POOL_SIZE_PER_MAILBOX: int = 3  # Max open SMTP sessions per sender mailbox
+    SMTP_MAX_MESSAGES_PER_CONN: int = 100  # Recycle a session after this many messages
 
     # Business Rules
     DAILY_SEND_LIMIT: int = 30
@@ -0,0 +1,59 @@
+"""
+Database migration to add composite indexes backing the pipeline hot paths.
+
+New databases get these indexes from the model __table_args__ via create_all;
+this script adds them to existing databases. It is idempotent and works on
+both SQLite and MySQL (each index is created with checkfirst).
+
+Run this script to migrate the database:
+    python -m app.db.migrations.add_performance_indexes
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import inspect
+
+from app.db.base import engine
+from app.db.models.contact import ContactDetails
+from app.db.models.email_validation import EmailValidationResult
+from app.db.models.outreach import OutreachEvent
+from app.db.models.suppression import SuppressionList
+
+# (model, index name) pairs; index definitions live on the models
+INDEXES = [
+    (OutreachEvent, "idx_outreach_cooldown"),
+    (OutreachEvent, "idx_outreach_daily_sent"),
+    (SuppressionList, "idx_suppression_email_expiry"),
+    (EmailValidationResult, "idx_validation_email_latest"),
+    (ContactDetails, "idx_contact_validation"),
+]
+
+
+def migrate():
+    """Create any missing performance indexes."""
+    inspector = inspect(engine)
+
+    for model, index_name in INDEXES:
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            print(f"Table '{table.name}' does not exist yet - index will be created on startup.")
+            continue
+
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        if index_name in existing:
+            print(f"Index '{index_name}' already exists on {table.name}.")
+            continue
+
+        index = next(ix for ix in table.indexes if ix.name == index_name)
+        print(f"Creating index '{index_name}' on {table.name}...")
+        index.create(bind=engine, checkfirst=True)
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,59 @@
+"""
+Database migration to convert contact_details.last_outreach_date from an ISO
+string column to a DATETIME column.
+
+MySQL gets an in-place column type change. SQLite has no ALTER COLUMN, but its
+DATETIME affinity accepts text, so existing 'YYYY-MM-DDTHH:MM:SS' values are
+rewritten to the 'YYYY-MM-DD HH:MM:SS' form SQLAlchemy stores, which keeps
+range comparisons on the column consistent.
+
+Run this script to migrate the database:
+    python -m app.db.migrations.convert_last_outreach_date
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import inspect, text
+from app.db.base import SessionLocal, engine
+
+
+def migrate():
+    """Convert last_outreach_date to a DATETIME column."""
+    if not inspect(engine).has_table("contact_details"):
+        print("Table 'contact_details' does not exist, nothing to migrate.")
+        return
+
+    db = SessionLocal()
+
+    try:
+        print("Normalizing contact_details.last_outreach_date values...")
+        result = db.execute(text("""
+            UPDATE contact_details
+            SET last_outreach_date = REPLACE(last_outreach_date, 'T', ' ')
+            WHERE last_outreach_date LIKE '%T%'
+        """))
+        print(f"Normalized {result.rowcount} last_outreach_date values.")
+
+        if engine.dialect.name == "mysql":
+            print("Converting contact_details.last_outreach_date to DATETIME...")
+            db.execute(text("""
+                ALTER TABLE contact_details MODIFY last_outreach_date DATETIME NULL
+            """))
+        db.commit()
+
+        print("Migration complete: last_outreach_date is now a DATETIME column.")
+
+    except Exception as e:
+        print(f"Migration error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,70 @@
+"""
+Database migration to lowercase stored emails in suppression_list and
+email_validation_results.
+
+The models now lowercase emails on write and the outreach pipelines look
+them up by lowercased value, so existing mixed-case rows must be
+normalized to keep matching (and to keep those lookups on the plain email
+indexes). Where a mixed-case suppression entry collides with an existing
+lowercase one, the duplicate is dropped to respect the unique constraint.
+
+Run this script to migrate the database:
+    python -m app.db.migrations.normalize_email_case
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import inspect, text
+from app.db.base import SessionLocal, engine
+
+
+def migrate():
+    """Lowercase emails in suppression_list and email_validation_results."""
+    inspector = inspect(engine)
+    db = SessionLocal()
+
+    try:
+        if inspector.has_table("suppression_list"):
+            # Keep one row per lowercased email (the lowest id wins)
+            result = db.execute(text("""
+                DELETE FROM suppression_list
+                WHERE suppression_id NOT IN (
+                    SELECT keep_id FROM (
+                        SELECT MIN(suppression_id) AS keep_id
+                        FROM suppression_list
+                        GROUP BY LOWER(email)
+                    ) AS keepers
+                )
+            """))
+            print(f"Removed {result.rowcount} case-duplicate suppression entries.")
+
+            result = db.execute(text("""
+                UPDATE suppression_list SET email = LOWER(email)
+                WHERE email <> LOWER(email)
+            """))
+            print(f"Normalized {result.rowcount} suppression emails.")
+
+        if inspector.has_table("email_validation_results"):
+            result = db.execute(text("""
+                UPDATE email_validation_results SET email = LOWER(email)
+                WHERE email <> LOWER(email)
+            """))
+            print(f"Normalized {result.rowcount} validation result emails.")
+
+        db.commit()
+        print("Migration complete.")
+
+    except Exception as e:
+        print(f"Migration error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
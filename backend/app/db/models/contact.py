@@ -1,5 +1,5 @@
 """Contact details model for discovered contacts."""
-from sqlalchemy import Column, Integer, String, Enum, Index, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, Index, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from app.db.base import Base
@@ -46,7 +46,7 @@ class ContactDetails(Base):
     validation_status = Column(String(50), nullable=True)  # Valid, Invalid, Catch-all, Unknown
 
     # Last outreach tracking for cooldown enforcement
-    last_outreach_date = Column(String(50), nullable=True)
+    last_outreach_date = Column(DateTime, nullable=True)
 
     # Relationship to lead
     lead = relationship("LeadDetails", back_populates="contacts")
@@ -56,6 +56,8 @@ class ContactDetails(Base):
         Index('idx_contact_client', 'client_name'),
         Index('idx_contact_email', 'email'),
         Index('idx_contact_priority', 'priority_level'),
+        # Serves the keyset-paged 'valid' candidate scan in the outreach pipelines
+        Index('idx_contact_validation', 'validation_status', 'contact_id'),
     )
 
     def __repr__(self) -> str:
@@ -2,6 +2,7 @@
 from datetime import datetime
 from enum import Enum as PyEnum
 from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index
+from sqlalchemy.orm import validates
 from app.db.base import Base
 
 
@@ -29,7 +30,14 @@ class EmailValidationResult(Base):
     __table_args__ = (
         Index('idx_validation_email', 'email'),
         Index('idx_validation_status', 'status'),
+        # Serves the latest-result-per-email lookup in build_eligibility_context
+        Index('idx_validation_email_latest', 'email', 'validated_at'),
     )
 
+    @validates("email")
+    def _normalize_email(self, key, email):
+        # Stored lowercased so plain equality lookups hit the email indexes
+        return email.lower() if email else email
+
     def __repr__(self) -> str:
         return f"<EmailValidationResult(validation_id={self.validation_id}, email='{self.email}', status='{self.status}')>"
@@ -52,6 +52,10 @@ class OutreachEvent(Base):
         Index('idx_outreach_lead', 'lead_id'),
         Index('idx_outreach_status', 'status'),
         Index('idx_outreach_sent_at', 'sent_at'),
+        # Covers the per-contact cooldown lookup in build_eligibility_context
+        Index('idx_outreach_cooldown', 'contact_id', 'status', 'sent_at'),
+        # Covers the daily sent-count range scan in run_outreach_send_pipeline
+        Index('idx_outreach_daily_sent', 'sent_at', 'status', 'channel'),
     )
 
     def __repr__(self) -> str:
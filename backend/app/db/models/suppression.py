@@ -1,6 +1,7 @@
 """Suppression list model for do-not-contact entries."""
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.orm import validates
 from app.db.base import Base
 
 
@@ -16,7 +17,14 @@ class SuppressionList(Base):
 
     __table_args__ = (
         Index('idx_suppression_email', 'email'),
+        # Covers the active-suppression lookup (email match + expiry check)
+        Index('idx_suppression_email_expiry', 'email', 'expires_at'),
     )
 
+    @validates("email")
+    def _normalize_email(self, key, email):
+        # Stored lowercased so plain equality lookups hit the email indexes
+        return email.lower() if email else email
+
     def __repr__(self) -> str:
         return f"<SuppressionList(suppression_id={self.suppression_id}, email='{self.email}')>"
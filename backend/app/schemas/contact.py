@@ -38,14 +38,14 @@ class ContactUpdate(BaseModel):
     source: Optional[str] = None
     priority_level: Optional[PriorityLevel] = None
     validation_status: Optional[str] = None
-    last_outreach_date: Optional[str] = None
+    last_outreach_date: Optional[datetime] = None
 
 
 class ContactResponse(ContactBase):
     """Schema for contact response."""
     contact_id: int
     validation_status: Optional[str] = None
-    last_outreach_date: Optional[str] = None
+    last_outreach_date: Optional[datetime] = None
     lead_ids: List[int] = []  # All associated lead IDs via junction table
     created_at: datetime
     updated_at: datetime
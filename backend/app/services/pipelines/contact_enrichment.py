@@ -28,7 +28,7 @@ def _get_db_setting(db, key, default=None):
             val = _json.loads(setting.value_json)
             return val
     except Exception as e:
-        logger.warning(f"Error reading setting {key}: {e}")
+        logger.warning("Error reading setting", key=key, error=str(e))
     return default
 
 
@@ -74,7 +74,7 @@ def get_contact_discovery_adapters(db=None):
     if not adapters:
         logger.error("No contact discovery adapters could be configured! Check API keys in Settings.")
 
-    logger.info(f"Contact discovery providers: {[a[0] for a in adapters]}")
+    logger.info("Contact discovery providers", providers=[a[0] for a in adapters])
     return adapters
 
 
@@ -118,7 +118,7 @@ def run_contact_enrichment_pipeline(
             LeadDetails.lead_status == LeadStatus.NEW
         ).limit(100).all()
 
-        logger.info(f"Found {len(leads)} leads to enrich")
+        logger.info("Found leads to enrich", count=len(leads))
 
         for lead in leads:
             try:
@@ -145,11 +145,11 @@ def run_contact_enrichment_pipeline(
                         for c in result:
                             c["source"] = c.get("source", adapter_name)
                         contacts.extend(result)
-                        logger.debug(f"Adapter {adapter_name} returned {len(result)} contacts for {lead.client_name}")
+                        logger.debug("Adapter returned contacts", adapter=adapter_name, count=len(result), client=lead.client_name)
                     except ApolloCreditsExhaustedError:
                         raise  # Propagate to stop pipeline early
                     except Exception as e:
-                        logger.error(f"Adapter {adapter_name} failed for {lead.client_name}: {e}")
+                        logger.error("Adapter failed", adapter=adapter_name, client=lead.client_name, error=str(e))
                         counters["errors"] += 1
 
                 # Deduplicate contacts by email
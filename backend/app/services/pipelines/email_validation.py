@@ -90,7 +90,7 @@ def run_email_validation_pipeline(
             db.commit()
             return counters
 
-        logger.info(f"Validating {len(emails)} emails")
+        logger.info("Validating emails", count=len(emails))
 
         # Clean and deduplicate
         clean_emails = list(set([e.lower().strip() for e in emails if e]))
@@ -100,7 +100,7 @@ def run_email_validation_pipeline(
             try:
                 # Check if already validated
                 existing = db.query(EmailValidationResult).filter(
-                    EmailValidationResult.email == email
+                    EmailValidationResult.email == email.lower()
                 ).first()
 
                 if existing:
@@ -3,10 +3,11 @@ import json
 import os
 import re
 import concurrent.futures
+from functools import lru_cache
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-import pandas as pd
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 import structlog
+from sqlalchemy import select
 
 from app.db.base import SessionLocal
 from app.db.models.lead import LeadDetails, LeadStatus
@@ -18,6 +19,19 @@ from app.services.adapters.job_sources.mock import MockJobSourceAdapter
 
 logger = structlog.get_logger()
 
+# Column headers for the Job_requirements XLSX export (order matches row tuples)
+LEAD_EXPORT_HEADERS = (
+    "Lead ID", "Company", "Job Title", "State", "Posting Date", "Job Link",
+    "Salary Min", "Salary Max", "Source", "First Name", "Last Name",
+    "Contact Title", "Contact Email", "Contact Phone", "Status",
+)
+
+# Rows per chunk when importing leads from a spreadsheet
+IMPORT_CHUNK_SIZE = 10_000
+
+# Upper bound on job sources fetched concurrently (each fetch is network-bound)
+MAX_SOURCE_FETCH_CONCURRENCY = 8
+
 
 # Company name normalization patterns
 # IMPACT ON LEAD COUNT: These suffixes are stripped during deduplication.
@@ -74,47 +88,60 @@ def get_db_setting(db, key: str, default=None):
             if value:  # Only return if not empty
                 return value
     except Exception as e:
-        logger.warning(f"Error reading setting {key} from DB: {e}")
+        logger.warning("Error reading setting from DB", key=key, error=str(e))
     return default
 
 
+@lru_cache(maxsize=None)
+def get_job_source_adapter(source_name: str, api_key: Optional[str] = None) -> Any:
+    """Get a job source adapter instance, memoized per (source, api_key).
+
+    Adapters are reused across pipeline runs; a changed API key in settings
+    yields a new cache key and therefore a fresh adapter.
+    """
+    if source_name == "jsearch":
+        from app.services.adapters.job_sources.jsearch import JSearchAdapter
+        return JSearchAdapter(api_key=api_key)
+    if source_name == "apollo":
+        from app.services.adapters.job_sources.apollo import ApolloJobSourceAdapter
+        return ApolloJobSourceAdapter(api_key=api_key)
+    return MockJobSourceAdapter()
+
+
 def get_all_job_source_adapters(db) -> List[Tuple[str, Any]]:
     """Get all configured job source adapters.
 
     Returns list of (source_name, adapter) tuples.
     """
-    from app.services.adapters.job_sources.jsearch import JSearchAdapter
-    from app.services.adapters.job_sources.apollo import ApolloJobSourceAdapter
-
     adapters = []
 
     # Get enabled sources from settings
     enabled_sources = get_db_setting(db, "lead_sources", ["jsearch"])
-    logger.info(f"Enabled lead sources: {enabled_sources}")
+    logger.info("Enabled lead sources", sources=enabled_sources)
 
     # JSearch adapter
     if "jsearch" in enabled_sources:
         jsearch_api_key = get_db_setting(db, "jsearch_api_key") or settings.JSEARCH_API_KEY
         if jsearch_api_key:
-            adapters.append(("jsearch", JSearchAdapter(api_key=jsearch_api_key)))
+            adapters.append(("jsearch", get_job_source_adapter("jsearch", jsearch_api_key)))
             logger.info("JSearch adapter configured")
 
     # Apollo adapter
     if "apollo" in enabled_sources:
         apollo_api_key = get_db_setting(db, "apollo_api_key")
         if apollo_api_key:
-            adapters.append(("apollo", ApolloJobSourceAdapter(api_key=apollo_api_key)))
+            adapters.append(("apollo", get_job_source_adapter("apollo", apollo_api_key)))
             logger.info("Apollo adapter configured")
 
     # Mock adapter (for development/testing)
     if "mock" in enabled_sources:
-        adapters.append(("mock", MockJobSourceAdapter()))
+        adapters.append(("mock", get_job_source_adapter("mock")))
         logger.info("Mock adapter configured (test data)")
 
     # Fallback to mock if no adapters configured
     if not adapters:
         logger.warning("No job source adapters configured, using mock adapter")
-        adapters.append(("mock", MockJobSourceAdapter()))
+        adapters.append(("mock", get_job_source_adapter("mock")))
 
     return adapters
 
@@ -142,11 +169,11 @@ def fetch_from_source(
             exclude_keywords=exclude_keywords,
             job_titles=target_job_titles
         )
-        logger.info(f"Source {source_name} returned {len(jobs)} jobs after adapter-level filtering")
+        logger.info("Source returned jobs after adapter-level filtering", source=source_name, count=len(jobs))
         return (source_name, jobs, None)
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"Error fetching from {source_name}", error=error_msg)
+        logger.error("Error fetching from source", source=source_name, error=error_msg)
         return (source_name, [], error_msg)
 
 
@@ -299,6 +326,10 @@ def run_lead_sourcing_pipeline(
     db.add(job_run)
     db.commit()
 
+    # Captured once so every job in this run sees the same "today"
+    today = date.today()
+    three_months_ago = today - timedelta(days=90)
+
     try:
         logger.info("Starting multi-source lead sourcing pipeline", requested_sources=sources)
 
@@ -309,16 +340,17 @@ def run_lead_sourcing_pipeline(
         target_job_titles = get_db_setting(db, "target_job_titles", settings.TARGET_JOB_TITLES)
         exclude_keywords = exclude_it_keywords + exclude_staffing_keywords
 
-        logger.info(f"Pipeline config: {len(target_industries)} industries, {len(exclude_keywords)} exclusions, {len(target_job_titles)} job titles")
+        logger.info("Pipeline config", industries=len(target_industries), exclusions=len(exclude_keywords), job_titles=len(target_job_titles))
 
         # Get all configured adapters
         adapters = get_all_job_source_adapters(db)
-        logger.info(f"Using {len(adapters)} job source adapters")
+        logger.info("Using job source adapters", count=len(adapters))
 
         all_jobs = []
 
-        # Fetch from all sources in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        # Fetch from all sources in parallel (one worker per source, bounded)
+        max_workers = max(1, min(len(adapters), MAX_SOURCE_FETCH_CONCURRENCY))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = []
             for source_name, adapter in adapters:
                 future = executor.submit(
@@ -339,18 +371,18 @@ def run_lead_sourcing_pipeline(
 
                 if error:
                     counters["errors"] += 1
-                    logger.error(f"Source {source_name} failed", error=error)
+                    logger.error("Source failed", source=source_name, error=error)
                 else:
-                    logger.info(f"Fetched {len(jobs)} jobs from {source_name}")
+                    logger.info("Fetched jobs", source=source_name, count=len(jobs))
                     all_jobs.extend(jobs)
 
-        logger.info(f"Total jobs fetched from all sources: {len(all_jobs)}")
+        logger.info("Total jobs fetched from all sources", count=len(all_jobs))
 
         # Deduplicate jobs (both within batch and against DB)
         unique_jobs = deduplicate_jobs(all_jobs, db)
         counters["skipped"] = len(all_jobs) - len(unique_jobs)
 
-        logger.info(f"After deduplication: {len(unique_jobs)} unique jobs (skipped {counters['skipped']} duplicates)")
+        logger.info("After deduplication", unique=len(unique_jobs), skipped=counters['skipped'])
 
         # Process unique jobs
         for job_data in unique_jobs:
@@ -376,7 +408,7 @@ def run_lead_sourcing_pipeline(
                 counters["inserted"] += 1
 
                 # Upsert client_info with normalized name
-                upsert_client(db, job_data["client_name"])
+                upsert_client(db, job_data["client_name"], today, three_months_ago)
 
             except Exception as e:
                 logger.error("Error processing job", error=str(e), job=job_data.get("client_name"))
@@ -418,8 +450,21 @@ def run_lead_sourcing_pipeline(
         db.close()
 
 
-def upsert_client(db, client_name: str):
-    """Create or update client_info record with normalized matching."""
+def upsert_client(
+    db,
+    client_name: str,
+    today: Optional[date] = None,
+    three_months_ago: Optional[date] = None
+):
+    """Create or update client_info record with normalized matching.
+
+    Batch callers pass ``today``/``three_months_ago`` computed once per run.
+    """
+    if today is None:
+        today = date.today()
+    if three_months_ago is None:
+        three_months_ago = today - timedelta(days=90)
+
     try:
         # Try exact match first
         client = db.query(ClientInfo).filter(ClientInfo.client_name == client_name).first()
@@ -437,7 +482,7 @@ def upsert_client(db, client_name: str):
             client = ClientInfo(
                 client_name=client_name,
                 status=ClientStatus.ACTIVE,
-                start_date=date.today(),
+                start_date=today,
                 service_count=1,
                 client_category=ClientCategory.PROSPECT
             )
@@ -447,8 +492,6 @@ def upsert_client(db, client_name: str):
             client.service_count = (client.service_count or 0) + 1
 
             # Compute client category based on posting frequency
-            three_months_ago = date.today() - timedelta(days=90)
-
             # Count unique dates using normalized company name matching
             normalized = normalize_company_name(client_name)
             all_leads = db.query(LeadDetails).filter(
@@ -470,7 +513,7 @@ def upsert_client(db, client_name: str):
 
     except Exception as e:
         db.rollback()
-        logger.warning(f"Error upserting client {client_name}: {e}")
+        logger.warning("Error upserting client", client=client_name, error=str(e))
         # Try to just find existing
         client = db.query(ClientInfo).filter(ClientInfo.client_name == client_name).first()
         if client:
@@ -478,95 +521,186 @@ def upsert_client(db, client_name: str):
 
 
 def export_leads_to_xlsx(db, filepath: Optional[str] = None):
-    """Export leads to XLSX file."""
+    """Export leads to XLSX file.
+
+    Plain column rows (no ORM objects) are streamed from the query straight
+    into a write-only workbook, so neither the result set nor the sheet is
+    held in memory as a whole.
+    """
     if not filepath:
         os.makedirs(settings.EXPORT_PATH, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filepath = os.path.join(settings.EXPORT_PATH, f"Job_requirements_{timestamp}.xlsx")
 
-    leads = db.query(LeadDetails).order_by(LeadDetails.created_at.desc()).limit(5000).all()  # IMPACT: Increased from 1000
-
-    data = []
-    for lead in leads:
-        data.append({
-            "Lead ID": lead.lead_id,
-            "Company": lead.client_name,
-            "Job Title": lead.job_title,
-            "State": lead.state,
-            "Posting Date": lead.posting_date.isoformat() if lead.posting_date else None,
-            "Job Link": lead.job_link,
-            "Salary Min": float(lead.salary_min) if lead.salary_min else None,
-            "Salary Max": float(lead.salary_max) if lead.salary_max else None,
-            "Source": lead.source,
-            "First Name": lead.first_name,
-            "Last Name": lead.last_name,
-            "Contact Title": lead.contact_title,
-            "Contact Email": lead.contact_email,
-            "Contact Phone": lead.contact_phone,
-            "Status": lead.lead_status.value if lead.lead_status else None
-        })
-
-    df = pd.DataFrame(data)
-    df.to_excel(filepath, index=False)
-    logger.info(f"Exported {len(data)} leads to {filepath}")
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Leads")
+    ws.append(LEAD_EXPORT_HEADERS)
+
+    stmt = select(
+        LeadDetails.lead_id,
+        LeadDetails.client_name,
+        LeadDetails.job_title,
+        LeadDetails.state,
+        LeadDetails.posting_date,
+        LeadDetails.job_link,
+        LeadDetails.salary_min,
+        LeadDetails.salary_max,
+        LeadDetails.source,
+        LeadDetails.first_name,
+        LeadDetails.last_name,
+        LeadDetails.contact_title,
+        LeadDetails.contact_email,
+        LeadDetails.contact_phone,
+        LeadDetails.lead_status,
+    ).order_by(LeadDetails.created_at.desc()).limit(5000)  # IMPACT: Increased from 1000
+
+    exported = 0
+    for (lead_id, client_name, job_title, state, posting_date, job_link, salary_min, salary_max,
+         source, first_name, last_name, contact_title, contact_email, contact_phone,
+         lead_status) in db.execute(stmt.execution_options(yield_per=500)):
+        ws.append((
+            lead_id,
+            client_name,
+            job_title,
+            state,
+            posting_date.isoformat() if posting_date else None,
+            job_link,
+            float(salary_min) if salary_min else None,
+            float(salary_max) if salary_max else None,
+            source,
+            first_name,
+            last_name,
+            contact_title,
+            contact_email,
+            contact_phone,
+            lead_status.value if lead_status else None,
+        ))
+        exported += 1
+
+    wb.save(filepath)
+    logger.info("Exported leads", count=exported, filepath=filepath)
 
     return filepath
 
 
-def import_leads_from_file(
-    filepath: str,
-    triggered_by: str = "system"
-) -> Dict[str, Any]:
-    """Import leads from XLSX file."""
-    db = SessionLocal()
-    counters = {"inserted": 0, "updated": 0, "skipped": 0, "errors": 0}
+def _iter_import_rows(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Yield spreadsheet rows as header->value dicts without loading the whole file.
 
-    try:
+    .xlsx files are read with openpyxl in read-only mode; legacy .xls files
+    (not supported by openpyxl) fall back to pandas.
+    """
+    if filepath.lower().endswith(".xls"):
+        import pandas as pd
         df = pd.read_excel(filepath)
-        logger.info(f"Reading {len(df)} rows from {filepath}")
+        header = [str(c) for c in df.columns]
+        for values in df.itertuples(index=False, name=None):
+            yield {k: (None if pd.isna(v) else v) for k, v in zip(header, values)}
+        return
 
-        for _, row in df.iterrows():
-            try:
-                client_name = str(row.get("Company", row.get("client_name", "")))
-                job_title = str(row.get("Job Title", row.get("job_title", "")))
+    from openpyxl import load_workbook
 
-                if not client_name or not job_title:
-                    counters["skipped"] += 1
-                    continue
+    wb = load_workbook(filepath, read_only=True)
+    try:
+        rows_iter = wb.active.iter_rows(values_only=True)
+        header = next(rows_iter, None)
+        if not header:
+            return
+        header = [str(h) if h is not None else "" for h in header]
+        for values in rows_iter:
+            yield dict(zip(header, values))
+    finally:
+        wb.close()
 
-                # Check for existing using normalized name
-                normalized = normalize_company_name(client_name)
-                existing_leads = db.query(LeadDetails).filter(
-                    LeadDetails.job_title == job_title
-                ).all()
 
-                found_match = False
-                for existing in existing_leads:
-                    if normalize_company_name(existing.client_name or "") == normalized:
-                        found_match = True
-                        break
+def _import_row_value(row: Dict[str, Any], *keys: str) -> Optional[str]:
+    """Return the first non-empty cell among the given header names, as a string."""
+    for key in keys:
+        value = row.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
 
-                if found_match:
-                    counters["skipped"] += 1
-                    continue
 
-                lead = LeadDetails(
-                    client_name=client_name,
-                    job_title=job_title,
-                    state=str(row.get("State", row.get("state", ""))) if pd.notna(row.get("State", row.get("state"))) else None,
-                    source="file_import",
-                    lead_status=LeadStatus.OPEN
-                )
-                db.add(lead)
-                counters["inserted"] += 1
+def _flush_import_batch(db, batch: List[Dict[str, Any]], counters: Dict[str, Any]):
+    """Dedupe and insert one chunk of imported rows, then commit once.
 
-                upsert_client(db, client_name)
+    Earlier chunks are already committed, so the existing-lead query also
+    covers them; ``seen`` only ever holds this chunk's keys.
+    """
+    today = date.today()
+    three_months_ago = today - timedelta(days=90)
+    job_titles = {_import_row_value(row, "Job Title", "job_title") for row in batch}
+    job_titles.discard(None)
+    seen = set()
+
+    # One query for all titles in the chunk instead of one per row
+    if job_titles:
+        for client_name, job_title in db.query(LeadDetails.client_name, LeadDetails.job_title).filter(
+            LeadDetails.job_title.in_(job_titles)
+        ):
+            seen.add((normalize_company_name(client_name or ""), job_title))
+
+    for row in batch:
+        try:
+            client_name = _import_row_value(row, "Company", "client_name")
+            job_title = _import_row_value(row, "Job Title", "job_title")
+
+            if not client_name or not job_title:
+                counters["skipped"] += 1
+                continue
 
-            except Exception as e:
-                logger.error("Error importing row", error=str(e))
-                counters["errors"] += 1
+            # Check for existing using normalized name
+            key = (normalize_company_name(client_name), job_title)
+            if key in seen:
+                counters["skipped"] += 1
+                continue
+            seen.add(key)
+
+            lead = LeadDetails(
+                client_name=client_name,
+                job_title=job_title,
+                state=_import_row_value(row, "State", "state"),
+                source="file_import",
+                lead_status=LeadStatus.OPEN
+            )
+            db.add(lead)
+            counters["inserted"] += 1
+
+            upsert_client(db, client_name, today, three_months_ago)
+
+        except Exception as e:
+            logger.error("Error importing row", error=str(e))
+            counters["errors"] += 1
+
+    db.commit()
+
+
+def import_leads_from_file(
+    filepath: str,
+    triggered_by: str = "system"
+) -> Dict[str, Any]:
+    """Import leads from XLSX file.
+
+    Rows are streamed and processed in chunks of IMPORT_CHUNK_SIZE so memory
+    stays bounded regardless of file size; each chunk is committed once.
+    """
+    db = SessionLocal()
+    counters = {"inserted": 0, "updated": 0, "skipped": 0, "errors": 0}
+
+    try:
+        logger.info("Reading rows", filepath=filepath)
+
+        batch = []
+        for row in _iter_import_rows(filepath):
+            batch.append(row)
+            if len(batch) >= IMPORT_CHUNK_SIZE:
+                _flush_import_batch(db, batch, counters)
+                batch.clear()
+        if batch:
+            _flush_import_batch(db, batch, counters)
 
-        db.commit()
         return counters
 
     except Exception as e:
@@ -1,14 +1,18 @@
 """Outreach pipeline service."""
+import concurrent.futures
+import csv
+import heapq
 import json
 import os
-import smtplib
 import uuid
 from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, List
-import pandas as pd
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set
 import structlog
+from jinja2 import Template
+from sqlalchemy import exists, func, insert, select, union, update
+from sqlalchemy.orm import load_only
 
 from app.db.base import SessionLocal
 from app.db.models.lead import LeadDetails, LeadStatus
@@ -20,21 +24,57 @@ from app.db.models.suppression import SuppressionList
 from app.db.models.job_run import JobRun, JobStatus
 from app.core.config import settings
 from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.services.smtp_pool import SmtpSessionPool
 
 logger = structlog.get_logger()
 
+# Enum members / status sets used on the per-contact eligibility path
+_SENT = OutreachStatus.SENT
+_VALID = ValidationStatus.VALID
+_VALID_CONTACT_STATUSES = frozenset({"valid", "Valid"})
+
+# Column headers for the mailmerge contacts CSV (also the Word merge field names)
+MAILMERGE_CSV_HEADERS = ("First Name", "Last Name", "Email", "Title", "Company", "State")
+
+# Outreach message templates, compiled once at import. Fields are inserted
+# unescaped, exactly as the f-strings these replace did.
+_UNSUBSCRIBE_FOOTER_HTML = '<hr><small>To unsubscribe, reply with "UNSUBSCRIBE"</small>'
+
+_SEND_BODY_HTML_TPL = Template(
+    "<p>Dear {{ first_name }},</p>"
+    "<p>We noticed your company is hiring and wanted to reach out about our staffing solutions.</p>"
+    "{{ signature_html }}" + _UNSUBSCRIBE_FOOTER_HTML
+)
+_SEND_SUBJECT_TPL = Template("Exciting Opportunity at {{ company }}")
+_SEND_BODY_TEXT_TPL = Template("Dear {{ first_name }},\nWe noticed your company is hiring...")
+
+_LEAD_BODY_HTML_TPL = Template(
+    "<p>Dear {{ first_name }},</p>"
+    "<p>We noticed {{ company }} is hiring for {{ job_title }} and wanted to reach out about our staffing solutions.</p>"
+    "{{ signature_html }}" + _UNSUBSCRIBE_FOOTER_HTML
+)
+_LEAD_SUBJECT_TPL = Template("Staffing for {{ job_title }} at {{ company }}")
+_LEAD_BODY_TEXT_TPL = Template("Dear {{ first_name }},\nWe noticed {{ company }} is hiring for {{ job_title }}...")
+
 
 def send_outreach_email(
     sender_mailbox: SenderMailbox,
     to_email: str,
     subject: str,
     body_html: str,
-    body_text: str
+    body_text: str,
+    smtp_pool: Optional[SmtpSessionPool] = None
 ) -> Dict[str, Any]:
     """Send an outreach email using the sender mailbox's own SMTP credentials.
 
-    Follows the same proven pattern as warmup peer emails.
+    Follows the same proven pattern as warmup peer emails. With ``smtp_pool``
+    the message goes over a reused session; otherwise a one-off connection
+    is opened and closed.
     """
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         msg = MIMEMultipart("alternative")
         msg["From"] = f"{sender_mailbox.display_name or sender_mailbox.email} <{sender_mailbox.email}>"
@@ -46,12 +86,15 @@ def send_outreach_email(
             msg.attach(MIMEText(body_text, "plain"))
         msg.attach(MIMEText(body_html, "html"))
 
-        smtp_host = sender_mailbox.smtp_host or "smtp.office365.com"
-        server = smtplib.SMTP(smtp_host, sender_mailbox.smtp_port or 587, timeout=30)
-        server.starttls()
-        server.login(sender_mailbox.email, sender_mailbox.password)
-        server.sendmail(sender_mailbox.email, to_email, msg.as_string())
-        server.quit()
+        if smtp_pool is not None:
+            smtp_pool.sendmail(sender_mailbox, to_email, msg.as_string())
+        else:
+            smtp_host = sender_mailbox.smtp_host or "smtp.office365.com"
+            server = smtplib.SMTP(smtp_host, sender_mailbox.smtp_port or 587, timeout=30)
+            server.starttls()
+            server.login(sender_mailbox.email, sender_mailbox.password)
+            server.sendmail(sender_mailbox.email, to_email, msg.as_string())
+            server.quit()
 
         return {"success": True, "message_id": msg["Message-ID"], "error": None}
     except Exception as e:
@@ -59,10 +102,19 @@ def send_outreach_email(
         return {"success": False, "message_id": None, "error": str(e)}
 
 
+_SIGNATURE_WRAPPER_OPEN = (
+    '<div style="margin-top:20px;padding-top:12px;border-top:1px solid #cccccc;font-family:Arial,sans-serif;">'
+)
+_SIGNATURE_WRAPPER_CLOSE = '</div>'
 
 
+@lru_cache(maxsize=64)
 def render_signature_html(sig_json: str) -> str:
-    """Render structured signature JSON to clean HTML block."""
+    """Render structured signature JSON to clean HTML block.
+
+    Cached on the raw JSON string, since the same mailbox signature is
+    rendered for every message that mailbox sends.
+    """
     try:
         sig = json.loads(sig_json)
     except (json.JSONDecodeError, TypeError):
@@ -93,68 +145,417 @@ def render_signature_html(sig_json: str) -> str:
     if not parts:
         return ''
 
-    lines_html = '<br>'.join(parts)
-    return (
-        '<div style="margin-top:20px;padding-top:12px;border-top:1px solid #cccccc;font-family:Arial,sans-serif;">'
-        + lines_html
-        + '</div>'
-    )
+    return ''.join((_SIGNATURE_WRAPPER_OPEN, '<br>'.join(parts), _SIGNATURE_WRAPPER_CLOSE))
+
+
+# Keeps IN (...) lists comfortably under driver bind-parameter limits
+ELIGIBILITY_QUERY_CHUNK_SIZE = 1000
+
+
+def _chunked(values: List[Any], size: int = ELIGIBILITY_QUERY_CHUNK_SIZE):
+    """Yield successive slices of ``values`` of at most ``size`` items."""
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class QueuedSends:
+    """Sends queued by the current run, per lead and per company (for contacts without a lead).
+
+    Outreach events are only written at the end of a run, so the SENT
+    counts an EligibilityContext loads cannot see them; check_send_eligibility
+    adds these on top so the per-lead cap also holds within a run.
+    """
+
+    def __init__(self):
+        self.by_lead: Dict[int, int] = {}
+        self.by_company: Dict[str, int] = {}
+
+    def add(self, contact: ContactDetails, delta: int = 1) -> None:
+        """Count a queued send to ``contact``, or give one back with ``delta=-1``."""
+        if contact.lead_id:
+            self.by_lead[contact.lead_id] = self.by_lead.get(contact.lead_id, 0) + delta
+        else:
+            self.by_company[contact.client_name] = self.by_company.get(contact.client_name, 0) + delta
+
+
+@dataclass
+class EligibilityContext:
+    """Send-eligibility facts for a batch of contacts, fetched up front."""
+    suppressed: Dict[str, str] = field(default_factory=dict)
+    valid_emails: Set[str] = field(default_factory=set)
+    last_sent_by_contact: Dict[int, datetime] = field(default_factory=dict)
+    sent_count_by_lead: Dict[int, int] = field(default_factory=dict)
+    sent_count_by_company: Dict[str, int] = field(default_factory=dict)
+    max_per_lead: int = 0
+    queued: QueuedSends = field(default_factory=QueuedSends)
+
+
+def build_eligibility_context(
+    db,
+    contacts: List[ContactDetails],
+    cooldown_cutoff: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+    prefiltered: bool = False,
+    queued: Optional[QueuedSends] = None
+) -> EligibilityContext:
+    """
+    Fetch everything check_send_eligibility needs for ``contacts``.
+
+    Runs a fixed number of queries per chunk of contacts (suppression,
+    validation, cooldown, per-lead and per-company caps) instead of four
+    queries per contact. Pass ``prefiltered=True`` for contacts selected
+    with _send_candidate_criteria: the SELECT has already excluded
+    suppressed and cooling-down contacts, so those lookups are skipped.
+    Pass the run's ``queued`` sends to share them across contexts.
+    """
+    if now is None:
+        now = datetime.utcnow()
+    if cooldown_cutoff is None:
+        cooldown_cutoff = now - timedelta(days=settings.COOLDOWN_DAYS)
+
+    ctx = EligibilityContext(max_per_lead=settings.MAX_CONTACTS_PER_COMPANY_PER_JOB)
+    if queued is not None:
+        ctx.queued = queued
+
+    emails = [] if prefiltered else list({c.email.lower() for c in contacts})
+    unvalidated_emails = list({
+        c.email.lower() for c in contacts
+        if c.validation_status not in _VALID_CONTACT_STATUSES
+    })
+    contact_ids = [] if prefiltered else [c.contact_id for c in contacts]
+    lead_ids = list({c.lead_id for c in contacts if c.lead_id})
+    companies = list({c.client_name for c in contacts if not c.lead_id})
+
+    for chunk in _chunked(emails):
+        rows = db.query(SuppressionList.email, SuppressionList.reason).filter(
+            SuppressionList.email.in_(chunk),
+            (SuppressionList.expires_at.is_(None) | (SuppressionList.expires_at > now))
+        ).all()
+        for email, reason in rows:
+            ctx.suppressed.setdefault(email, reason)
+
+    # Latest validation result per email decides; rows come back in
+    # idx_validation_email_latest order so the first row per email wins
+    for chunk in _chunked(unvalidated_emails):
+        rows = db.query(EmailValidationResult.email, EmailValidationResult.status).filter(
+            EmailValidationResult.email.in_(chunk)
+        ).order_by(EmailValidationResult.email, EmailValidationResult.validated_at.desc()).all()
+        seen = set()
+        for email, status in rows:
+            if email in seen:
+                continue
+            seen.add(email)
+            if status is _VALID:
+                ctx.valid_emails.add(email)
+
+    for chunk in _chunked(contact_ids):
+        rows = db.query(OutreachEvent.contact_id, func.max(OutreachEvent.sent_at)).filter(
+            OutreachEvent.contact_id.in_(chunk),
+            OutreachEvent.sent_at >= cooldown_cutoff,
+            OutreachEvent.status == _SENT
+        ).group_by(OutreachEvent.contact_id).all()
+        ctx.last_sent_by_contact.update(rows)
+
+    for chunk in _chunked(lead_ids):
+        rows = db.query(ContactDetails.lead_id, func.count(OutreachEvent.event_id)).join(
+            ContactDetails, OutreachEvent.contact_id == ContactDetails.contact_id
+        ).filter(
+            ContactDetails.lead_id.in_(chunk),
+            OutreachEvent.status == _SENT
+        ).group_by(ContactDetails.lead_id).all()
+        ctx.sent_count_by_lead.update(rows)
+
+    # Fallback for legacy contacts without lead_id
+    for chunk in _chunked(companies):
+        rows = db.query(ContactDetails.client_name, func.count(OutreachEvent.event_id)).join(
+            ContactDetails, OutreachEvent.contact_id == ContactDetails.contact_id
+        ).filter(
+            ContactDetails.client_name.in_(chunk),
+            OutreachEvent.status == _SENT
+        ).group_by(ContactDetails.client_name).all()
+        ctx.sent_count_by_company.update(rows)
+
+    return ctx
+
+
+def _record_outreach(db, event_rows: List[Dict[str, Any]], contact_ids: List[int], when: datetime) -> None:
+    """Insert outreach events and stamp last_outreach_date, both in chunked bulk statements."""
+    for chunk in _chunked(event_rows):
+        db.execute(insert(OutreachEvent), chunk)
+    for chunk in _chunked(contact_ids):
+        db.execute(
+            update(ContactDetails)
+            .where(ContactDetails.contact_id.in_(chunk))
+            .values(last_outreach_date=when)
+        )
+
+
+class MailboxRotation:
+    """Least-loaded selection over the sender mailboxes that can send right now.
+
+    Mailboxes (Cold Ready or Active, with a successful connection and quota
+    left) are loaded once and kept in a min-heap keyed by sends today plus
+    open reservations, so each send goes to the least loaded mailbox as the
+    old per-contact query did; each mailbox's signature is rendered once.
+    Counter changes are made on the ORM objects and flushed with the
+    caller's commit.
+    """
+
+    def __init__(self, db):
+        mailboxes = db.query(SenderMailbox).filter(
+            SenderMailbox.is_active == True,
+            SenderMailbox.warmup_status.in_([WarmupStatus.COLD_READY, WarmupStatus.ACTIVE]),
+            SenderMailbox.emails_sent_today < SenderMailbox.daily_send_limit,
+            SenderMailbox.connection_status == "successful"
+        ).all()
+        self._heap = [(mailbox.emails_sent_today, mailbox.mailbox_id, mailbox) for mailbox in mailboxes]
+        heapq.heapify(self._heap)
+        self._signatures: Dict[int, str] = {}
+        self._reserved: Dict[int, int] = {}
+
+    def _load(self, mailbox: SenderMailbox) -> int:
+        return mailbox.emails_sent_today + self._reserved.get(mailbox.mailbox_id, 0)
+
+    def next(self) -> Optional[SenderMailbox]:
+        """Reserve a send on the least loaded mailbox with quota left, or return None once all are used up.
+
+        Every reservation must be settled with record_send or release.
+        """
+        while self._heap:
+            load, mailbox_id, mailbox = heapq.heappop(self._heap)
+            if load != self._load(mailbox):
+                # Stale entry left behind by release(); a fresh one was pushed
+                continue
+            if load >= mailbox.daily_send_limit:
+                continue
+            self._reserved[mailbox_id] = self._reserved.get(mailbox_id, 0) + 1
+            heapq.heappush(self._heap, (load + 1, mailbox_id, mailbox))
+            return mailbox
+        return None
+
+    def release(self, mailbox: SenderMailbox) -> None:
+        """Give back a reservation that did not turn into a send."""
+        self._reserved[mailbox.mailbox_id] -= 1
+        heapq.heappush(self._heap, (self._load(mailbox), mailbox.mailbox_id, mailbox))
+
+    def signature_html(self, mailbox: SenderMailbox) -> str:
+        """Rendered signature for ``mailbox``, cached per mailbox."""
+        if mailbox.mailbox_id not in self._signatures:
+            self._signatures[mailbox.mailbox_id] = (
+                render_signature_html(mailbox.email_signature_json)
+                if mailbox.email_signature_json else ""
+            )
+        return self._signatures[mailbox.mailbox_id]
+
+    def record_send(self, mailbox: SenderMailbox, sent_at: datetime) -> None:
+        """Turn a reservation into a successful send counted against ``mailbox``."""
+        self._reserved[mailbox.mailbox_id] -= 1
+        mailbox.emails_sent_today += 1
+        mailbox.total_emails_sent += 1
+        mailbox.last_sent_at = sent_at
+
 
-def check_send_eligibility(db, contact: ContactDetails) -> tuple[bool, str]:
+def _deliver_messages(messages: List[Dict[str, Any]], smtp_pool: SmtpSessionPool) -> List[Any]:
+    """Send messages over SMTP, up to SMTP_SEND_CONCURRENCY at a time.
+
+    Returns each message's send result, or the exception it raised, in
+    message order. Workers only talk SMTP; all DB work stays with the caller.
+    """
+    def send(message: Dict[str, Any]) -> Any:
+        try:
+            return send_outreach_email(
+                sender_mailbox=message["mailbox"],
+                to_email=message["to_email"],
+                subject=message["subject"],
+                body_html=message["body_html"],
+                body_text=message["body_text"],
+                smtp_pool=smtp_pool
+            )
+        except Exception as e:
+            return e
+
+    max_workers = min(settings.SMTP_SEND_CONCURRENCY, len(messages))
+    if max_workers <= 1:
+        return [send(message) for message in messages]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(send, messages))
+
+
+class _SendBatch:
+    """Queues outreach messages, sends them in concurrent waves and collects the results.
+
+    Dry runs are recorded immediately as SKIPPED. Event rows and sent
+    contact ids are accumulated for a single bulk write by the caller.
+    Every queued message is counted in ``queued`` until its send fails.
+    """
+
+    def __init__(self, rotation: MailboxRotation, counters: Dict[str, Any], dry_run: bool,
+                 smtp_pool: SmtpSessionPool, queued: QueuedSends):
+        self.rotation = rotation
+        self.queued = queued
+        self.smtp_pool = smtp_pool
+        self.counters = counters
+        self.dry_run = dry_run
+        self.pending: List[Dict[str, Any]] = []
+        self.event_rows: List[Dict[str, Any]] = []
+        self.sent_contact_ids: List[int] = []
+
+    def add(self, contact: ContactDetails, mailbox: SenderMailbox, subject: str,
+            body_html: str, body_text: str, **event_fields) -> None:
+        """Queue a message on a mailbox reserved from the rotation."""
+        self.queued.add(contact)
+        message = {
+            "contact": contact,
+            "contact_id": contact.contact_id,
+            "to_email": contact.email,
+            "mailbox": mailbox,
+            "subject": subject,
+            "body_html": body_html,
+            "body_text": body_text,
+            "event_fields": event_fields
+        }
+        if self.dry_run:
+            logger.info("DRY RUN - Would send to", email=contact.email, via=mailbox.email)
+            self.rotation.release(mailbox)
+            self._record(message, OutreachStatus.SKIPPED, "dry_run")
+        else:
+            self.pending.append(message)
+
+    def flush(self) -> None:
+        """Send every queued message and record the outcomes."""
+        messages, self.pending = self.pending, []
+        results = _deliver_messages(messages, self.smtp_pool)
+        # One clock read per wave; its messages finish together
+        sent_at = datetime.utcnow()
+        for message, result in zip(messages, results):
+            mailbox = message["mailbox"]
+            if isinstance(result, Exception):
+                self.rotation.release(mailbox)
+                self.queued.add(message["contact"], -1)
+                logger.error("Error sending email", error=str(result), email=message["to_email"])
+                self.counters["errors"] += 1
+            elif result["success"]:
+                self.rotation.record_send(mailbox, sent_at)
+                self.counters["sent"] += 1
+                self._record(message, OutreachStatus.SENT, None)
+                self.sent_contact_ids.append(message["contact_id"])
+            else:
+                self.rotation.release(mailbox)
+                self.queued.add(message["contact"], -1)
+                self.counters["errors"] += 1
+                self._record(message, OutreachStatus.SKIPPED, result.get("error", "Unknown error"))
+
+    def _record(self, message: Dict[str, Any], status: OutreachStatus, skip_reason: Optional[str]) -> None:
+        self.event_rows.append({
+            "contact_id": message["contact_id"],
+            **message["event_fields"],
+            "channel": OutreachChannel.SMTP,
+            "subject": message["subject"],
+            "status": status,
+            "skip_reason": skip_reason,
+            "body_html": message["body_html"],
+            "body_text": message["body_text"]
+        })
+
+
+def check_send_eligibility(
+    contact: ContactDetails,
+    ctx: EligibilityContext
+) -> tuple[bool, str]:
     """
     Check if a contact is eligible for outreach.
 
+    Pure lookup against a context from build_eligibility_context, so every
+    contact in a run is judged against the same clock and snapshot.
+
     Returns (eligible, reason)
     """
     email = contact.email.lower()
+    lead_id = contact.lead_id
+    max_per_lead = ctx.max_per_lead
 
     # Check suppression list
-    suppressed = db.query(SuppressionList).filter(
-        SuppressionList.email == email,
-        (SuppressionList.expires_at.is_(None) | (SuppressionList.expires_at > datetime.utcnow()))
-    ).first()
-    if suppressed:
-        return False, f"Suppressed: {suppressed.reason}"
+    if email in ctx.suppressed:
+        return False, f"Suppressed: {ctx.suppressed[email]}"
 
     # Check validation status
-    if contact.validation_status not in ["valid", "Valid"]:
-        validation = db.query(EmailValidationResult).filter(
-            EmailValidationResult.email == email
-        ).order_by(EmailValidationResult.validated_at.desc()).first()
-
-        if not validation or validation.status != ValidationStatus.VALID:
-            return False, "Email not validated or invalid"
+    if contact.validation_status not in _VALID_CONTACT_STATUSES and email not in ctx.valid_emails:
+        return False, "Email not validated or invalid"
 
     # Check cooldown period for this specific contact
-    cooldown_date = datetime.utcnow() - timedelta(days=settings.COOLDOWN_DAYS)
-    recent_outreach = db.query(OutreachEvent).filter(
-        OutreachEvent.contact_id == contact.contact_id,
-        OutreachEvent.sent_at >= cooldown_date,
-        OutreachEvent.status == OutreachStatus.SENT
-    ).first()
-    if recent_outreach:
-        return False, f"Cooldown: sent on {recent_outreach.sent_at.date()}"
-
-    # Check per-lead contact limit (only contacts linked to the same lead)
-    if contact.lead_id:
-        lead_contacts_sent = db.query(OutreachEvent).join(ContactDetails).filter(
-            ContactDetails.lead_id == contact.lead_id,
-            OutreachEvent.status == OutreachStatus.SENT
-        ).count()
-        if lead_contacts_sent >= settings.MAX_CONTACTS_PER_COMPANY_PER_JOB:
-            return False, f"Max contacts per lead reached ({lead_contacts_sent}/{settings.MAX_CONTACTS_PER_COMPANY_PER_JOB})"
+    last_sent = ctx.last_sent_by_contact.get(contact.contact_id)
+    if last_sent is not None:
+        return False, f"Cooldown: sent on {last_sent.date()}"
+
+    # Check per-lead contact limit (only contacts linked to the same lead),
+    # counting sends already queued by this run
+    if lead_id:
+        lead_contacts_sent = ctx.sent_count_by_lead.get(lead_id, 0) + ctx.queued.by_lead.get(lead_id, 0)
+        if lead_contacts_sent >= max_per_lead:
+            return False, f"Max contacts per lead reached ({lead_contacts_sent}/{max_per_lead})"
     else:
-        # Fallback for legacy contacts without lead_id
-        company_contacts_sent = db.query(OutreachEvent).join(ContactDetails).filter(
-            ContactDetails.client_name == contact.client_name,
-            OutreachEvent.status == OutreachStatus.SENT
-        ).count()
-        if company_contacts_sent >= settings.MAX_CONTACTS_PER_COMPANY_PER_JOB:
+        company_sent = (
+            ctx.sent_count_by_company.get(contact.client_name, 0)
+            + ctx.queued.by_company.get(contact.client_name, 0)
+        )
+        if company_sent >= max_per_lead:
             return False, "Max contacts per company reached"
 
     return True, "Eligible"
 
 
+def _send_candidate_criteria(cooldown_cutoff: datetime, now: datetime) -> list:
+    """SQL filters for validated contacts that are neither suppressed nor cooling down.
+
+    Pushes the two cheapest eligibility rules into the SELECT as NOT EXISTS
+    anti-joins so rejected contacts never leave the database; per-lead and
+    per-company caps are still applied by check_send_eligibility.
+    """
+    suppressed = exists().where(
+        SuppressionList.email == func.lower(ContactDetails.email),
+        (SuppressionList.expires_at.is_(None) | (SuppressionList.expires_at > now))
+    )
+    cooling_down = exists().where(
+        OutreachEvent.contact_id == ContactDetails.contact_id,
+        OutreachEvent.status == _SENT,
+        OutreachEvent.sent_at >= cooldown_cutoff
+    )
+    return [
+        ContactDetails.validation_status == "valid",
+        ~suppressed,
+        ~cooling_down,
+    ]
+
+
+def _iter_valid_contact_pages(db, page_size: int, cooldown_cutoff: datetime, now: datetime):
+    """Yield send candidates in contact_id order, one LIMITed page at a time.
+
+    Uses keyset pagination so callers that break early never fetch the rest
+    of the table, while contacts filtered out client-side (caps) cannot
+    starve later ones.
+    """
+    criteria = _send_candidate_criteria(cooldown_cutoff, now)
+    last_id = 0
+    while True:
+        page = db.query(ContactDetails).filter(
+            *criteria,
+            ContactDetails.contact_id > last_id
+        ).order_by(ContactDetails.contact_id).limit(page_size).all()
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1].contact_id
+
+
+def _iter_checked_contacts(db, pages, cooldown_cutoff: datetime, now: datetime, queued: QueuedSends):
+    """Yield (contact, (eligible, reason)), building one eligibility context per page."""
+    for page in pages:
+        ctx = build_eligibility_context(db, page, cooldown_cutoff, now, prefiltered=True, queued=queued)
+        for contact in page:
+            yield contact, check_send_eligibility(contact, ctx)
+
+
 def run_outreach_mailmerge_pipeline(
     triggered_by: str = "system"
 ) -> Dict[str, Any]:
@@ -177,25 +578,66 @@ def run_outreach_mailmerge_pipeline(
     db.add(job_run)
     db.commit()
 
+    # Settings read once per run
+    cooldown_days = settings.COOLDOWN_DAYS
+    export_path = settings.EXPORT_PATH
+    company_address = getattr(settings, "company_address", None) or "Configure in settings"
+
+    # Clock captured once per run (UTC for DB comparisons, local for the export)
+    now = datetime.utcnow()
+    cooldown_cutoff = now - timedelta(days=cooldown_days)
+    local_now = datetime.now()
+    now_iso = local_now.isoformat()
+
     try:
         logger.info("Starting mailmerge export")
 
-        # Get validated contacts
-        contacts = db.query(ContactDetails).filter(
+        # Validated contacts already excluded in SQL (suppressed or cooling
+        # down) never reach the loop but still count as skipped
+        valid_total = db.query(func.count(ContactDetails.contact_id)).filter(
             ContactDetails.validation_status == "valid"
-        ).all()
-
-        eligible_contacts = []
-        for contact in contacts:
-            eligible, reason = check_send_eligibility(db, contact)
-            if eligible:
-                eligible_contacts.append(contact)
-                counters["eligible"] += 1
-            else:
-                counters["skipped"] += 1
-                logger.debug("Contact skipped", email=contact.email, reason=reason)
-
-        if not eligible_contacts:
+        ).scalar()
+        candidates = 0
+
+        timestamp = local_now.strftime("%Y%m%d_%H%M%S")
+        csv_path = os.path.join(export_path, f"mailmerge_contacts_{timestamp}.csv")
+
+        # Stream candidates page by page straight into the CSV, keeping only
+        # the exported ids; the file is created on the first eligible contact
+        contact_ids = []
+        queued = QueuedSends()
+        csv_file = None
+        try:
+            pages = _iter_valid_contact_pages(db, ELIGIBILITY_QUERY_CHUNK_SIZE, cooldown_cutoff, now)
+            for contact, (eligible, reason) in _iter_checked_contacts(db, pages, cooldown_cutoff, now, queued):
+                candidates += 1
+                if not eligible:
+                    counters["skipped"] += 1
+                    logger.debug("Contact skipped", email=contact.email, reason=reason)
+                    continue
+                if csv_file is None:
+                    os.makedirs(export_path, exist_ok=True)
+                    csv_file = open(csv_path, "w", newline="", encoding="utf-8")
+                    writer = csv.writer(csv_file)
+                    writer.writerow(MAILMERGE_CSV_HEADERS)
+                writer.writerow((
+                    contact.first_name,
+                    contact.last_name,
+                    contact.email,
+                    contact.title,
+                    contact.client_name,
+                    contact.location_state
+                ))
+                contact_ids.append(contact.contact_id)
+                queued.add(contact)
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+
+        counters["skipped"] += valid_total - candidates
+        counters["eligible"] = len(contact_ids)
+
+        if not contact_ids:
             logger.info("No eligible contacts for mailmerge")
             job_run.status = JobStatus.COMPLETED
             job_run.ended_at = datetime.utcnow()
@@ -203,34 +645,15 @@ def run_outreach_mailmerge_pipeline(
             db.commit()
             return counters
 
-        # Create export directory
-        os.makedirs(settings.EXPORT_PATH, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Export to CSV
-        data = []
-        for contact in eligible_contacts:
-            data.append({
-                "First Name": contact.first_name,
-                "Last Name": contact.last_name,
-                "Email": contact.email,
-                "Title": contact.title,
-                "Company": contact.client_name,
-                "State": contact.location_state
-            })
-
-        df = pd.DataFrame(data)
-        csv_path = os.path.join(settings.EXPORT_PATH, f"mailmerge_contacts_{timestamp}.csv")
-        df.to_csv(csv_path, index=False)
-        counters["exported"] = len(data)
+        counters["exported"] = len(contact_ids)
 
         # Create template guide
         guide_content = f"""
 MAIL MERGE GUIDE
 ================
 
-Generated: {datetime.now().isoformat()}
-Total Contacts: {len(data)}
+Generated: {now_iso}
+Total Contacts: {counters['exported']}
 
 MERGE FIELDS:
 - {{First Name}} - Contact first name
@@ -249,30 +672,26 @@ STEPS:
 
 COMPLIANCE NOTES:
 - Always include unsubscribe link
-- Include company mailing address: {settings.company_address if hasattr(settings, 'company_address') else 'Configure in settings'}
-- Do not send to same contact within {settings.COOLDOWN_DAYS} days
+- Include company mailing address: {company_address}
+- Do not send to same contact within {cooldown_days} days
 """
 
-        guide_path = os.path.join(settings.EXPORT_PATH, f"mailmerge_guide_{timestamp}.txt")
+        guide_path = os.path.join(export_path, f"mailmerge_guide_{timestamp}.txt")
         with open(guide_path, "w") as f:
             f.write(guide_content)
 
-        # Record outreach events
-        for contact in eligible_contacts:
-            event = OutreachEvent(
-                contact_id=contact.contact_id,
-                channel=OutreachChannel.MAILMERGE,
-                status=OutreachStatus.SENT,
-                skip_reason=None
-            )
-            db.add(event)
-
-            # Update contact last outreach date
-            contact.last_outreach_date = datetime.now().isoformat()
-
-        db.commit()
-
-        # Update job run
+        # Record outreach events and stamp contacts in bulk
+        _record_outreach(db, [
+            {
+                "contact_id": contact_id,
+                "channel": OutreachChannel.MAILMERGE,
+                "status": OutreachStatus.SENT,
+                "skip_reason": None
+            }
+            for contact_id in contact_ids
+        ], contact_ids, now)
+
+        # Complete the job run in the same transaction as the outreach writes
         job_run.status = JobStatus.COMPLETED
         job_run.ended_at = datetime.utcnow()
         job_run.counters_json = json.dumps(counters)
@@ -302,6 +721,7 @@ def run_outreach_send_pipeline(
     Send emails programmatically with rate limiting.
     """
     db = SessionLocal()
+    smtp_pool = SmtpSessionPool()
     counters = {"sent": 0, "skipped": 0, "errors": 0}
 
     # Create job run record
@@ -316,13 +736,21 @@ def run_outreach_send_pipeline(
     try:
         logger.info("Starting outreach send", dry_run=dry_run, limit=limit)
 
-        # Check daily limit
-        today = datetime.utcnow().date()
-        today_sent = db.query(OutreachEvent).filter(
-            OutreachEvent.sent_at >= datetime.combine(today, datetime.min.time()),
-            OutreachEvent.status == OutreachStatus.SENT,
-            OutreachEvent.channel != OutreachChannel.MAILMERGE
-        ).count()
+        # Clock captured once per run
+        now = datetime.utcnow()
+        today = now.date()
+        cooldown_cutoff = now - timedelta(days=settings.COOLDOWN_DAYS)
+
+        # Check daily limit (half-open range on sent_at, served by idx_outreach_daily_sent)
+        today_start = datetime.combine(today, datetime.min.time())
+        today_sent = db.execute(
+            select(func.count()).select_from(OutreachEvent).where(
+                OutreachEvent.sent_at >= today_start,
+                OutreachEvent.sent_at < today_start + timedelta(days=1),
+                OutreachEvent.status == _SENT,
+                OutreachEvent.channel != OutreachChannel.MAILMERGE
+            )
+        ).scalar_one()
 
         remaining_limit = min(limit, settings.DAILY_SEND_LIMIT - today_sent)
         if remaining_limit <= 0:
@@ -333,96 +761,47 @@ def run_outreach_send_pipeline(
             db.commit()
             return counters
 
-        # Get validated contacts not yet sent
-        contacts = db.query(ContactDetails).filter(
-            ContactDetails.validation_status == "valid"
-        ).all()
-
-        sent_count = 0
-        for contact in contacts:
-            if sent_count >= remaining_limit:
-                break
+        # Get send candidates page by page; the loop below stops pulling
+        # pages as soon as the remaining limit is reached
+        pages = _iter_valid_contact_pages(db, remaining_limit * 2, cooldown_cutoff, now)
 
-            eligible, reason = check_send_eligibility(db, contact)
+        rotation = MailboxRotation(db)
+        queued = QueuedSends()
+        batch = _SendBatch(rotation, counters, dry_run, smtp_pool, queued)
+        for contact, (eligible, reason) in _iter_checked_contacts(db, pages, cooldown_cutoff, now, queued):
             if not eligible:
                 counters["skipped"] += 1
                 continue
 
-            # Get sending mailbox (Cold Ready or Active, least loaded, with successful connection)
-            sending_mailbox = db.query(SenderMailbox).filter(
-                SenderMailbox.is_active == True,
-                SenderMailbox.warmup_status.in_([WarmupStatus.COLD_READY, WarmupStatus.ACTIVE]),
-                SenderMailbox.emails_sent_today < SenderMailbox.daily_send_limit,
-                SenderMailbox.connection_status == "successful"
-            ).order_by(SenderMailbox.emails_sent_today.asc()).first()
-
+            sending_mailbox = rotation.next()
             if not sending_mailbox:
                 logger.warning("No available sender mailbox with successful connection")
                 counters["skipped"] += 1
                 continue
 
-            signature_html = ""
-            if sending_mailbox.email_signature_json:
-                signature_html = render_signature_html(sending_mailbox.email_signature_json)
-
-            body_content = f"<p>Dear {contact.first_name},</p>"
-            body_content += "<p>We noticed your company is hiring and wanted to reach out about our staffing solutions.</p>"
-            body_content += signature_html
-            body_content += '<hr><small>To unsubscribe, reply with "UNSUBSCRIBE"</small>'
-
-            subject = f"Exciting Opportunity at {contact.client_name}"
-            body_text = f"Dear {contact.first_name},\nWe noticed your company is hiring..."
-
-            try:
-                if dry_run:
-                    logger.info("DRY RUN - Would send to", email=contact.email, via=sending_mailbox.email)
-                    send_status = OutreachStatus.SKIPPED
-                    skip_reason = "dry_run"
-                else:
-                    result = send_outreach_email(
-                        sender_mailbox=sending_mailbox,
-                        to_email=contact.email,
-                        subject=subject,
-                        body_html=body_content,
-                        body_text=body_text
-                    )
-
-                    if result["success"]:
-                        send_status = OutreachStatus.SENT
-                        skip_reason = None
-                        counters["sent"] += 1
-                        sent_count += 1
-                        # Update mailbox counters
-                        sending_mailbox.emails_sent_today += 1
-                        sending_mailbox.total_emails_sent += 1
-                        sending_mailbox.last_sent_at = datetime.utcnow()
-                    else:
-                        send_status = OutreachStatus.SKIPPED
-                        skip_reason = result.get("error", "Unknown error")
-                        counters["errors"] += 1
-
-                # Record event
-                event = OutreachEvent(
-                    contact_id=contact.contact_id,
-                    channel=OutreachChannel.SMTP,
-                    subject=subject,
-                    status=send_status,
-                    skip_reason=skip_reason,
-                    body_html=body_content,
-                    body_text=body_text
-                )
-                db.add(event)
-
-                if send_status == OutreachStatus.SENT:
-                    contact.last_outreach_date = datetime.now().isoformat()
-
-            except Exception as e:
-                logger.error("Error sending email", error=str(e), email=contact.email)
-                counters["errors"] += 1
+            signature_html = rotation.signature_html(sending_mailbox)
 
-        db.commit()
+            batch.add(
+                contact,
+                sending_mailbox,
+                subject=_SEND_SUBJECT_TPL.render(company=contact.client_name),
+                body_html=_SEND_BODY_HTML_TPL.render(first_name=contact.first_name, signature_html=signature_html),
+                body_text=_SEND_BODY_TEXT_TPL.render(first_name=contact.first_name)
+            )
+
+            # Send the queued wave once it could use up the remaining limit and
+            # stop right there, before another page is fetched; failed sends
+            # free their slots for later contacts
+            if counters["sent"] + len(batch.pending) >= remaining_limit:
+                batch.flush()
+                if counters["sent"] >= remaining_limit:
+                    break
+
+        batch.flush()
+        _record_outreach(db, batch.event_rows, batch.sent_contact_ids, now)
 
-        # Update job run
+        # Complete the job run in the same transaction as the events and
+        # mailbox counters
         job_run.status = JobStatus.COMPLETED
         job_run.ended_at = datetime.utcnow()
         job_run.counters_json = json.dumps(counters)
@@ -439,9 +818,21 @@ def run_outreach_send_pipeline(
         db.commit()
         raise
     finally:
+        smtp_pool.close()
         db.close()
 
 
+# Contact columns used by check_send_eligibility and the lead email
+_LEAD_CONTACT_COLUMNS = (
+    ContactDetails.contact_id,
+    ContactDetails.lead_id,
+    ContactDetails.client_name,
+    ContactDetails.first_name,
+    ContactDetails.email,
+    ContactDetails.validation_status,
+)
+
+
 def run_outreach_for_lead(
     lead_id: int,
     dry_run: bool = True,
@@ -451,110 +842,75 @@ def run_outreach_for_lead(
     Send outreach emails to contacts of a specific lead only.
     """
     db = SessionLocal()
+    smtp_pool = SmtpSessionPool()
     counters = {"sent": 0, "skipped": 0, "errors": 0, "lead_id": lead_id}
 
+    # Clock captured once per run
+    now = datetime.utcnow()
+    cooldown_cutoff = now - timedelta(days=settings.COOLDOWN_DAYS)
+
     try:
         logger.info("Starting outreach for lead", lead_id=lead_id, dry_run=dry_run)
 
-        lead = db.query(LeadDetails).filter(LeadDetails.lead_id == lead_id).first()
+        lead = db.query(LeadDetails).options(
+            load_only(LeadDetails.lead_id, LeadDetails.client_name, LeadDetails.job_title)
+        ).filter(LeadDetails.lead_id == lead_id).first()
         if not lead:
             return {"error": "Lead not found", "lead_id": lead_id}
 
-        # Get contacts via junction table + legacy FK
-        junction_cids = [row[0] for row in db.query(LeadContactAssociation.contact_id).filter(
-            LeadContactAssociation.lead_id == lead_id
-        ).all()]
-
-        if junction_cids:
-            contacts = db.query(ContactDetails).filter(
-                (ContactDetails.lead_id == lead_id) |
-                (ContactDetails.contact_id.in_(junction_cids))
-            ).all()
-        else:
-            contacts = db.query(ContactDetails).filter(
-                ContactDetails.lead_id == lead_id
-            ).all()
+        # Get contacts via legacy FK UNION junction table in one statement;
+        # the UNION runs over ids only, so each branch stays on its own index
+        # (idx_contact_lead / idx_lca_lead_id), and only the columns the
+        # eligibility check and message need are loaded
+        contact_ids = union(
+            select(ContactDetails.contact_id).where(ContactDetails.lead_id == lead_id),
+            select(LeadContactAssociation.contact_id).where(LeadContactAssociation.lead_id == lead_id)
+        )
+        contacts = db.query(ContactDetails).options(load_only(*_LEAD_CONTACT_COLUMNS)).filter(
+            ContactDetails.contact_id.in_(contact_ids)
+        ).order_by(ContactDetails.contact_id).all()
 
         if not contacts:
             return {"message": "No contacts found for this lead", **counters}
 
+        ctx = build_eligibility_context(db, contacts, cooldown_cutoff, now)
+        rotation = MailboxRotation(db)
+        batch = _SendBatch(rotation, counters, dry_run, smtp_pool, ctx.queued)
         for contact in contacts:
-            eligible, reason = check_send_eligibility(db, contact)
+            eligible, reason = check_send_eligibility(contact, ctx)
             if not eligible:
                 counters["skipped"] += 1
                 logger.debug("Contact skipped", email=contact.email, reason=reason)
                 continue
 
-            # Get sending mailbox (Cold Ready or Active, least loaded, with successful connection)
-            sending_mailbox = db.query(SenderMailbox).filter(
-                SenderMailbox.is_active == True,
-                SenderMailbox.warmup_status.in_([WarmupStatus.COLD_READY, WarmupStatus.ACTIVE]),
-                SenderMailbox.emails_sent_today < SenderMailbox.daily_send_limit,
-                SenderMailbox.connection_status == "successful"
-            ).order_by(SenderMailbox.emails_sent_today.asc()).first()
-
+            sending_mailbox = rotation.next()
             if not sending_mailbox:
                 logger.warning("No available sender mailbox with successful connection")
                 counters["skipped"] += 1
                 continue
 
-            signature_html = ""
-            if sending_mailbox.email_signature_json:
-                signature_html = render_signature_html(sending_mailbox.email_signature_json)
-
-            body_content = f"<p>Dear {contact.first_name},</p>"
-            body_content += f"<p>We noticed {lead.client_name} is hiring for {lead.job_title} and wanted to reach out about our staffing solutions.</p>"
-            body_content += signature_html
-            body_content += '<hr><small>To unsubscribe, reply with "UNSUBSCRIBE"</small>'
-
-            subject = f"Staffing for {lead.job_title} at {lead.client_name}"
-            body_text = f"Dear {contact.first_name},\nWe noticed {lead.client_name} is hiring for {lead.job_title}..."
-
-            try:
-                if dry_run:
-                    logger.info("DRY RUN - Would send to", email=contact.email, via=sending_mailbox.email)
-                    send_status = OutreachStatus.SKIPPED
-                    skip_reason = "dry_run"
-                else:
-                    result = send_outreach_email(
-                        sender_mailbox=sending_mailbox,
-                        to_email=contact.email,
-                        subject=subject,
-                        body_html=body_content,
-                        body_text=body_text
-                    )
-                    if result["success"]:
-                        send_status = OutreachStatus.SENT
-                        skip_reason = None
-                        counters["sent"] += 1
-                        # Update mailbox counters
-                        sending_mailbox.emails_sent_today += 1
-                        sending_mailbox.total_emails_sent += 1
-                        sending_mailbox.last_sent_at = datetime.utcnow()
-                    else:
-                        send_status = OutreachStatus.SKIPPED
-                        skip_reason = result.get("error", "Unknown error")
-                        counters["errors"] += 1
-
-                event = OutreachEvent(
-                    contact_id=contact.contact_id,
-                    lead_id=lead_id,
-                    channel=OutreachChannel.SMTP,
-                    subject=subject,
-                    status=send_status,
-                    skip_reason=skip_reason,
-                    body_html=body_content,
-                    body_text=body_text
-                )
-                db.add(event)
-
-                if send_status == OutreachStatus.SENT:
-                    contact.last_outreach_date = datetime.now().isoformat()
-
-            except Exception as e:
-                logger.error("Error sending to contact", error=str(e), email=contact.email)
-                counters["errors"] += 1
+            signature_html = rotation.signature_html(sending_mailbox)
+
+            batch.add(
+                contact,
+                sending_mailbox,
+                subject=_LEAD_SUBJECT_TPL.render(company=lead.client_name, job_title=lead.job_title),
+                body_html=_LEAD_BODY_HTML_TPL.render(
+                    first_name=contact.first_name,
+                    company=lead.client_name,
+                    job_title=lead.job_title,
+                    signature_html=signature_html
+                ),
+                body_text=_LEAD_BODY_TEXT_TPL.render(
+                    first_name=contact.first_name,
+                    company=lead.client_name,
+                    job_title=lead.job_title
+                ),
+                lead_id=lead_id
+            )
 
+        batch.flush()
+        _record_outreach(db, batch.event_rows, batch.sent_contact_ids, now)
         db.commit()
         logger.info("Lead outreach completed", counters=counters)
         return counters
@@ -563,4 +919,5 @@ def run_outreach_for_lead(
         logger.error("Lead outreach failed", error=str(e))
         raise
     finally:
+        smtp_pool.close()
         db.close()
@@ -1,13 +1,15 @@
 """Warmup Engine - Automated mailbox warmup management."""
 import json
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Callable, Optional, Dict, Any, List, Tuple
 import structlog
 
+from sqlalchemy.orm import load_only
+
 from app.db.base import SessionLocal
 from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
 from app.db.models.job_run import JobRun, JobStatus
-from app.db.models.settings import Settings
+from app.services.warmup import settings_cache
 
 logger = structlog.get_logger()
 
@@ -18,50 +20,65 @@ PHASE_NAMES = {
     4: "Full Ramp",
 }
 
-
-def _get_setting(db, key: str, default=None):
-    """Get a setting value from the database."""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            return setting.value_json
-    return default
+# Mailboxes are streamed from the database in batches of this size
+ASSESSMENT_BATCH_SIZE = 1000
+
+# SenderMailbox columns read by assess_mailbox and calculate_health_score
+_ASSESSMENT_COLUMNS = (
+    SenderMailbox.mailbox_id,
+    SenderMailbox.email,
+    SenderMailbox.warmup_status,
+    SenderMailbox.is_active,
+    SenderMailbox.daily_send_limit,
+    SenderMailbox.total_emails_sent,
+    SenderMailbox.bounce_count,
+    SenderMailbox.reply_count,
+    SenderMailbox.complaint_count,
+    SenderMailbox.created_at,
+    SenderMailbox.warmup_days_completed,
+    SenderMailbox.warmup_completed_at,
+)
+
+
+# Warmup config entries as name -> (type, default); each is stored in the
+# Settings table under "warmup_<name>"
+WARMUP_CONFIG_SCHEMA: Dict[str, Tuple[type, Any]] = {
+    "phase_1_days": (int, 7),
+    "phase_1_min_emails": (int, 2),
+    "phase_1_max_emails": (int, 5),
+    "phase_2_days": (int, 7),
+    "phase_2_min_emails": (int, 5),
+    "phase_2_max_emails": (int, 15),
+    "phase_3_days": (int, 7),
+    "phase_3_min_emails": (int, 15),
+    "phase_3_max_emails": (int, 25),
+    "phase_4_days": (int, 9),
+    "phase_4_min_emails": (int, 25),
+    "phase_4_max_emails": (int, 35),
+    "bounce_rate_good": (float, 2.0),
+    "bounce_rate_bad": (float, 5.0),
+    "reply_rate_good": (float, 10.0),
+    "complaint_rate_bad": (float, 0.1),
+    "weight_bounce_rate": (int, 35),
+    "weight_reply_rate": (int, 25),
+    "weight_complaint_rate": (int, 25),
+    "weight_age": (int, 15),
+    "auto_pause_bounce_rate": (float, 5.0),
+    "auto_pause_complaint_rate": (float, 0.3),
+    "min_emails_for_scoring": (int, 10),
+    "active_health_threshold": (int, 80),
+    "active_min_days": (int, 7),
+    "total_days": (int, 30),
+    "daily_increment": (float, 1.0),
+}
 
 
 def load_warmup_config(db) -> Dict[str, Any]:
     """Load all warmup settings from Settings table into a config dict."""
-    config = {
-        "phase_1_days": int(_get_setting(db, "warmup_phase_1_days", 7)),
-        "phase_1_min_emails": int(_get_setting(db, "warmup_phase_1_min_emails", 2)),
-        "phase_1_max_emails": int(_get_setting(db, "warmup_phase_1_max_emails", 5)),
-        "phase_2_days": int(_get_setting(db, "warmup_phase_2_days", 7)),
-        "phase_2_min_emails": int(_get_setting(db, "warmup_phase_2_min_emails", 5)),
-        "phase_2_max_emails": int(_get_setting(db, "warmup_phase_2_max_emails", 15)),
-        "phase_3_days": int(_get_setting(db, "warmup_phase_3_days", 7)),
-        "phase_3_min_emails": int(_get_setting(db, "warmup_phase_3_min_emails", 15)),
-        "phase_3_max_emails": int(_get_setting(db, "warmup_phase_3_max_emails", 25)),
-        "phase_4_days": int(_get_setting(db, "warmup_phase_4_days", 9)),
-        "phase_4_min_emails": int(_get_setting(db, "warmup_phase_4_min_emails", 25)),
-        "phase_4_max_emails": int(_get_setting(db, "warmup_phase_4_max_emails", 35)),
-        "bounce_rate_good": float(_get_setting(db, "warmup_bounce_rate_good", 2.0)),
-        "bounce_rate_bad": float(_get_setting(db, "warmup_bounce_rate_bad", 5.0)),
-        "reply_rate_good": float(_get_setting(db, "warmup_reply_rate_good", 10.0)),
-        "complaint_rate_bad": float(_get_setting(db, "warmup_complaint_rate_bad", 0.1)),
-        "weight_bounce_rate": int(_get_setting(db, "warmup_weight_bounce_rate", 35)),
-        "weight_reply_rate": int(_get_setting(db, "warmup_weight_reply_rate", 25)),
-        "weight_complaint_rate": int(_get_setting(db, "warmup_weight_complaint_rate", 25)),
-        "weight_age": int(_get_setting(db, "warmup_weight_age", 15)),
-        "auto_pause_bounce_rate": float(_get_setting(db, "warmup_auto_pause_bounce_rate", 5.0)),
-        "auto_pause_complaint_rate": float(_get_setting(db, "warmup_auto_pause_complaint_rate", 0.3)),
-        "min_emails_for_scoring": int(_get_setting(db, "warmup_min_emails_for_scoring", 10)),
-        "active_health_threshold": int(_get_setting(db, "warmup_active_health_threshold", 80)),
-        "active_min_days": int(_get_setting(db, "warmup_active_min_days", 7)),
-        "total_days": int(_get_setting(db, "warmup_total_days", 30)),
-        "daily_increment": float(_get_setting(db, "warmup_daily_increment", 1.0)),
+    return {
+        name: cast(settings_cache.get(db, f"warmup_{name}", default))
+        for name, (cast, default) in WARMUP_CONFIG_SCHEMA.items()
     }
-    return config
 
 
 def get_warmup_phase(day: int, config: Dict[str, Any]) -> Tuple[int, str]:
@@ -80,27 +97,44 @@ def get_warmup_phase(day: int, config: Dict[str, Any]) -> Tuple[int, str]:
         return 4, PHASE_NAMES[4]
 
 
-def get_daily_limit_for_day(day: int, config: Dict[str, Any]) -> int:
-    """Linear interpolation within phase to get daily email limit."""
-    phase, _ = get_warmup_phase(day, config)
+def make_limit_fn(config: Dict[str, Any]) -> Callable[[int], int]:
+    """Build a day -> daily limit function with the phase boundaries precomputed.
 
-    phase_days = config[f"phase_{phase}_days"]
-    min_emails = config[f"phase_{phase}_min_emails"]
-    max_emails = config[f"phase_{phase}_max_emails"]
-
-    # Calculate day within this phase
+    Use this when computing limits for many days or mailboxes under one config.
+    """
+    # (last day of phase, first day of phase - 1, phase days, min, max) per phase
+    phases = []
     phase_start = 0
-    for p in range(1, phase):
-        phase_start += config[f"phase_{p}_days"]
+    for p in range(1, 5):
+        phase_days = config[f"phase_{p}_days"]
+        phases.append((
+            phase_start + phase_days if p < 4 else float("inf"),
+            phase_start,
+            phase_days,
+            config[f"phase_{p}_min_emails"],
+            config[f"phase_{p}_max_emails"],
+        ))
+        phase_start += phase_days
+    phases = tuple(phases)
+
+    def limit_fn(day: int) -> int:
+        for phase_end, phase_start, phase_days, min_emails, max_emails in phases:
+            if day <= phase_end:
+                break
+        if phase_days <= 1:
+            return max_emails
+
+        # Linear interpolation
+        progress = (day - phase_start - 1) / (phase_days - 1)
+        limit = min_emails + progress * (max_emails - min_emails)
+        return max(1, round(limit))
+
+    return limit_fn
 
-    day_in_phase = day - phase_start
-    if phase_days <= 1:
-        return max_emails
 
-    # Linear interpolation
-    progress = (day_in_phase - 1) / (phase_days - 1)
-    limit = min_emails + progress * (max_emails - min_emails)
-    return max(1, round(limit))
+def get_daily_limit_for_day(day: int, config: Dict[str, Any]) -> int:
+    """Linear interpolation within phase to get daily email limit."""
+    return make_limit_fn(config)(day)
 
 
 def calculate_health_score(mailbox: SenderMailbox, config: Dict[str, Any]) -> Dict[str, float]:
@@ -176,8 +210,19 @@ def calculate_health_score(mailbox: SenderMailbox, config: Dict[str, Any]) -> Di
     }
 
 
-def assess_mailbox(mailbox: SenderMailbox, config: Dict[str, Any], db) -> Dict[str, Any]:
-    """Assess a single mailbox and apply status transitions."""
+def assess_mailbox(
+    mailbox: SenderMailbox,
+    config: Dict[str, Any],
+    db,
+    limit_fn: Optional[Callable[[int], int]] = None,
+) -> Dict[str, Any]:
+    """Assess a single mailbox and apply status transitions.
+
+    ``limit_fn`` is the result of ``make_limit_fn(config)``; pass it when
+    assessing many mailboxes so it is built only once.
+    """
+    if limit_fn is None:
+        limit_fn = make_limit_fn(config)
     result = {
         "mailbox_id": mailbox.mailbox_id,
         "email": mailbox.email,
@@ -188,12 +233,18 @@ def assess_mailbox(mailbox: SenderMailbox, config: Dict[str, Any], db) -> Dict[s
         "daily_limit": mailbox.daily_send_limit,
     }
 
-    health = calculate_health_score(mailbox, config)
-    result["health_score"] = health["health_score"]
     total_sent = mailbox.total_emails_sent or 0
+    current = mailbox.warmup_status
+    scored = total_sent >= config["min_emails_for_scoring"]
+
+    # The score only drives decisions once enough emails were sent, or for
+    # promotion out of COLD_READY; skip it for the rest (mostly new mailboxes)
+    if scored or current == WarmupStatus.COLD_READY:
+        health = calculate_health_score(mailbox, config)
+        result["health_score"] = health["health_score"]
 
     # Auto-pause check: only after minimum emails sent
-    if total_sent >= config["min_emails_for_scoring"]:
+    if scored:
         bounce_rate = health["bounce_rate"]
         complaint_rate = health["complaint_rate"]
 
@@ -210,14 +261,12 @@ def assess_mailbox(mailbox: SenderMailbox, config: Dict[str, Any], db) -> Dict[s
                 db.add(mailbox)
                 return result
 
-    current = mailbox.warmup_status
-
     if current == WarmupStatus.INACTIVE:
         if mailbox.is_active:
             mailbox.warmup_status = WarmupStatus.WARMING_UP
             mailbox.warmup_started_at = datetime.utcnow()
             mailbox.warmup_days_completed = 0
-            mailbox.daily_send_limit = get_daily_limit_for_day(1, config)
+            mailbox.daily_send_limit = limit_fn(1)
             result["new_status"] = "warming_up"
             result["action"] = "started_warmup"
             result["daily_limit"] = mailbox.daily_send_limit
@@ -232,7 +281,7 @@ def assess_mailbox(mailbox: SenderMailbox, config: Dict[str, Any], db) -> Dict[s
             result["new_status"] = "cold_ready"
             result["action"] = "warmup_completed"
         else:
-            new_limit = get_daily_limit_for_day(day, config)
+            new_limit = limit_fn(day)
             mailbox.daily_send_limit = new_limit
             mailbox.warmup_days_completed = day
             result["daily_limit"] = new_limit
@@ -246,7 +295,7 @@ def assess_mailbox(mailbox: SenderMailbox, config: Dict[str, Any], db) -> Dict[s
 
         if (days_since_ready >= config["active_min_days"] and
                 health["health_score"] >= config["active_health_threshold"] and
-                total_sent >= config["min_emails_for_scoring"]):
+                scored):
             mailbox.warmup_status = WarmupStatus.ACTIVE
             result["new_status"] = "active"
             result["action"] = "promoted_to_active"
@@ -274,17 +323,21 @@ def run_warmup_assessment(
         db.refresh(job)
 
         config = load_warmup_config(db)
+        limit_fn = make_limit_fn(config)
+        job_logger = logger.bind(job_id=job.run_id)
 
+        mailboxes = db.query(SenderMailbox).options(load_only(*_ASSESSMENT_COLUMNS))
         if mailbox_id:
-            mailboxes = db.query(SenderMailbox).filter(
+            mailboxes = mailboxes.filter(
                 SenderMailbox.mailbox_id == mailbox_id,
                 SenderMailbox.connection_status == "successful",
-            ).all()
+            )
         else:
-            mailboxes = db.query(SenderMailbox).filter(
+            mailboxes = mailboxes.filter(
                 SenderMailbox.is_active == True,
                 SenderMailbox.connection_status == "successful",
-            ).all()
+            )
+        mailboxes = mailboxes.yield_per(ASSESSMENT_BATCH_SIZE)
 
         counters = {
             "assessed": 0,
@@ -297,7 +350,7 @@ def run_warmup_assessment(
 
         for mb in mailboxes:
             try:
-                detail = assess_mailbox(mb, config, db)
+                detail = assess_mailbox(mb, config, db, limit_fn)
                 counters["assessed"] += 1
                 if detail["old_status"] != detail["new_status"]:
                     counters["status_changes"] += 1
@@ -308,12 +361,13 @@ def run_warmup_assessment(
                 details.append(detail)
             except Exception as e:
                 counters["errors"] += 1
+                error = str(e)
                 details.append({
                     "mailbox_id": mb.mailbox_id,
                     "email": mb.email,
-                    "action": f"error: {str(e)}",
+                    "action": "error: " + error,
                 })
-                logger.error("warmup_assess_error", mailbox_id=mb.mailbox_id, error=str(e))
+                job_logger.error("warmup_assess_error", mailbox_id=mb.mailbox_id, error=error)
 
         job.status = JobStatus.COMPLETED
         job.ended_at = datetime.utcnow()
@@ -361,9 +415,10 @@ def build_warmup_schedule(config: Dict[str, Any]) -> Dict[str, Any]:
         })
         day_offset += p_days
 
+    limit_fn = make_limit_fn(config)
     for day in range(1, total_days + 1):
         phase, phase_name = get_warmup_phase(day, config)
-        limit = get_daily_limit_for_day(day, config)
+        limit = limit_fn(day)
         schedule.append({
             "day": day,
             "phase": phase,
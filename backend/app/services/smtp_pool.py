@@ -0,0 +1,98 @@
+"""SMTP session pool shared by the outreach and warmup senders."""
+import smtplib
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.models.sender_mailbox import SenderMailbox
+
+
+class SmtpSessionPool:
+    """Authenticated SMTP sessions reused across one pipeline run.
+
+    Sessions are opened lazily per sender mailbox (connect, STARTTLS and
+    AUTH once) and handed back after each message, so a run pays one
+    handshake per session instead of one per email. Each mailbox has at
+    most SMTP_POOL_SIZE_PER_MAILBOX sessions open at a time, and a session
+    is quit and replaced after SMTP_MAX_MESSAGES_PER_CONN messages, since
+    providers drop long-lived sessions. Safe to share between the send
+    worker threads; call close() when the run ends.
+    """
+
+    def __init__(self, size_per_mailbox: Optional[int] = None, max_messages: Optional[int] = None):
+        self.size_per_mailbox = max(1, size_per_mailbox or settings.SMTP_POOL_SIZE_PER_MAILBOX)
+        self.max_messages = max(1, max_messages or settings.SMTP_MAX_MESSAGES_PER_CONN)
+        self._idle: Dict[str, List[List[Any]]] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, mailbox: SenderMailbox):
+        server = smtplib.SMTP(mailbox.smtp_host or "smtp.office365.com", mailbox.smtp_port or 587, timeout=30)
+        server.starttls()
+        server.login(mailbox.email, mailbox.password)
+        return server
+
+    def _slot(self, mailbox: SenderMailbox) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(mailbox.email)
+            if slot is None:
+                slot = self._slots[mailbox.email] = threading.BoundedSemaphore(self.size_per_mailbox)
+            return slot
+
+    def _acquire(self, mailbox: SenderMailbox) -> List[Any]:
+        with self._lock:
+            idle = self._idle.get(mailbox.email)
+            if idle:
+                return idle.pop()
+        return [self._connect(mailbox), 0]
+
+    def _release(self, mailbox: SenderMailbox, session: List[Any]) -> None:
+        if session[1] >= self.max_messages:
+            self._quit(session[0])
+            return
+        with self._lock:
+            self._idle.setdefault(mailbox.email, []).append(session)
+
+    @staticmethod
+    def _quit(server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            SmtpSessionPool._discard(server)
+
+    @staticmethod
+    def _discard(server) -> None:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def sendmail(self, mailbox: SenderMailbox, to_email: str, message: str) -> None:
+        """Send ``message`` over a pooled session, reconnecting once if the server dropped it."""
+        with self._slot(mailbox):
+            session = self._acquire(mailbox)
+            try:
+                try:
+                    session[0].sendmail(mailbox.email, to_email, message)
+                except smtplib.SMTPServerDisconnected:
+                    self._discard(session[0])
+                    session = [self._connect(mailbox), 0]
+                    session[0].sendmail(mailbox.email, to_email, message)
+            except smtplib.SMTPRecipientsRefused:
+                # Session is still usable; smtplib has already reset it
+                session[1] += 1
+                self._release(mailbox, session)
+                raise
+            except Exception:
+                self._discard(session[0])
+                raise
+            session[1] += 1
+            self._release(mailbox, session)
+
+    def close(self) -> None:
+        """Quit every pooled session."""
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle.clear()
+        for server, _ in sessions:
+            self._quit(server)
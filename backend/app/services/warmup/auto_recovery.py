@@ -1,63 +1,73 @@
 """Auto-Recovery Service - gradual resume after pause."""
-import json
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
 from app.db.models.warmup_alert import WarmupAlert, AlertType, AlertSeverity
-from app.db.models.settings import Settings
+from app.services.warmup import settings_cache
 
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+def _recovery_wait_days(db: Session) -> int:
+    return int(settings_cache.get(db, "warmup_recovery_wait_days", 3))
 
 
-def check_recovery_eligibility(mailbox: SenderMailbox, db: Session) -> bool:
+def _recovery_ramp_factor(db: Session) -> float:
+    return float(settings_cache.get(db, "warmup_recovery_ramp_factor", 1.5))
+
+
+def check_recovery_eligibility(mailbox: SenderMailbox, db: Session, wait_days: Optional[int] = None) -> bool:
     if mailbox.warmup_status not in [WarmupStatus.PAUSED, WarmupStatus.BLACKLISTED]:
         return False
-    wait_days = int(_get_setting(db, "warmup_recovery_wait_days", 3))
+    if wait_days is None:
+        wait_days = _recovery_wait_days(db)
     if not mailbox.updated_at:
         return False
     days_paused = (datetime.utcnow() - mailbox.updated_at).days
     return days_paused >= wait_days
 
 
+# Column values a mailbox is reset to when recovery starts
+_RECOVERY_START_VALUES = {
+    "warmup_status": WarmupStatus.RECOVERING,
+    "warmup_days_completed": 0,
+    "daily_send_limit": 2,
+    "emails_sent_today": 0,
+}
+
+
+def _recovery_started_alert(mailbox_id: int, email: str) -> Dict[str, Any]:
+    return {
+        "mailbox_id": mailbox_id,
+        "alert_type": AlertType.AUTO_RECOVERED,
+        "severity": AlertSeverity.INFO,
+        "title": f"Recovery started for {email}",
+        "message": "Auto-recovery initiated. Mailbox will gradually ramp up sending volume.",
+    }
+
+
 def start_recovery(mailbox_id: int, db: Session) -> Dict[str, Any]:
     mailbox = db.query(SenderMailbox).filter(SenderMailbox.mailbox_id == mailbox_id).first()
     if not mailbox:
         return {"error": "Mailbox not found"}
 
-    mailbox.warmup_status = WarmupStatus.RECOVERING
+    for column, value in _RECOVERY_START_VALUES.items():
+        setattr(mailbox, column, value)
     mailbox.auto_recovery_started_at = datetime.utcnow()
-    mailbox.warmup_days_completed = 0
-    mailbox.daily_send_limit = 2
-    mailbox.emails_sent_today = 0
 
-    alert = WarmupAlert(
-        mailbox_id=mailbox_id,
-        alert_type=AlertType.AUTO_RECOVERED,
-        severity=AlertSeverity.INFO,
-        title=f"Recovery started for {mailbox.email}",
-        message=f"Auto-recovery initiated. Mailbox will gradually ramp up sending volume.",
-    )
-    db.add(alert)
+    db.add(WarmupAlert(**_recovery_started_alert(mailbox_id, mailbox.email)))
     db.commit()
 
-    return {"mailbox_id": mailbox_id, "status": "recovering", "daily_limit": 2}
+    return {"mailbox_id": mailbox_id, "status": "recovering", "daily_limit": _RECOVERY_START_VALUES["daily_send_limit"]}
 
 
-def advance_recovery(mailbox: SenderMailbox, db: Session) -> Dict[str, Any]:
+def advance_recovery(mailbox: SenderMailbox, db: Session, ramp_factor: Optional[float] = None) -> Dict[str, Any]:
     if mailbox.warmup_status != WarmupStatus.RECOVERING:
         return {"skipped": True}
 
-    ramp_factor = float(_get_setting(db, "warmup_recovery_ramp_factor", 1.5))
+    if ramp_factor is None:
+        ramp_factor = _recovery_ramp_factor(db)
     new_limit = max(2, int(mailbox.daily_send_limit * ramp_factor))
     mailbox.daily_send_limit = min(new_limit, 35)
     mailbox.warmup_days_completed += 1
@@ -87,21 +97,35 @@ def complete_recovery(mailbox: SenderMailbox, db: Session) -> Dict[str, Any]:
 
 
 def run_auto_recovery_check(db: Session) -> Dict[str, Any]:
-    enabled = _get_setting(db, "warmup_auto_recovery_enabled", True)
+    enabled = settings_cache.get(db, "warmup_auto_recovery_enabled", True)
     if not enabled:
         return {"skipped": True, "reason": "Auto-recovery disabled"}
 
     recovering = db.query(SenderMailbox).filter(SenderMailbox.warmup_status == WarmupStatus.RECOVERING).all()
+    ramp_factor = _recovery_ramp_factor(db)
     for mb in recovering:
-        advance_recovery(mb, db)
-
-    paused = db.query(SenderMailbox).filter(
-        SenderMailbox.warmup_status.in_([WarmupStatus.PAUSED, WarmupStatus.BLACKLISTED])
+        advance_recovery(mb, db, ramp_factor)
+
+    # Same rule as check_recovery_eligibility, applied in SQL: paused or
+    # blacklisted for at least wait_days
+    now = datetime.utcnow()
+    wait_days = _recovery_wait_days(db)
+    eligible = db.query(SenderMailbox.mailbox_id, SenderMailbox.email).filter(
+        SenderMailbox.warmup_status.in_([WarmupStatus.PAUSED, WarmupStatus.BLACKLISTED]),
+        SenderMailbox.updated_at <= now - timedelta(days=wait_days)
     ).all()
-    auto_started = 0
-    for mb in paused:
-        if check_recovery_eligibility(mb, db):
-            start_recovery(mb.mailbox_id, db)
-            auto_started += 1
 
-    return {"recovering_advanced": len(recovering), "auto_started": auto_started}
+    # Start them all as start_recovery would, in one UPDATE, one alert
+    # INSERT and one commit
+    if eligible:
+        db.execute(
+            update(SenderMailbox)
+            .where(SenderMailbox.mailbox_id.in_([mailbox_id for mailbox_id, _ in eligible]))
+            .values(**_RECOVERY_START_VALUES, auto_recovery_started_at=now)
+        )
+        db.execute(insert(WarmupAlert), [
+            _recovery_started_alert(mailbox_id, email) for mailbox_id, email in eligible
+        ])
+        db.commit()
+
+    return {"recovering_advanced": len(recovering), "auto_started": len(eligible)}
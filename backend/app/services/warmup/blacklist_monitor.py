@@ -1,13 +1,17 @@
 """Blacklist Monitoring Service - DNS-based DNSBL queries."""
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
 from app.db.models.blacklist_check_result import BlacklistCheckResult
-from app.db.models.settings import Settings
+from app.services.warmup import dns_cache, settings_cache
 
+logger = structlog.get_logger()
 
 DEFAULT_PROVIDERS = [
     "zen.spamhaus.org",
@@ -18,56 +22,85 @@ DEFAULT_PROVIDERS = [
     "dnsbl-1.uceprotect.net",
 ]
 
+# Upper bound on each DNSBL lookup, so one slow provider cannot hold up a check
+DNSBL_QUERY_LIFETIME_SECONDS = 2.0
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+# How long DNS answers are reused, so mailboxes on the same domain checked in
+# one sweep share a single A lookup and DNSBL sweep
+DOMAIN_IP_CACHE_TTL_SECONDS = 300
+DNSBL_RESULT_CACHE_TTL_SECONDS = 60
 
 
 def resolve_domain_ip(domain: str) -> str:
+    cached = dns_cache.get(("a", domain))
+    if cached is not None:
+        return cached
     try:
         import dns.resolver
         answers = dns.resolver.resolve(domain, "A")
-        return str(answers[0])
+        ip = str(answers[0])
     except Exception:
+        # Failures are not cached, so the next check retries
         return ""
+    dns_cache.put(("a", domain), ip, DOMAIN_IP_CACHE_TTL_SECONDS)
+    return ip
+
 
+def _dnsbl_query_prefix(ip: str) -> str:
+    """Reversed octets plus trailing dot, e.g. "4.3.2.1." for 1.2.3.4."""
+    return ".".join(reversed(ip.split("."))) + "."
 
-def check_ip_blacklist(ip: str, provider: str) -> Dict[str, Any]:
+
+def check_ip_blacklist(ip: str, provider: str, query_prefix: Optional[str] = None) -> Dict[str, Any]:
+    cached = dns_cache.get(("dnsbl", ip, provider))
+    if cached is not None:
+        return dict(cached)
     try:
         import dns.resolver
-        reversed_ip = ".".join(reversed(ip.split(".")))
-        query = f"{reversed_ip}.{provider}"
-        dns.resolver.resolve(query, "A")
-        return {"provider": provider, "listed": True, "details": "IP found on blacklist"}
+        query = (query_prefix or _dnsbl_query_prefix(ip)) + provider
+        try:
+            dns.resolver.resolve(query, "A", lifetime=DNSBL_QUERY_LIFETIME_SECONDS)
+            result = {"provider": provider, "listed": True, "details": "IP found on blacklist"}
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            result = {"provider": provider, "listed": False, "details": "Not listed"}
     except Exception:
-        return {"provider": provider, "listed": False, "details": "Not listed"}
+        # Timeouts, SERVFAIL and the like say nothing about the listing, so
+        # they are not cached as clean; the next check asks again
+        return {"provider": provider, "listed": False, "details": "Lookup failed"}
+    dns_cache.put(("dnsbl", ip, provider), result, DNSBL_RESULT_CACHE_TTL_SECONDS)
+    return dict(result)
 
 
-def run_blacklist_check(mailbox_id: int, db: Session) -> Dict[str, Any]:
-    mailbox = db.query(SenderMailbox).filter(SenderMailbox.mailbox_id == mailbox_id).first()
-    if not mailbox:
-        return {"error": "Mailbox not found"}
+def check_ip_blacklists(ip: str, providers: List[str]) -> List[Dict[str, Any]]:
+    """Query every provider concurrently; results come back in provider order."""
+    if not providers:
+        return []
+    query_prefix = _dnsbl_query_prefix(ip)
+    with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+        return list(executor.map(lambda provider: check_ip_blacklist(ip, provider, query_prefix), providers))
 
-    domain = mailbox.email.split("@")[1]
-    ip = resolve_domain_ip(domain)
 
-    providers = _get_setting(db, "warmup_blacklist_providers", DEFAULT_PROVIDERS)
+def _get_providers(db: Session) -> List[str]:
+    providers = settings_cache.get(db, "warmup_blacklist_providers", DEFAULT_PROVIDERS)
     if isinstance(providers, str):
         providers = [p.strip() for p in providers.split(",")]
+    return providers
 
-    results = []
+
+def _check_domain(domain: str, providers: List[str]) -> Tuple[str, List[Dict[str, Any]]]:
+    ip = resolve_domain_ip(domain)
     if ip:
-        for provider in providers:
-            result = check_ip_blacklist(ip, provider)
-            results.append(result)
-    else:
-        results = [{"provider": p, "listed": False, "details": "Could not resolve IP"} for p in providers]
+        return ip, check_ip_blacklists(ip, providers)
+    return ip, [{"provider": p, "listed": False, "details": "Could not resolve IP"} for p in providers]
+
+
+def run_blacklist_check(mailbox_id: int, db: Session) -> Dict[str, Any]:
+    mailbox = db.query(SenderMailbox).filter(SenderMailbox.mailbox_id == mailbox_id).first()
+    if not mailbox:
+        return {"error": "Mailbox not found"}
+
+    domain = mailbox.email.split("@")[1]
+    ip, results = _check_domain(domain, _get_providers(db))
 
     total_checked = len(results)
     total_listed = sum(1 for r in results if r["listed"])
@@ -89,10 +122,81 @@ def run_blacklist_check(mailbox_id: int, db: Session) -> Dict[str, Any]:
     db.commit()
     db.refresh(bl_result)
 
-    auto_pause = _get_setting(db, "warmup_auto_pause_on_blacklist", True)
+    auto_pause = settings_cache.get(db, "warmup_auto_pause_on_blacklist", True)
     if not is_clean and auto_pause:
         if mailbox.warmup_status not in [WarmupStatus.PAUSED, WarmupStatus.BLACKLISTED]:
             mailbox.warmup_status = WarmupStatus.BLACKLISTED
             db.commit()
 
     return {"id": bl_result.id, "domain": domain, "ip": ip, "is_clean": is_clean, "total_checked": total_checked, "total_listed": total_listed, "results": results}
+
+
+def run_blacklist_check_batch(mailbox_ids: List[int], db: Session) -> Dict[str, Any]:
+    """Check many mailboxes at once, looking up each domain only once.
+
+    Each domain's results are inserted under a savepoint, so a failing domain
+    is logged and skipped without losing the others; mailbox flags are then
+    updated and everything lands in a single commit.
+    """
+    mailboxes = db.query(SenderMailbox.mailbox_id, SenderMailbox.email).filter(
+        SenderMailbox.mailbox_id.in_(mailbox_ids)
+    ).all() if mailbox_ids else []
+    if not mailboxes:
+        return {"checked": 0, "listed": 0, "domains": 0}
+
+    by_domain: Dict[str, List[int]] = {}
+    for mailbox_id, email in mailboxes:
+        if "@" not in (email or ""):
+            logger.warning("Skipping blacklist check for mailbox without domain", mailbox_id=mailbox_id, email=email)
+            continue
+        by_domain.setdefault(email.split("@")[1], []).append(mailbox_id)
+
+    providers = _get_providers(db)
+    checked = 0
+    listed_ids: List[int] = []
+    clean_ids: List[int] = []
+    for domain, ids in by_domain.items():
+        try:
+            ip, results = _check_domain(domain, providers)
+            total_listed = sum(1 for r in results if r["listed"])
+            results_json = json.dumps(results)
+            rows = [
+                {
+                    "mailbox_id": mailbox_id,
+                    "domain": domain,
+                    "ip_address": ip,
+                    "results_json": results_json,
+                    "total_checked": len(results),
+                    "total_listed": total_listed,
+                    "is_clean": total_listed == 0,
+                }
+                for mailbox_id in ids
+            ]
+            with db.begin_nested():
+                db.execute(insert(BlacklistCheckResult), rows)
+        except Exception as e:
+            logger.error("Blacklist check failed", domain=domain, error=str(e))
+            continue
+        checked += len(rows)
+        (clean_ids if total_listed == 0 else listed_ids).extend(ids)
+
+    now = datetime.utcnow()
+    for ids, is_blacklisted in ((clean_ids, False), (listed_ids, True)):
+        if ids:
+            db.execute(
+                update(SenderMailbox)
+                .where(SenderMailbox.mailbox_id.in_(ids))
+                .values(is_blacklisted=is_blacklisted, last_blacklist_check_at=now)
+            )
+    if listed_ids and settings_cache.get(db, "warmup_auto_pause_on_blacklist", True):
+        db.execute(
+            update(SenderMailbox)
+            .where(
+                SenderMailbox.mailbox_id.in_(listed_ids),
+                SenderMailbox.warmup_status.notin_([WarmupStatus.PAUSED, WarmupStatus.BLACKLISTED]),
+            )
+            .values(warmup_status=WarmupStatus.BLACKLISTED)
+        )
+    db.commit()
+
+    return {"checked": checked, "listed": len(listed_ids), "domains": len(by_domain)}
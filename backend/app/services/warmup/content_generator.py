@@ -1,9 +1,9 @@
 """AI Warmup Content Generator - uses existing AI adapters for varied warmup email content."""
 import random
-import json
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from app.db.models.settings import Settings
+from app.services.warmup import settings_cache
 
 
 CONTENT_CATEGORIES = [
@@ -12,45 +12,63 @@ CONTENT_CATEGORIES = [
 ]
 
 SUBJECT_TEMPLATES = {
-    "meeting_followup": ["Following up on our chat", "Great meeting today", "Quick follow-up"],
-    "project_update": ["Project status update", "Quick update on progress", "FYI - Project milestone"],
-    "question": ["Quick question for you", "Need your input", "Thoughts on this?"],
-    "introduction": ["Nice to connect", "Great to meet you", "Reaching out"],
-    "thank_you": ["Thanks for your help", "Appreciated your time", "Thank you!"],
-    "scheduling": ["Can we find time to chat?", "Scheduling a quick call", "When works for you?"],
-    "feedback_request": ["Would love your feedback", "Your thoughts?", "Quick review needed"],
-    "resource_sharing": ["Thought you might find this useful", "Sharing a resource", "Check this out"],
+    "meeting_followup": ("Following up on our chat", "Great meeting today", "Quick follow-up"),
+    "project_update": ("Project status update", "Quick update on progress", "FYI - Project milestone"),
+    "question": ("Quick question for you", "Need your input", "Thoughts on this?"),
+    "introduction": ("Nice to connect", "Great to meet you", "Reaching out"),
+    "thank_you": ("Thanks for your help", "Appreciated your time", "Thank you!"),
+    "scheduling": ("Can we find time to chat?", "Scheduling a quick call", "When works for you?"),
+    "feedback_request": ("Would love your feedback", "Your thoughts?", "Quick review needed"),
+    "resource_sharing": ("Thought you might find this useful", "Sharing a resource", "Check this out"),
 }
 
 BODY_TEMPLATES = {
-    "meeting_followup": ['Hi {receiver_name},\n\nIt was great chatting with you earlier. I wanted to follow up.\n\nBest regards,\n{sender_name}', 'Hey {receiver_name},\n\nThanks for taking the time to meet today.\n\nCheers,\n{sender_name}'],
-    "project_update": ['Hi {receiver_name},\n\nJust a quick update - we are making good progress.\n\nBest,\n{sender_name}'],
-    "question": ['Hi {receiver_name},\n\nHope you are having a good day. Quick question - would love your perspective.\n\nThanks,\n{sender_name}'],
-    "introduction": ['Hi {receiver_name},\n\nGreat to connect! Would love to find time to chat.\n\nBest,\n{sender_name}'],
-    "thank_you": ['Hi {receiver_name},\n\nJust wanted to say thanks for your help.\n\nBest regards,\n{sender_name}'],
-    "scheduling": ['Hi {receiver_name},\n\nWould you have time this week for a quick call?\n\nThanks,\n{sender_name}'],
-    "feedback_request": ['Hi {receiver_name},\n\nI have been working on a proposal and would value your feedback.\n\nAppreciate it,\n{sender_name}'],
-    "resource_sharing": ['Hi {receiver_name},\n\nI came across something relevant to you. Let me know what you think!\n\nBest,\n{sender_name}'],
+    "meeting_followup": ('Hi {receiver_name},\n\nIt was great chatting with you earlier. I wanted to follow up.\n\nBest regards,\n{sender_name}', 'Hey {receiver_name},\n\nThanks for taking the time to meet today.\n\nCheers,\n{sender_name}'),
+    "project_update": ('Hi {receiver_name},\n\nJust a quick update - we are making good progress.\n\nBest,\n{sender_name}',),
+    "question": ('Hi {receiver_name},\n\nHope you are having a good day. Quick question - would love your perspective.\n\nThanks,\n{sender_name}',),
+    "introduction": ('Hi {receiver_name},\n\nGreat to connect! Would love to find time to chat.\n\nBest,\n{sender_name}',),
+    "thank_you": ('Hi {receiver_name},\n\nJust wanted to say thanks for your help.\n\nBest regards,\n{sender_name}',),
+    "scheduling": ('Hi {receiver_name},\n\nWould you have time this week for a quick call?\n\nThanks,\n{sender_name}',),
+    "feedback_request": ('Hi {receiver_name},\n\nI have been working on a proposal and would value your feedback.\n\nAppreciate it,\n{sender_name}',),
+    "resource_sharing": ('Hi {receiver_name},\n\nI came across something relevant to you. Let me know what you think!\n\nBest,\n{sender_name}',),
 }
 
+# Fallback replies as (text, html) pairs; formatted with sender_name and first_name
+_REPLY_TEMPLATES = tuple(
+    (text, "<p>" + text.replace("\n", "<br>") + "</p>")
+    for text in (
+        "Thanks for reaching out! Let me get back to you soon.\nBest,\n{sender_name}",
+        "Appreciate the update! I will review shortly.\nCheers,\n{sender_name}",
+        "Great to hear from you! Let us connect on this.\nRegards,\n{sender_name}",
+        "Got it, thanks for the heads up!\nTalk soon,\n{sender_name}",
+        "Thanks {first_name}! Will take a look.\nBest,\n{sender_name}",
+    )
+)
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+# provider -> (api_key, adapter); an entry is replaced when the key changes
+_adapter_cache: Dict[str, Tuple[str, Any]] = {}
+_adapter_cache_lock = threading.Lock()
 
 
 def get_ai_adapter(db: Session):
-    """Load configured AI provider from settings."""
-    provider = _get_setting(db, "warmup_ai_provider", "groq")
+    """Load configured AI provider from settings, reusing the adapter across emails."""
+    provider = settings_cache.get(db, "warmup_ai_provider", "groq")
     api_key_map = {"groq": "groq_api_key", "openai": "openai_api_key", "anthropic": "anthropic_api_key", "gemini": "gemini_api_key"}
-    api_key = _get_setting(db, api_key_map.get(provider, "groq_api_key"), "")
+    api_key = settings_cache.get(db, api_key_map.get(provider, "groq_api_key"), "")
     if not api_key:
         return None
+    with _adapter_cache_lock:
+        cached = _adapter_cache.get(provider)
+    if cached and cached[0] == api_key:
+        return cached[1]
+    adapter = _build_ai_adapter(provider, api_key)
+    if adapter is not None:
+        with _adapter_cache_lock:
+            _adapter_cache[provider] = (api_key, adapter)
+    return adapter
+
+
+def _build_ai_adapter(provider: str, api_key: str):
     try:
         if provider == "groq":
             from app.services.adapters.ai.groq import GroqAdapter
@@ -69,6 +87,11 @@ def get_ai_adapter(db: Session):
     return None
 
 
+def text_to_html(text: str) -> str:
+    """Blank lines become paragraphs and single newlines become <br>."""
+    return "<p>" + text.replace("\n\n", "</p><p>").replace("\n", "<br>") + "</p>"
+
+
 def generate_warmup_subject(category: str = None) -> str:
     """Generate a random conversational subject line."""
     cat = category or random.choice(CONTENT_CATEGORIES)
@@ -88,18 +111,18 @@ def generate_ai_warmup_content(db: Session, sender_name: str, receiver_name: str
     if not adapter:
         return None
     cat = category or random.choice(CONTENT_CATEGORIES)
-    temperature = float(_get_setting(db, "warmup_ai_temperature", 0.8))
-    max_length = int(_get_setting(db, "warmup_content_max_length", 200))
+    temperature = float(settings_cache.get(db, "warmup_ai_temperature", 0.8))
+    max_length = int(settings_cache.get(db, "warmup_content_max_length", 200))
     try:
         messages = [
             {"role": "system", "content": f"You are writing a casual internal business email. Keep it under {max_length} words. Category: {cat}"},
             {"role": "user", "content": f"Write a casual email from {sender_name} to {receiver_name}. Return SUBJECT: on first line, then blank line, then body."}
         ]
         result = adapter._call_api(messages, temperature=temperature, max_tokens=max_length * 2)
-        result_lines = result.strip().split(chr(10), 1)
+        result_lines = result.strip().split("\n", 1)
         subject = result_lines[0].replace("SUBJECT:", "").replace("Subject:", "").strip()
         body = result_lines[1].strip() if len(result_lines) > 1 else ""
-        return {"subject": subject, "body_text": body, "body_html": "<p>" + body.replace(chr(10)+chr(10), "</p><p>") + "</p>", "ai_provider": type(adapter).__name__}
+        return {"subject": subject, "body_text": body, "body_html": "<p>" + body.replace("\n\n", "</p><p>") + "</p>", "ai_provider": type(adapter).__name__}
     except Exception:
         return None
 
@@ -113,23 +136,22 @@ def generate_warmup_reply(original_subject: str, original_body: str, sender_name
         adapter = get_ai_adapter(db)
         if adapter:
             try:
-                temperature = float(_get_setting(db, "warmup_ai_temperature", 0.8))
+                temperature = float(settings_cache.get(db, "warmup_ai_temperature", 0.8))
                 messages = [
                     {"role": "system", "content": "You are writing a brief, casual reply to an internal business email. Keep it under 60 words. Be natural and conversational."},
                     {"role": "user", "content": f"Write a short reply from {sender_name} to this email:\n\nSubject: {original_subject}\n{original_body[:300]}\n\nJust the reply body, no subject line."}
                 ]
                 body = adapter._call_api(messages, temperature=temperature, max_tokens=150).strip()
-                return {"subject": subject, "body_text": body, "body_html": "<p>" + body.replace(chr(10)+chr(10), "</p><p>").replace(chr(10), "<br>") + "</p>", "ai_generated": True}
+                return {"subject": subject, "body_text": body, "body_html": text_to_html(body), "ai_generated": True}
             except Exception:
                 pass
 
     # Fallback to templates
-    replies = [
-        f"Thanks for reaching out! Let me get back to you soon." + chr(10) + "Best," + chr(10) + f"{sender_name}",
-        f"Appreciate the update! I will review shortly." + chr(10) + "Cheers," + chr(10) + f"{sender_name}",
-        f"Great to hear from you! Let us connect on this." + chr(10) + "Regards," + chr(10) + f"{sender_name}",
-        f"Got it, thanks for the heads up!" + chr(10) + "Talk soon," + chr(10) + f"{sender_name}",
-        f"Thanks {sender_name.split()[0] if ' ' in sender_name else sender_name}! Will take a look." + chr(10) + "Best," + chr(10) + f"{sender_name}",
-    ]
-    body = random.choice(replies)
-    return {"subject": subject, "body_text": body, "body_html": "<p>" + body.replace(chr(10), "<br>") + "</p>", "ai_generated": False}
+    first_name = sender_name.split()[0] if " " in sender_name else sender_name
+    text, html = random.choice(_REPLY_TEMPLATES)
+    return {
+        "subject": subject,
+        "body_text": text.format(sender_name=sender_name, first_name=first_name),
+        "body_html": html.format(sender_name=sender_name, first_name=first_name),
+        "ai_generated": False,
+    }
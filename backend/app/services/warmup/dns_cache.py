@@ -0,0 +1,37 @@
+"""DNS Cache - short-lived, process-wide memo of DNS answers shared by the warmup checks."""
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Bound on stored answers; expired entries are swept once it is reached
+DNS_CACHE_MAX_ENTRIES = 10_000
+
+_cache: Dict[Hashable, Tuple[Any, float]] = {}
+_lock = threading.Lock()
+
+
+def get(key: Hashable) -> Optional[Any]:
+    """Return the cached value for ``key``, or None when missing or expired."""
+    with _lock:
+        entry = _cache.get(key)
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def put(key: Hashable, value: Any, ttl: float) -> None:
+    """Store ``value`` under ``key`` for ``ttl`` seconds."""
+    now = time.monotonic()
+    with _lock:
+        if len(_cache) >= DNS_CACHE_MAX_ENTRIES:
+            for stale in [k for k, (_, expires) in _cache.items() if expires <= now]:
+                del _cache[stale]
+            if len(_cache) >= DNS_CACHE_MAX_ENTRIES:
+                _cache.clear()
+        _cache[key] = (value, now + ttl)
+
+
+def clear_dns_cache() -> None:
+    """Forget every cached DNS answer."""
+    with _lock:
+        _cache.clear()
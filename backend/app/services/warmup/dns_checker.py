@@ -1,56 +1,92 @@
 """DNS Health Check Service - SPF, DKIM, DMARC, MX checks via dnspython."""
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+import dns.resolver
 from sqlalchemy.orm import Session
 
 from app.db.models.sender_mailbox import SenderMailbox
 from app.db.models.dns_check_result import DNSCheckResult
-from app.db.models.settings import Settings
+from app.services.warmup import dns_cache, settings_cache
+
+
+# Per-nameserver timeout and overall budget for each lookup
+DNS_QUERY_TIMEOUT_SECONDS = 2.0
+DNS_QUERY_LIFETIME_SECONDS = 4.0
+
+_resolver: Optional[dns.resolver.Resolver] = None
+
+
+def _get_resolver() -> dns.resolver.Resolver:
+    """Resolver shared by all checks, built from the system configuration on first use."""
+    global _resolver
+    if _resolver is None:
+        resolver = dns.resolver.Resolver()
+        resolver.timeout = DNS_QUERY_TIMEOUT_SECONDS
+        resolver.lifetime = DNS_QUERY_LIFETIME_SECONDS
+        _resolver = resolver
+    return _resolver
 
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+# Cached checks live for the answer's own TTL, clamped to this range; answers
+# without a TTL use the default
+DNS_RECORD_CACHE_MIN_TTL = 60
+DNS_RECORD_CACHE_MAX_TTL = 3600
+DNS_RECORD_CACHE_DEFAULT_TTL = 900
+
+
+def _record_ttl(answers) -> int:
+    ttl = getattr(getattr(answers, "rrset", None), "ttl", None)
+    if ttl is None:
+        return DNS_RECORD_CACHE_DEFAULT_TTL
+    return min(max(ttl, DNS_RECORD_CACHE_MIN_TTL), DNS_RECORD_CACHE_MAX_TTL)
+
+
+def _cache_check(key: Tuple[str, ...], result: Dict[str, Any], answers) -> Dict[str, Any]:
+    dns_cache.put(key, result, _record_ttl(answers))
+    return dict(result)
 
 
 def check_spf(domain: str) -> Dict[str, Any]:
+    cached = dns_cache.get(("spf", domain))
+    if cached is not None:
+        return dict(cached)
     try:
-        import dns.resolver
-        answers = dns.resolver.resolve(domain, "TXT")
+        answers = _get_resolver().resolve(domain, "TXT")
         for rdata in answers:
             txt = rdata.to_text().strip('"')
             if txt.startswith("v=spf1"):
-                return {"valid": True, "record": txt}
-        return {"valid": False, "record": None}
+                return _cache_check(("spf", domain), {"valid": True, "record": txt}, answers)
+        return _cache_check(("spf", domain), {"valid": False, "record": None}, answers)
     except Exception as e:
         return {"valid": False, "record": None, "error": str(e)}
 
 
 def check_dkim(domain: str, selector: str = "default") -> Dict[str, Any]:
+    cached = dns_cache.get(("dkim", domain, selector))
+    if cached is not None:
+        return dict(cached)
     try:
-        import dns.resolver
         dkim_domain = f"{selector}._domainkey.{domain}"
-        answers = dns.resolver.resolve(dkim_domain, "TXT")
+        answers = _get_resolver().resolve(dkim_domain, "TXT")
         for rdata in answers:
             txt = rdata.to_text().strip('"')
             if "v=DKIM1" in txt or "p=" in txt:
-                return {"valid": True, "record": txt, "selector": selector}
-        return {"valid": False, "record": None, "selector": selector}
+                return _cache_check(("dkim", domain, selector), {"valid": True, "record": txt, "selector": selector}, answers)
+        return _cache_check(("dkim", domain, selector), {"valid": False, "record": None, "selector": selector}, answers)
     except Exception as e:
         return {"valid": False, "record": None, "selector": selector, "error": str(e)}
 
 
 def check_dmarc(domain: str) -> Dict[str, Any]:
+    cached = dns_cache.get(("dmarc", domain))
+    if cached is not None:
+        return dict(cached)
     try:
-        import dns.resolver
         dmarc_domain = f"_dmarc.{domain}"
-        answers = dns.resolver.resolve(dmarc_domain, "TXT")
+        answers = _get_resolver().resolve(dmarc_domain, "TXT")
         for rdata in answers:
             txt = rdata.to_text().strip('"')
             if txt.startswith("v=DMARC1"):
@@ -59,22 +95,34 @@ def check_dmarc(domain: str) -> Dict[str, Any]:
                     policy = "reject"
                 elif "p=quarantine" in txt:
                     policy = "quarantine"
-                return {"valid": True, "record": txt, "policy": policy}
-        return {"valid": False, "record": None, "policy": None}
+                return _cache_check(("dmarc", domain), {"valid": True, "record": txt, "policy": policy}, answers)
+        return _cache_check(("dmarc", domain), {"valid": False, "record": None, "policy": None}, answers)
     except Exception as e:
         return {"valid": False, "record": None, "policy": None, "error": str(e)}
 
 
 def check_mx(domain: str) -> Dict[str, Any]:
+    cached = dns_cache.get(("mx", domain))
+    if cached is not None:
+        return dict(cached)
     try:
-        import dns.resolver
-        answers = dns.resolver.resolve(domain, "MX")
+        answers = _get_resolver().resolve(domain, "MX")
         records = [{"priority": r.preference, "host": str(r.exchange)} for r in answers]
-        return {"valid": len(records) > 0, "records": records}
+        return _cache_check(("mx", domain), {"valid": len(records) > 0, "records": records}, answers)
     except Exception as e:
         return {"valid": False, "records": [], "error": str(e)}
 
 
+def check_domain_records(domain: str, selector: str = "default") -> Tuple[Dict[str, Any], ...]:
+    """Run the SPF, DKIM, DMARC and MX checks concurrently; returns them in that order."""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        spf = executor.submit(check_spf, domain)
+        dkim = executor.submit(check_dkim, domain, selector)
+        dmarc = executor.submit(check_dmarc, domain)
+        mx = executor.submit(check_mx, domain)
+        return spf.result(), dkim.result(), dmarc.result(), mx.result()
+
+
 def calculate_dns_score(spf_valid: bool, dkim_valid: bool, dmarc_valid: bool) -> int:
     score = 0
     if spf_valid:
@@ -92,12 +140,9 @@ def run_dns_health_check(mailbox_id: int, db: Session) -> Dict[str, Any]:
         return {"error": "Mailbox not found"}
 
     domain = mailbox.email.split("@")[1]
-    selector = _get_setting(db, "warmup_dkim_selector", "default")
+    selector = settings_cache.get(db, "warmup_dkim_selector", "default")
 
-    spf = check_spf(domain)
-    dkim = check_dkim(domain, selector)
-    dmarc = check_dmarc(domain)
-    mx = check_mx(domain)
+    spf, dkim, dmarc, mx = check_domain_records(domain, selector)
 
     score = calculate_dns_score(spf["valid"], dkim["valid"], dmarc["valid"])
 
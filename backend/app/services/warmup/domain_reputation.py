@@ -1,21 +1,17 @@
 """Domain Reputation Tracker - DNS+blacklist proxy score."""
-import json
 from datetime import datetime
-from typing import Dict, Any
-from sqlalchemy.orm import Session
+from typing import Dict, Any, List
+from sqlalchemy.orm import Session, load_only
 
 from app.db.models.sender_mailbox import SenderMailbox
-from app.db.models.settings import Settings
 
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+# The only mailbox columns a reputation reads
+_REPUTATION_COLUMNS = (
+    SenderMailbox.mailbox_id, SenderMailbox.email, SenderMailbox.total_emails_sent,
+    SenderMailbox.bounce_count, SenderMailbox.dns_score, SenderMailbox.is_blacklisted,
+    SenderMailbox.last_dns_check_at, SenderMailbox.last_blacklist_check_at,
+)
 
 
 def calculate_domain_score(dns_score: int, is_blacklisted: bool, bounce_rate: float = 0) -> int:
@@ -29,28 +25,38 @@ def calculate_domain_score(dns_score: int, is_blacklisted: bool, bounce_rate: fl
     return min(100, score)
 
 
-def get_domain_reputation(mailbox_id: int, db: Session) -> Dict[str, Any]:
-    mailbox = db.query(SenderMailbox).filter(SenderMailbox.mailbox_id == mailbox_id).first()
-    if not mailbox:
-        return {"error": "Mailbox not found"}
-
-    domain = mailbox.email.split("@")[1]
-    total_sent = mailbox.total_emails_sent or 0
-    bounce_rate = (mailbox.bounce_count / total_sent * 100) if total_sent > 0 else 0
-
-    score = calculate_domain_score(
-        dns_score=mailbox.dns_score or 0,
-        is_blacklisted=mailbox.is_blacklisted or False,
-        bounce_rate=bounce_rate,
-    )
+def _reputation(mailbox: SenderMailbox) -> Dict[str, Any]:
+    bounce_rate = (mailbox.bounce_count or 0) * 100.0 / max(mailbox.total_emails_sent or 0, 1)
+    dns_score = mailbox.dns_score or 0
+    is_blacklisted = mailbox.is_blacklisted or False
 
     return {
-        "mailbox_id": mailbox_id,
-        "domain": domain,
-        "reputation_score": score,
-        "dns_score": mailbox.dns_score or 0,
-        "is_blacklisted": mailbox.is_blacklisted or False,
+        "mailbox_id": mailbox.mailbox_id,
+        "domain": mailbox.email.split("@")[1],
+        "reputation_score": calculate_domain_score(dns_score, is_blacklisted, bounce_rate),
+        "dns_score": dns_score,
+        "is_blacklisted": is_blacklisted,
         "bounce_rate": round(bounce_rate, 2),
         "last_dns_check": str(mailbox.last_dns_check_at) if mailbox.last_dns_check_at else None,
         "last_blacklist_check": str(mailbox.last_blacklist_check_at) if mailbox.last_blacklist_check_at else None,
     }
+
+
+def get_domain_reputation_bulk(mailbox_ids: List[int], db: Session) -> List[Dict[str, Any]]:
+    """Reputation for many mailboxes from one query, in ``mailbox_ids`` order; unknown ids are left out."""
+    if not mailbox_ids:
+        return []
+    mailboxes = {
+        mb.mailbox_id: mb
+        for mb in db.query(SenderMailbox).options(load_only(*_REPUTATION_COLUMNS)).filter(
+            SenderMailbox.mailbox_id.in_(mailbox_ids)
+        )
+    }
+    return [_reputation(mailboxes[mailbox_id]) for mailbox_id in mailbox_ids if mailbox_id in mailboxes]
+
+
+def get_domain_reputation(mailbox_id: int, db: Session) -> Dict[str, Any]:
+    reputations = get_domain_reputation_bulk([mailbox_id], db)
+    if not reputations:
+        return {"error": "Mailbox not found"}
+    return reputations[0]
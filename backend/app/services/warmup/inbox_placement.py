@@ -2,26 +2,23 @@
 import smtplib
 import imaplib
 import json
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.db.models.sender_mailbox import SenderMailbox
-from app.db.models.settings import Settings
+from app.services.smtp_pool import SmtpSessionPool
+from app.services.warmup import settings_cache
 
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
-
-
-def send_seed_email(mailbox: SenderMailbox, seed_email: str, subject: str = None) -> Dict[str, Any]:
+def send_seed_email(
+    mailbox: SenderMailbox,
+    seed_email: str,
+    subject: str = None,
+    smtp_pool: Optional[SmtpSessionPool] = None,
+) -> Dict[str, Any]:
     try:
         if not subject:
             subject = f"Inbox placement test - {datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
@@ -31,23 +28,34 @@ def send_seed_email(mailbox: SenderMailbox, seed_email: str, subject: str = None
         msg["To"] = seed_email
         msg["Subject"] = subject
 
-        smtp_host = mailbox.smtp_host or "smtp.office365.com"
-        server = smtplib.SMTP(smtp_host, mailbox.smtp_port or 587, timeout=30)
-        server.starttls()
-        server.login(mailbox.email, mailbox.password)
-        server.sendmail(mailbox.email, seed_email, msg.as_string())
-        server.quit()
+        if smtp_pool is not None:
+            smtp_pool.sendmail(mailbox, seed_email, msg.as_string())
+        else:
+            smtp_host = mailbox.smtp_host or "smtp.office365.com"
+            server = smtplib.SMTP(smtp_host, mailbox.smtp_port or 587, timeout=30)
+            server.starttls()
+            server.login(mailbox.email, mailbox.password)
+            server.sendmail(mailbox.email, seed_email, msg.as_string())
+            server.quit()
         return {"success": True, "subject": subject}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def _normalize_seeds(seed_emails: List[Any]) -> List[Tuple[str, str]]:
+    """Seeds may be plain addresses or {"email", "provider"} dicts; return (email, provider) pairs."""
+    return [
+        (seed, "unknown") if isinstance(seed, str) else (seed.get("email", ""), seed.get("provider", "unknown"))
+        for seed in seed_emails
+    ]
+
+
 def run_placement_test(mailbox_id: int, db: Session) -> Dict[str, Any]:
     mailbox = db.query(SenderMailbox).filter(SenderMailbox.mailbox_id == mailbox_id).first()
     if not mailbox:
         return {"error": "Mailbox not found"}
 
-    seed_emails = _get_setting(db, "warmup_seed_emails_json", [])
+    seed_emails = settings_cache.get(db, "warmup_seed_emails_json", [])
     if isinstance(seed_emails, str):
         try:
             seed_emails = json.loads(seed_emails)
@@ -57,17 +65,26 @@ def run_placement_test(mailbox_id: int, db: Session) -> Dict[str, Any]:
     if not seed_emails:
         return {"error": "No seed emails configured", "mailbox_id": mailbox_id}
 
-    results = []
-    for seed in seed_emails:
-        email = seed if isinstance(seed, str) else seed.get("email", "")
-        provider = seed.get("provider", "unknown") if isinstance(seed, dict) else "unknown"
-        result = send_seed_email(mailbox, email)
-        results.append({
+    seeds = _normalize_seeds(seed_emails)
+
+    # Seeds are independent, so they go out concurrently; the pool caps how
+    # many sessions the mailbox has open at once and reuses them
+    smtp_pool = SmtpSessionPool()
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(seeds), smtp_pool.size_per_mailbox)) as executor:
+            sends = list(executor.map(lambda seed: send_seed_email(mailbox, seed[0], smtp_pool=smtp_pool), seeds))
+    finally:
+        smtp_pool.close()
+
+    results = [
+        {
             "seed_email": email,
             "provider": provider,
             "sent": result.get("success", False),
             "error": result.get("error"),
             "placement": "pending",
-        })
+        }
+        for (email, provider), result in zip(seeds, sends)
+    ]
 
     return {"mailbox_id": mailbox_id, "tests_sent": len(results), "results": results}
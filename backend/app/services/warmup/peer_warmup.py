@@ -2,47 +2,63 @@
 import random
 import smtplib
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-import json
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert
 
 from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
 from app.db.models.warmup_email import WarmupEmail, WarmupEmailStatus
-from app.db.models.settings import Settings
+from app.services.smtp_pool import SmtpSessionPool
+from app.services.warmup import settings_cache
 from app.services.warmup.tracking import inject_tracking
 
 
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+def _max_emails_per_pair(db: Session) -> int:
+    return int(settings_cache.get(db, "warmup_peer_max_emails_per_pair", 3))
 
 
-def get_peer_pairs(db: Session, mailbox: SenderMailbox) -> List[SenderMailbox]:
-    peers = db.query(SenderMailbox).filter(
+def _warmup_candidates(db: Session) -> List[SenderMailbox]:
+    """Mailboxes taking part in peer warmup, as senders and as receivers."""
+    return db.query(SenderMailbox).filter(
         and_(
-            SenderMailbox.mailbox_id != mailbox.mailbox_id,
             SenderMailbox.warmup_status.in_([WarmupStatus.WARMING_UP, WarmupStatus.RECOVERING]),
             SenderMailbox.is_active == True,
             SenderMailbox.connection_status == "successful",
         )
     ).all()
+
+
+def get_peer_pairs(
+    db: Session,
+    mailbox: SenderMailbox,
+    max_per_pair: Optional[int] = None,
+    candidates: Optional[List[SenderMailbox]] = None,
+) -> List[SenderMailbox]:
+    """Pick random peers for ``mailbox``; pass ``candidates`` to reuse one loaded list across mailboxes."""
+    if candidates is None:
+        candidates = _warmup_candidates(db)
+    peers = [peer for peer in candidates if peer.mailbox_id != mailbox.mailbox_id]
     if not peers:
         return []
-    max_per_pair = int(_get_setting(db, "warmup_peer_max_emails_per_pair", 3))
+    if max_per_pair is None:
+        max_per_pair = _max_emails_per_pair(db)
     random.shuffle(peers)
     return peers[:max_per_pair]
 
 
-def send_warmup_email(sender_mailbox: SenderMailbox, receiver_email: str, subject: str, body_html: str, body_text: str) -> Dict[str, Any]:
+def send_warmup_email(
+    sender_mailbox: SenderMailbox,
+    receiver_email: str,
+    subject: str,
+    body_html: str,
+    body_text: str,
+    smtp_pool: Optional[SmtpSessionPool] = None,
+) -> Dict[str, Any]:
+    """Send one warmup email; with ``smtp_pool`` it goes over a reused session."""
     try:
         msg = MIMEMultipart("alternative")
         msg["From"] = f"{sender_mailbox.display_name or sender_mailbox.email} <{sender_mailbox.email}>"
@@ -53,86 +69,129 @@ def send_warmup_email(sender_mailbox: SenderMailbox, receiver_email: str, subjec
         msg.attach(MIMEText(body_text, "plain"))
         msg.attach(MIMEText(body_html, "html"))
 
-        smtp_host = sender_mailbox.smtp_host or "smtp.office365.com"
-        server = smtplib.SMTP(smtp_host, sender_mailbox.smtp_port or 587, timeout=30)
-        server.starttls()
-        server.login(sender_mailbox.email, sender_mailbox.password)
-        server.sendmail(sender_mailbox.email, receiver_email, msg.as_string())
-        server.quit()
+        if smtp_pool is not None:
+            smtp_pool.sendmail(sender_mailbox, receiver_email, msg.as_string())
+        else:
+            smtp_host = sender_mailbox.smtp_host or "smtp.office365.com"
+            server = smtplib.SMTP(smtp_host, sender_mailbox.smtp_port or 587, timeout=30)
+            server.starttls()
+            server.login(sender_mailbox.email, sender_mailbox.password)
+            server.sendmail(sender_mailbox.email, receiver_email, msg.as_string())
+            server.quit()
 
         return {"success": True, "message_id": msg["Message-ID"]}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def _max_concurrency(db: Session) -> int:
+    return max(1, int(settings_cache.get(db, "warmup_peer_max_concurrency", 8)))
+
+
+def _compose_peer_email(db: Session, mailbox: SenderMailbox, peer: SenderMailbox) -> Dict[str, Any]:
+    """Build one peer email's content and tracking; reads settings, so main thread only."""
+    from app.services.warmup.content_generator import generate_warmup_subject, generate_warmup_body, generate_ai_warmup_content, text_to_html
+
+    sender_name = mailbox.display_name or mailbox.email.split("@")[0]
+    receiver_name = peer.display_name or peer.email.split("@")[0]
+
+    # Try AI content first, fallback to templates
+    ai_content = generate_ai_warmup_content(db, sender_name, receiver_name)
+    if ai_content:
+        subject = ai_content["subject"]
+        body_html = ai_content["body_html"]
+        body_text = ai_content["body_text"]
+        ai_generated = True
+        ai_provider = ai_content.get("ai_provider", "")
+    else:
+        subject = generate_warmup_subject()
+        body_text = generate_warmup_body(sender_name, receiver_name)
+        body_html = text_to_html(body_text)
+        ai_generated = False
+        ai_provider = None
+
+    tracking_id = str(uuid.uuid4())
+    # Inject tracking pixel into HTML body for open tracking
+    body_html = inject_tracking(body_html, tracking_id, db)
+
+    return {
+        "peer": peer,
+        "subject": subject,
+        "body_html": body_html,
+        "body_text": body_text,
+        "tracking_id": tracking_id,
+        "ai_generated": ai_generated,
+        "ai_provider": ai_provider,
+    }
+
+
+def _send_peer_emails(mailbox: SenderMailbox, emails: List[Dict[str, Any]], smtp_pool: SmtpSessionPool) -> List[Dict[str, Any]]:
+    """Send one mailbox's composed emails in order; no database access, so safe in a worker thread."""
+    return [
+        send_warmup_email(mailbox, email["peer"].email, email["subject"], email["body_html"], email["body_text"], smtp_pool)
+        for email in emails
+    ]
+
+
 def run_peer_warmup_cycle(db: Session, mailbox_id: int = None) -> Dict[str, Any]:
-    from app.services.warmup.content_generator import generate_warmup_subject, generate_warmup_body, generate_ai_warmup_content
     from app.services.warmup.smart_scheduler import should_skip_weekend
 
     if should_skip_weekend(db):
         return {"skipped": True, "reason": "Weekend - skipping warmup"}
 
-    enabled = _get_setting(db, "warmup_peer_enabled", True)
+    enabled = settings_cache.get(db, "warmup_peer_enabled", True)
     if not enabled:
         return {"skipped": True, "reason": "Peer warmup disabled"}
 
-    query = db.query(SenderMailbox).filter(
-        SenderMailbox.warmup_status.in_([WarmupStatus.WARMING_UP, WarmupStatus.RECOVERING]),
-        SenderMailbox.is_active == True,
-        SenderMailbox.connection_status == "successful",
-    )
-    if mailbox_id:
-        query = query.filter(SenderMailbox.mailbox_id == mailbox_id)
-
-    mailboxes = query.all()
+    # Senders and peers come from the same set, loaded once for the cycle
+    candidates = _warmup_candidates(db)
+    mailboxes = [mb for mb in candidates if mb.mailbox_id == mailbox_id] if mailbox_id else candidates
+    max_per_pair = _max_emails_per_pair(db)
     results = {"total": 0, "sent": 0, "failed": 0, "details": []}
+    # Rows for WarmupEmail, inserted together once the sends are done
+    new_emails: List[Dict[str, Any]] = []
 
+    # Compose on this thread (content and tracking read settings through the
+    # session), capped at each sender's remaining daily allowance
+    batches = []
     for mb in mailboxes:
-        if mb.emails_sent_today >= mb.daily_send_limit:
+        remaining = mb.daily_send_limit - mb.emails_sent_today
+        if remaining <= 0:
             continue
+        peers = get_peer_pairs(db, mb, max_per_pair, candidates)[:remaining]
+        if peers:
+            batches.append((mb, [_compose_peer_email(db, mb, peer) for peer in peers]))
+
+    # Senders are independent, so their sends run in parallel, each over its
+    # own pooled SMTP session; the session is never touched off this thread
+    outcomes = []
+    smtp_pool = SmtpSessionPool()
+    try:
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(len(batches), _max_concurrency(db))) as executor:
+                outcomes = list(executor.map(lambda batch: _send_peer_emails(batch[0], batch[1], smtp_pool), batches))
+    finally:
+        smtp_pool.close()
 
-        peers = get_peer_pairs(db, mb)
-        for peer in peers:
-            if mb.emails_sent_today >= mb.daily_send_limit:
-                break
-
-            sender_name = mb.display_name or mb.email.split("@")[0]
-            receiver_name = peer.display_name or peer.email.split("@")[0]
-
-            # Try AI content first, fallback to templates
-            ai_content = generate_ai_warmup_content(db, sender_name, receiver_name)
-            if ai_content:
-                subject = ai_content["subject"]
-                body_html = ai_content["body_html"]
-                body_text = ai_content["body_text"]
-                ai_generated = True
-                ai_provider = ai_content.get("ai_provider", "")
-            else:
-                subject = generate_warmup_subject()
-                body_text = generate_warmup_body(sender_name, receiver_name)
-                body_html = "<p>" + body_text.replace(chr(10)+chr(10), "</p><p>").replace(chr(10), "<br>") + "</p>"
-                ai_generated = False
-                ai_provider = None
-
-            tracking_id = str(uuid.uuid4())
-            # Inject tracking pixel into HTML body for open tracking
-            body_html = inject_tracking(body_html, tracking_id, db)
-
-            result = send_warmup_email(mb, peer.email, subject, body_html, body_text)
+    # One timestamp for the whole batch, in UTC like the reply cycle's cutoffs
+    now = datetime.utcnow()
+    for (mb, emails), sends in zip(batches, outcomes):
+        for email, result in zip(emails, sends):
+            peer = email["peer"]
             results["total"] += 1
-            email_record = WarmupEmail(
-                sender_mailbox_id=mb.mailbox_id,
-                receiver_mailbox_id=peer.mailbox_id,
-                subject=subject,
-                body_html=body_html,
-                body_text=body_text,
-                message_id=result.get("message_id", ""),
-                status=WarmupEmailStatus.SENT if result["success"] else WarmupEmailStatus.FAILED,
-                tracking_id=tracking_id,
-                ai_generated=ai_generated,
-                ai_provider=ai_provider,
-            )
-            db.add(email_record)
+            new_emails.append({
+                "sender_mailbox_id": mb.mailbox_id,
+                "receiver_mailbox_id": peer.mailbox_id,
+                "subject": email["subject"],
+                "body_html": email["body_html"],
+                "body_text": email["body_text"],
+                "message_id": result.get("message_id", ""),
+                "sent_at": now,
+                "status": WarmupEmailStatus.SENT if result["success"] else WarmupEmailStatus.FAILED,
+                "tracking_id": email["tracking_id"],
+                "ai_generated": email["ai_generated"],
+                "ai_provider": email["ai_provider"],
+            })
 
             if result["success"]:
                 results["sent"] += 1
@@ -150,6 +209,8 @@ def run_peer_warmup_cycle(db: Session, mailbox_id: int = None) -> Dict[str, Any]
                 "error": result.get("error"),
             })
 
+    if new_emails:
+        db.execute(insert(WarmupEmail), new_emails)
     db.commit()
     return results
 
@@ -170,13 +231,13 @@ def run_auto_reply_cycle(db: Session) -> Dict[str, Any]:
     if should_skip_weekend(db):
         return {"skipped": True, "reason": "Weekend - skipping auto-replies"}
 
-    enabled = _get_setting(db, "warmup_auto_reply_enabled", True)
+    enabled = settings_cache.get(db, "warmup_auto_reply_enabled", True)
     if not enabled:
         return {"skipped": True, "reason": "Auto-reply disabled"}
 
-    reply_rate_target = float(_get_setting(db, "warmup_auto_reply_rate", 0.5))
-    min_delay_minutes = int(_get_setting(db, "warmup_auto_reply_min_delay", 15))
-    max_delay_minutes = int(_get_setting(db, "warmup_auto_reply_max_delay", 90))
+    reply_rate_target = float(settings_cache.get(db, "warmup_auto_reply_rate", 0.5))
+    min_delay_minutes = int(settings_cache.get(db, "warmup_auto_reply_min_delay", 15))
+    max_delay_minutes = int(settings_cache.get(db, "warmup_auto_reply_max_delay", 90))
 
     now = datetime.utcnow()
     delay_cutoff = now - timedelta(minutes=min_delay_minutes)
@@ -192,97 +253,106 @@ def run_auto_reply_cycle(db: Session) -> Dict[str, Any]:
     ).all()
 
     results = {"total_candidates": len(unreplied), "replied": 0, "skipped": 0, "failed": 0, "details": []}
+    new_emails: List[Dict[str, Any]] = []
 
-    for email_record in unreplied:
-        # Randomly skip some emails to achieve a natural reply rate
-        if random.random() > reply_rate_target:
-            results["skipped"] += 1
-            continue
+    # Both ends of every candidate email, loaded in one query
+    mailbox_ids = {e.receiver_mailbox_id for e in unreplied} | {e.sender_mailbox_id for e in unreplied}
+    mailboxes = {
+        mb.mailbox_id: mb
+        for mb in db.query(SenderMailbox).filter(SenderMailbox.mailbox_id.in_(mailbox_ids)).all()
+    } if mailbox_ids else {}
 
-        # Check if this email has been sitting long enough (random per-email delay)
-        email_delay = random.randint(min_delay_minutes, max_delay_minutes)
-        if email_record.sent_at and (now - email_record.sent_at).total_seconds() < email_delay * 60:
-            results["skipped"] += 1
-            continue
-
-        # Get the receiver mailbox (the one who will send the reply)
-        receiver_mb = db.query(SenderMailbox).filter(
-            SenderMailbox.mailbox_id == email_record.receiver_mailbox_id,
-            SenderMailbox.is_active == True,
-            SenderMailbox.connection_status == "successful",
-        ).first()
-        if not receiver_mb:
-            results["skipped"] += 1
-            continue
-
-        # Get the sender mailbox email (reply goes back to them)
-        sender_mb = db.query(SenderMailbox).filter(
-            SenderMailbox.mailbox_id == email_record.sender_mailbox_id,
-        ).first()
-        if not sender_mb:
-            results["skipped"] += 1
-            continue
-
-        # Generate reply content
-        replier_name = receiver_mb.display_name or receiver_mb.email.split("@")[0]
-        reply_content = generate_warmup_reply(
-            original_subject=email_record.subject or "",
-            original_body=email_record.body_text or "",
-            sender_name=replier_name,
-            db=db,
-        )
-
-        # Send the reply
-        send_result = send_warmup_email(
-            receiver_mb, sender_mb.email,
-            reply_content["subject"], reply_content["body_html"], reply_content["body_text"],
-        )
-
-        if send_result["success"]:
-            # Update the original email record
-            email_record.replied_at = now
-            email_record.status = WarmupEmailStatus.REPLIED
-
-            # Update sender mailbox counters (they received a reply)
-            sender_mb.reply_count = (sender_mb.reply_count or 0) + 1
-            sender_mb.warmup_replies = (sender_mb.warmup_replies or 0) + 1
-
-            # Update receiver mailbox send counters
-            receiver_mb.emails_sent_today = (receiver_mb.emails_sent_today or 0) + 1
-            receiver_mb.total_emails_sent = (receiver_mb.total_emails_sent or 0) + 1
-            receiver_mb.warmup_emails_sent = (receiver_mb.warmup_emails_sent or 0) + 1
-
-            # Create a new email record for the reply itself
-            reply_record = WarmupEmail(
-                sender_mailbox_id=receiver_mb.mailbox_id,
-                receiver_mailbox_id=sender_mb.mailbox_id,
-                subject=reply_content["subject"],
-                body_html=reply_content["body_html"],
-                body_text=reply_content["body_text"],
-                message_id=send_result.get("message_id", ""),
-                status=WarmupEmailStatus.SENT,
-                tracking_id=str(uuid.uuid4()),
-                ai_generated=reply_content.get("ai_generated", False),
-                ai_provider=reply_content.get("ai_provider") if reply_content.get("ai_generated") else None,
+    smtp_pool = SmtpSessionPool()
+    try:
+        for email_record in unreplied:
+            # Randomly skip some emails to achieve a natural reply rate
+            if random.random() > reply_rate_target:
+                results["skipped"] += 1
+                continue
+
+            # Check if this email has been sitting long enough (random per-email delay)
+            email_delay = random.randint(min_delay_minutes, max_delay_minutes)
+            if email_record.sent_at and (now - email_record.sent_at).total_seconds() < email_delay * 60:
+                results["skipped"] += 1
+                continue
+
+            # Get the receiver mailbox (the one who will send the reply)
+            receiver_mb = mailboxes.get(email_record.receiver_mailbox_id)
+            if not receiver_mb or not receiver_mb.is_active or receiver_mb.connection_status != "successful":
+                results["skipped"] += 1
+                continue
+
+            # Get the sender mailbox email (reply goes back to them)
+            sender_mb = mailboxes.get(email_record.sender_mailbox_id)
+            if not sender_mb:
+                results["skipped"] += 1
+                continue
+
+            # Generate reply content
+            replier_name = receiver_mb.display_name or receiver_mb.email.split("@")[0]
+            reply_content = generate_warmup_reply(
+                original_subject=email_record.subject or "",
+                original_body=email_record.body_text or "",
+                sender_name=replier_name,
+                db=db,
             )
-            db.add(reply_record)
 
-            results["replied"] += 1
-            results["details"].append({
-                "original_id": email_record.id,
-                "replier": receiver_mb.email,
-                "reply_to": sender_mb.email,
-                "success": True,
-            })
-        else:
-            results["failed"] += 1
-            results["details"].append({
-                "original_id": email_record.id,
-                "replier": receiver_mb.email,
-                "reply_to": sender_mb.email,
-                "success": False,
-                "error": send_result.get("error"),
-            })
+            # Send the reply
+            send_result = send_warmup_email(
+                receiver_mb, sender_mb.email,
+                reply_content["subject"], reply_content["body_html"], reply_content["body_text"],
+                smtp_pool,
+            )
 
+            if send_result["success"]:
+                # Update the original email record
+                email_record.replied_at = now
+                email_record.status = WarmupEmailStatus.REPLIED
+
+                # Update sender mailbox counters (they received a reply)
+                sender_mb.reply_count = (sender_mb.reply_count or 0) + 1
+                sender_mb.warmup_replies = (sender_mb.warmup_replies or 0) + 1
+
+                # Update receiver mailbox send counters
+                receiver_mb.emails_sent_today = (receiver_mb.emails_sent_today or 0) + 1
+                receiver_mb.total_emails_sent = (receiver_mb.total_emails_sent or 0) + 1
+                receiver_mb.warmup_emails_sent = (receiver_mb.warmup_emails_sent or 0) + 1
+
+                # Record the reply itself
+                new_emails.append({
+                    "sender_mailbox_id": receiver_mb.mailbox_id,
+                    "receiver_mailbox_id": sender_mb.mailbox_id,
+                    "subject": reply_content["subject"],
+                    "body_html": reply_content["body_html"],
+                    "body_text": reply_content["body_text"],
+                    "message_id": send_result.get("message_id", ""),
+                    "sent_at": now,
+                    "status": WarmupEmailStatus.SENT,
+                    "tracking_id": str(uuid.uuid4()),
+                    "ai_generated": reply_content.get("ai_generated", False),
+                    "ai_provider": reply_content.get("ai_provider") if reply_content.get("ai_generated") else None,
+                })
+
+                results["replied"] += 1
+                results["details"].append({
+                    "original_id": email_record.id,
+                    "replier": receiver_mb.email,
+                    "reply_to": sender_mb.email,
+                    "success": True,
+                })
+            else:
+                results["failed"] += 1
+                results["details"].append({
+                    "original_id": email_record.id,
+                    "replier": receiver_mb.email,
+                    "reply_to": sender_mb.email,
+                    "success": False,
+                    "error": send_result.get("error"),
+                })
+    finally:
+        smtp_pool.close()
+
+    if new_emails:
+        db.execute(insert(WarmupEmail), new_emails)
     db.commit()
     return results
@@ -2,34 +2,40 @@
 import csv
 import io
 import json
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
 from app.db.models.warmup_daily_log import WarmupDailyLog
 from app.db.models.sender_mailbox import SenderMailbox
 
+# Rows fetched from the database per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
 
-def build_report_data(mailbox_ids: Optional[List[int]], days: int, db: Session) -> List[Dict[str, Any]]:
+REPORT_FIELDS = (
+    "date", "mailbox_id", "email", "emails_sent", "emails_received", "opens",
+    "replies", "bounces", "health_score", "warmup_day", "phase", "daily_limit",
+    "bounce_rate", "reply_rate",
+)
+
+
+def iter_report_rows(mailbox_ids: Optional[List[int]], days: int, db: Session) -> Iterator[Dict[str, Any]]:
+    """Yield report rows in date, mailbox order, streaming logs from the database."""
     start_date = (datetime.utcnow() - timedelta(days=days)).date()
-    query = db.query(WarmupDailyLog).filter(WarmupDailyLog.log_date >= start_date)
+    query = db.query(WarmupDailyLog, SenderMailbox.email).outerjoin(
+        SenderMailbox, SenderMailbox.mailbox_id == WarmupDailyLog.mailbox_id
+    ).filter(WarmupDailyLog.log_date >= start_date)
 
     if mailbox_ids:
         query = query.filter(WarmupDailyLog.mailbox_id.in_(mailbox_ids))
 
-    logs = query.order_by(WarmupDailyLog.log_date, WarmupDailyLog.mailbox_id).all()
-
-    # Get mailbox emails for reference
-    mb_ids = list(set(log.mailbox_id for log in logs))
-    mailboxes = {mb.mailbox_id: mb.email for mb in db.query(SenderMailbox).filter(SenderMailbox.mailbox_id.in_(mb_ids)).all()} if mb_ids else {}
-
-    data = []
-    for log in logs:
-        data.append({
+    query = query.order_by(WarmupDailyLog.log_date, WarmupDailyLog.mailbox_id).yield_per(EXPORT_BATCH_SIZE)
+    for log, email in query:
+        yield {
             "date": str(log.log_date),
             "mailbox_id": log.mailbox_id,
-            "email": mailboxes.get(log.mailbox_id, ""),
+            "email": email or "",
             "emails_sent": log.emails_sent,
             "emails_received": log.emails_received,
             "opens": log.opens,
@@ -41,22 +47,50 @@ def build_report_data(mailbox_ids: Optional[List[int]], days: int, db: Session)
             "daily_limit": log.daily_limit,
             "bounce_rate": log.bounce_rate,
             "reply_rate": log.reply_rate,
-        })
-    return data
+        }
 
 
-def export_csv(mailbox_ids: Optional[List[int]], days: int, db: Session) -> str:
-    data = build_report_data(mailbox_ids, days, db)
-    if not data:
-        return "No data available for export"
+def build_report_data(mailbox_ids: Optional[List[int]], days: int, db: Session) -> List[Dict[str, Any]]:
+    return list(iter_report_rows(mailbox_ids, days, db))
 
+
+def iter_csv(mailbox_ids: Optional[List[int]], days: int, db: Session) -> Iterator[str]:
+    """Yield the CSV export in chunks of up to EXPORT_BATCH_SIZE rows."""
+    rows = iter_report_rows(mailbox_ids, days, db)
     output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=data[0].keys())
+    writer = csv.DictWriter(output, fieldnames=REPORT_FIELDS)
     writer.writeheader()
-    writer.writerows(data)
-    return output.getvalue()
+    wrote_rows = False
+    while True:
+        # writerows consumes the slice directly, without building a list
+        start = output.tell()
+        writer.writerows(islice(rows, EXPORT_BATCH_SIZE))
+        if output.tell() == start:
+            break
+        wrote_rows = True
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+    if not wrote_rows:
+        yield "No data available for export"
+
+
+def iter_json(mailbox_ids: Optional[List[int]], days: int, db: Session) -> Iterator[str]:
+    """Yield the JSON export piece by piece; same document as ``export_json``."""
+    generated_at = str(datetime.utcnow())
+    rows = 0
+    yield '{\n  "report": ['
+    for row in iter_report_rows(mailbox_ids, days, db):
+        item = json.dumps(row, indent=2).replace("\n", "\n    ")
+        yield ("," if rows else "") + "\n    " + item
+        rows += 1
+    yield ("\n  ]" if rows else "]") + ",\n"
+    yield f'  "generated_at": {json.dumps(generated_at)},\n  "days": {json.dumps(days)},\n  "total_records": {rows}\n}}'
+
+
+def export_csv(mailbox_ids: Optional[List[int]], days: int, db: Session) -> str:
+    return "".join(iter_csv(mailbox_ids, days, db))
 
 
 def export_json(mailbox_ids: Optional[List[int]], days: int, db: Session) -> str:
-    data = build_report_data(mailbox_ids, days, db)
-    return json.dumps({"report": data, "generated_at": str(datetime.utcnow()), "days": days, "total_records": len(data)}, indent=2)
+    return "".join(iter_json(mailbox_ids, days, db))
@@ -132,16 +132,13 @@ def job_blacklist_checks():
     db = _get_db()
     try:
         from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
-        from app.services.warmup.blacklist_monitor import run_blacklist_check
-        mailboxes = db.query(SenderMailbox).filter(
+        from app.services.warmup.blacklist_monitor import run_blacklist_check_batch
+        mailbox_ids = [mailbox_id for (mailbox_id,) in db.query(SenderMailbox.mailbox_id).filter(
             SenderMailbox.warmup_status.in_([WarmupStatus.WARMING_UP, WarmupStatus.RECOVERING, WarmupStatus.COLD_READY, WarmupStatus.ACTIVE]),
             SenderMailbox.is_active == True,
-        ).all()
-        for mb in mailboxes:
-            try:
-                run_blacklist_check(mb.mailbox_id, db)
-            except Exception as e:
-                logger.error("Blacklist check failed", mailbox=mb.email, error=str(e))
+        ).all()]
+        summary = run_blacklist_check_batch(mailbox_ids, db)
+        logger.info("Blacklist checks complete", **summary)
     except Exception as e:
         logger.error("Blacklist checks failed", error=str(e))
     finally:
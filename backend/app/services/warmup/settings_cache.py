@@ -0,0 +1,89 @@
+"""Settings Cache - process-wide, TTL-bounded view of the Settings table."""
+import json
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.db.models.settings import Settings
+
+# Upper bound on how stale a value can be in processes that did not make the
+# change themselves (other workers, the scheduler)
+SETTINGS_CACHE_TTL_SECONDS = 60
+
+_lock = threading.Lock()
+_cache: Dict[str, Any] = {"version": 0, "data": None, "expires": 0.0}
+
+# Stored in place of values that are not valid JSON; get() turns it into the default
+_UNDECODABLE = object()
+
+
+def _decode(value_json: str) -> Any:
+    try:
+        value = json.loads(value_json)
+    except Exception:
+        return _UNDECODABLE
+    # Lists become tuples so callers cannot change the shared cached value
+    return tuple(value) if isinstance(value, list) else value
+
+
+def get_all(db: Session) -> Mapping[str, Any]:
+    """Return a read-only view of every setting as {key: decoded value}, reloading at most once per TTL.
+
+    Values are JSON-decoded once at load time and rows without a value are
+    left out. Use get() for single values: it also maps rows that are not
+    valid JSON to the caller's default.
+    """
+    with _lock:
+        if _cache["data"] is not None and time.monotonic() < _cache["expires"]:
+            return _cache["data"]
+        version = _cache["version"]
+
+    rows = db.query(Settings.key, Settings.value_json).all()
+    data = MappingProxyType({key: _decode(value_json) for key, value_json in rows if value_json})
+
+    with _lock:
+        # Don't store a snapshot that a concurrent write has already outdated
+        if _cache["version"] == version:
+            _cache["data"] = data
+            _cache["expires"] = time.monotonic() + SETTINGS_CACHE_TTL_SECONDS
+    return data
+
+
+def get(db: Session, key: str, default=None):
+    """Get a setting value, or ``default`` when it is missing, empty or not valid JSON."""
+    value = get_all(db).get(key, default)
+    return default if value is _UNDECODABLE else value
+
+
+def invalidate() -> None:
+    """Drop the cached settings so the next read goes to the database."""
+    with _lock:
+        _cache["version"] += 1
+        _cache["data"] = None
+
+
+def _mark_settings_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info["settings_changed"] = True
+
+
+def _invalidate_after_commit(session) -> None:
+    if session.info.pop("settings_changed", False):
+        invalidate()
+
+
+def _forget_after_rollback(session) -> None:
+    session.info.pop("settings_changed", None)
+
+
+# Any ORM write to Settings (settings API, warmup config API, seeding)
+# invalidates the cache once its transaction commits
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Settings, _event_name, _mark_settings_changed)
+event.listen(Session, "after_commit", _invalidate_after_commit)
+event.listen(Session, "after_rollback", _forget_after_rollback)
@@ -2,26 +2,15 @@
 import random
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-import json
 from sqlalchemy.orm import Session
 
-from app.db.models.settings import Settings
-
-
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+from app.services.warmup import settings_cache
 
 
 def get_send_window(db: Session) -> Dict[str, Any]:
-    start = _get_setting(db, "warmup_send_window_start", "09:00")
-    end = _get_setting(db, "warmup_send_window_end", "17:00")
-    tz = _get_setting(db, "warmup_timezone", "US/Eastern")
+    start = settings_cache.get(db, "warmup_send_window_start", "09:00")
+    end = settings_cache.get(db, "warmup_send_window_end", "17:00")
+    tz = settings_cache.get(db, "warmup_timezone", "US/Eastern")
     return {"start": start, "end": end, "timezone": tz}
 
 
@@ -38,8 +27,8 @@ def calculate_send_times(count: int, db: Session) -> List[datetime]:
     if count <= 0 or total_minutes <= 0:
         return []
 
-    min_gap = int(_get_setting(db, "warmup_min_gap_minutes", 15))
-    max_gap = int(_get_setting(db, "warmup_max_gap_minutes", 60))
+    min_gap = int(settings_cache.get(db, "warmup_min_gap_minutes", 15))
+    max_gap = int(settings_cache.get(db, "warmup_max_gap_minutes", 60))
 
     times = []
     current = base + timedelta(minutes=random.randint(0, min(30, total_minutes)))
@@ -59,7 +48,7 @@ def add_human_jitter(timestamp: datetime, max_jitter_seconds: int = 120) -> date
 
 
 def should_skip_weekend(db: Session) -> bool:
-    skip = _get_setting(db, "warmup_skip_weekends", True)
+    skip = settings_cache.get(db, "warmup_skip_weekends", True)
     if skip:
         today = datetime.utcnow().weekday()
         return today >= 5
@@ -1,22 +1,11 @@
 """Open/Click Tracking Service - tracking pixel and link redirect."""
 import uuid
-import json
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from app.db.models.warmup_email import WarmupEmail
-from app.db.models.settings import Settings
-
-
-def _get_setting(db: Session, key: str, default=None):
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting and setting.value_json:
-        try:
-            return json.loads(setting.value_json)
-        except Exception:
-            pass
-    return default
+from app.services.warmup import settings_cache
 
 
 def generate_tracking_pixel_url(tracking_id: str, base_url: str = None) -> str:
@@ -34,7 +23,7 @@ def generate_tracked_link(tracking_id: str, original_url: str, base_url: str = N
 def inject_tracking(html_body: str, tracking_id: str, db: Session = None) -> str:
     base_url = "http://localhost:8000"
     if db:
-        base_url = _get_setting(db, "warmup_tracking_base_url", base_url)
+        base_url = settings_cache.get(db, "warmup_tracking_base_url", base_url)
 
     pixel_url = generate_tracking_pixel_url(tracking_id, base_url)
     pixel_tag = f'<img src="{pixel_url}" width="1" height="1" style="display:none" alt="" />'
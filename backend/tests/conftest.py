@@ -14,6 +14,8 @@ from app.main import app
 from app.db.base import Base, get_db
 from app.core.security import get_password_hash, create_access_token
 from app.db.models.user import User, UserRole
+from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.services.warmup import dns_cache, settings_cache
 
 # Use SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -35,6 +37,21 @@ def override_get_db():
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def fresh_settings_cache():
+    """Settings cached by one test must not leak into the next one's database."""
+    settings_cache.invalidate()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_dns_cache():
+    """DNS answers cached by one test must not leak into the next."""
+    dns_cache.clear_dns_cache()
+    yield
+    dns_cache.clear_dns_cache()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test."""
@@ -47,6 +64,28 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def make_mailbox(db_session):
+    """Factory for a connected, warming-up sender mailbox; keyword arguments override any column."""
+    def make(email="sender@exzelon.com", **overrides):
+        values = {
+            "password": "secret",
+            "warmup_status": WarmupStatus.WARMING_UP,
+            "is_active": True,
+            "connection_status": "successful",
+            "daily_send_limit": 10,
+            "emails_sent_today": 0,
+            "total_emails_sent": 0,
+        }
+        values.update(overrides)
+        mailbox = SenderMailbox(email=email, **values)
+        db_session.add(mailbox)
+        db_session.flush()
+        return mailbox
+
+    return make
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database override."""
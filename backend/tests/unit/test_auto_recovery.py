@@ -0,0 +1,71 @@
+"""Unit tests for the warmup auto-recovery service."""
+from datetime import datetime, timedelta
+
+from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.db.models.warmup_alert import AlertType, WarmupAlert
+from app.services.warmup import auto_recovery
+from app.services.warmup.auto_recovery import run_auto_recovery_check
+
+
+def _days_ago(days):
+    return datetime.utcnow() - timedelta(days=days)
+
+
+class TestRunAutoRecoveryCheck:
+    """Tests for run_auto_recovery_check."""
+
+    def test_starts_recovery_only_after_wait_days(self, db_session, make_mailbox):
+        """Paused or blacklisted mailboxes recover once they have waited long enough."""
+        ready = make_mailbox("ready@exzelon.com", warmup_status=WarmupStatus.PAUSED, updated_at=_days_ago(5))
+        listed = make_mailbox("listed@exzelon.com", warmup_status=WarmupStatus.BLACKLISTED, updated_at=_days_ago(4))
+        recent = make_mailbox("recent@exzelon.com", warmup_status=WarmupStatus.PAUSED, updated_at=_days_ago(1))
+        active = make_mailbox("active@exzelon.com", warmup_status=WarmupStatus.ACTIVE, updated_at=_days_ago(30))
+        db_session.commit()
+
+        result = run_auto_recovery_check(db_session)
+
+        assert result == {"recovering_advanced": 0, "auto_started": 2}
+        db_session.expire_all()
+        statuses = {
+            mb.email: mb.warmup_status
+            for mb in db_session.query(SenderMailbox).all()
+        }
+        assert statuses == {
+            ready.email: WarmupStatus.RECOVERING,
+            listed.email: WarmupStatus.RECOVERING,
+            recent.email: WarmupStatus.PAUSED,
+            active.email: WarmupStatus.ACTIVE,
+        }
+
+    def test_resets_limits_and_raises_one_alert_each(self, db_session, make_mailbox):
+        """Started mailboxes begin at the recovery limit and each gets an AUTO_RECOVERED alert."""
+        make_mailbox("ready@exzelon.com", warmup_status=WarmupStatus.PAUSED, updated_at=_days_ago(5), emails_sent_today=7)
+        db_session.commit()
+
+        run_auto_recovery_check(db_session)
+
+        db_session.expire_all()
+        mailbox = db_session.query(SenderMailbox).one()
+        assert (mailbox.daily_send_limit, mailbox.emails_sent_today, mailbox.warmup_days_completed) == (2, 0, 0)
+        assert mailbox.auto_recovery_started_at is not None
+        alerts = db_session.query(WarmupAlert).all()
+        assert [(a.mailbox_id, a.alert_type, a.title) for a in alerts] == [
+            (mailbox.mailbox_id, AlertType.AUTO_RECOVERED, "Recovery started for ready@exzelon.com")
+        ]
+
+    def test_reads_ramp_factor_once(self, db_session, monkeypatch, make_mailbox):
+        """Recovering mailboxes share one ramp factor read per run."""
+        for i in range(3):
+            mailbox = make_mailbox(f"rec{i}@exzelon.com", warmup_status=WarmupStatus.RECOVERING, updated_at=_days_ago(0))
+            mailbox.warmup_days_completed = 0
+        db_session.commit()
+        reads = []
+        original = auto_recovery._recovery_ramp_factor
+        monkeypatch.setattr(auto_recovery, "_recovery_ramp_factor", lambda db: reads.append(db) or original(db))
+
+        result = run_auto_recovery_check(db_session)
+
+        assert result["recovering_advanced"] == 3
+        assert len(reads) == 1
+        db_session.expire_all()
+        assert {mb.daily_send_limit for mb in db_session.query(SenderMailbox).all()} == {15}
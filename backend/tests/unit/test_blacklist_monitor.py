@@ -0,0 +1,211 @@
+"""Unit tests for the blacklist monitor."""
+import threading
+
+import dns.resolver
+from sqlalchemy import event
+
+from app.db.models.blacklist_check_result import BlacklistCheckResult
+from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.services.warmup import blacklist_monitor
+
+
+class TestCheckIpBlacklists:
+    """Tests for check_ip_blacklists."""
+
+    def test_queries_providers_concurrently_in_order(self, monkeypatch):
+        """All providers are queried at once and results keep the provider order."""
+        providers = ["zen.example.org", "bl.example.net", "dnsbl.example.com"]
+        barrier = threading.Barrier(len(providers), timeout=5)
+
+        def fake_check(ip, provider, query_prefix=None):
+            barrier.wait()
+            return {"provider": provider, "listed": provider == "bl.example.net", "details": ""}
+
+        monkeypatch.setattr(blacklist_monitor, "check_ip_blacklist", fake_check)
+
+        results = blacklist_monitor.check_ip_blacklists("192.0.2.1", providers)
+
+        assert [r["provider"] for r in results] == providers
+        assert [r["listed"] for r in results] == [False, True, False]
+
+    def test_no_providers(self):
+        """An empty provider list yields no results."""
+        assert blacklist_monitor.check_ip_blacklists("192.0.2.1", []) == []
+
+    def test_sweep_builds_query_names(self, monkeypatch):
+        """A sweep queries each provider under the reversed IP."""
+        lookups = []
+
+        def fake_resolve(name, rdtype, **kwargs):
+            lookups.append(name)
+            raise dns.resolver.NXDOMAIN()
+
+        monkeypatch.setattr(dns.resolver, "resolve", fake_resolve)
+
+        results = blacklist_monitor.check_ip_blacklists("198.51.100.4", ["zen.example.org", "bl.example.net"])
+
+        assert [r["listed"] for r in results] == [False, False]
+        assert sorted(lookups) == ["4.100.51.198.bl.example.net", "4.100.51.198.zen.example.org"]
+
+
+class TestDnsCache:
+    """Tests for the A record and DNSBL answer caches."""
+
+    def test_domain_resolved_once(self, monkeypatch):
+        """Mailboxes on the same domain share one A lookup."""
+        lookups = []
+
+        def fake_resolve(name, rdtype, **kwargs):
+            lookups.append(name)
+            return ["192.0.2.7"]
+
+        monkeypatch.setattr(dns.resolver, "resolve", fake_resolve)
+
+        assert blacklist_monitor.resolve_domain_ip("exzelon.com") == "192.0.2.7"
+        assert blacklist_monitor.resolve_domain_ip("exzelon.com") == "192.0.2.7"
+        assert lookups == ["exzelon.com"]
+
+    def test_failed_resolution_is_retried(self, monkeypatch):
+        """A failed A lookup is not cached."""
+        lookups = []
+
+        def fake_resolve(name, rdtype, **kwargs):
+            lookups.append(name)
+            raise dns.resolver.NXDOMAIN()
+
+        monkeypatch.setattr(dns.resolver, "resolve", fake_resolve)
+
+        assert blacklist_monitor.resolve_domain_ip("missing.example") == ""
+        assert blacklist_monitor.resolve_domain_ip("missing.example") == ""
+        assert len(lookups) == 2
+
+    def test_dnsbl_answer_reused_per_ip_and_provider(self, monkeypatch):
+        """The same IP and provider are only queried once within the TTL."""
+        lookups = []
+
+        def fake_resolve(name, rdtype, **kwargs):
+            lookups.append(name)
+            return ["127.0.0.2"]
+
+        monkeypatch.setattr(dns.resolver, "resolve", fake_resolve)
+
+        first = blacklist_monitor.check_ip_blacklist("192.0.2.1", "zen.example.org")
+        second = blacklist_monitor.check_ip_blacklist("192.0.2.1", "zen.example.org")
+        other = blacklist_monitor.check_ip_blacklist("192.0.2.1", "bl.example.net")
+
+        assert first == second == {"provider": "zen.example.org", "listed": True, "details": "IP found on blacklist"}
+        assert other["provider"] == "bl.example.net"
+        assert lookups == ["1.2.0.192.zen.example.org", "1.2.0.192.bl.example.net"]
+
+    def test_only_negative_answers_are_cached_as_clean(self, monkeypatch):
+        """NXDOMAIN is cached as not listed; a timeout is reported but asked again next time."""
+        lookups = []
+
+        def fake_resolve(name, rdtype, **kwargs):
+            lookups.append(name)
+            if name.endswith("zen.example.org"):
+                raise dns.resolver.NXDOMAIN()
+            raise dns.resolver.LifetimeTimeout(timeout=2.0, errors=[])
+
+        monkeypatch.setattr(dns.resolver, "resolve", fake_resolve)
+
+        for _ in range(2):
+            clean = blacklist_monitor.check_ip_blacklist("192.0.2.1", "zen.example.org")
+            failed = blacklist_monitor.check_ip_blacklist("192.0.2.1", "bl.example.net")
+
+        assert clean == {"provider": "zen.example.org", "listed": False, "details": "Not listed"}
+        assert failed == {"provider": "bl.example.net", "listed": False, "details": "Lookup failed"}
+        assert lookups == ["1.2.0.192.zen.example.org", "1.2.0.192.bl.example.net", "1.2.0.192.bl.example.net"]
+
+
+class TestRunBlacklistCheckBatch:
+    """Tests for run_blacklist_check_batch."""
+
+    def test_checks_each_domain_once(self, db_session, monkeypatch, make_mailbox):
+        """Mailboxes on one domain share a lookup; results and flags land in one commit."""
+        clean_a = make_mailbox("a@clean.example")
+        clean_b = make_mailbox("b@clean.example")
+        listed = make_mailbox("c@listed.example")
+        paused = make_mailbox("d@listed.example", warmup_status=WarmupStatus.PAUSED)
+        db_session.commit()
+        ids = [clean_a.mailbox_id, clean_b.mailbox_id, listed.mailbox_id, paused.mailbox_id]
+
+        checked = []
+
+        def fake_check_domain(domain, providers):
+            checked.append(domain)
+            listed_flag = domain == "listed.example"
+            return "192.0.2.1", [{"provider": p, "listed": listed_flag, "details": ""} for p in providers]
+
+        monkeypatch.setattr(blacklist_monitor, "_check_domain", fake_check_domain)
+        # Count real COMMITs; savepoint releases also fire the session's after_commit
+        commits = []
+        engine = db_session.get_bind()
+        listener = lambda conn: commits.append(conn)
+        event.listen(engine, "commit", listener)
+        try:
+            result = blacklist_monitor.run_blacklist_check_batch(ids, db_session)
+        finally:
+            event.remove(engine, "commit", listener)
+
+        assert result == {"checked": 4, "listed": 2, "domains": 2}
+        assert sorted(checked) == ["clean.example", "listed.example"]
+        assert len(commits) == 1
+
+        db_session.expire_all()
+        rows = db_session.query(BlacklistCheckResult).all()
+        assert sorted(r.mailbox_id for r in rows) == sorted(ids)
+        assert {r.mailbox_id for r in rows if not r.is_clean} == {listed.mailbox_id, paused.mailbox_id}
+        assert not db_session.get(SenderMailbox, clean_a.mailbox_id).is_blacklisted
+        assert db_session.get(SenderMailbox, listed.mailbox_id).is_blacklisted
+        assert db_session.get(SenderMailbox, listed.mailbox_id).warmup_status == WarmupStatus.BLACKLISTED
+        assert db_session.get(SenderMailbox, paused.mailbox_id).warmup_status == WarmupStatus.PAUSED
+        assert db_session.get(SenderMailbox, clean_b.mailbox_id).last_blacklist_check_at is not None
+
+    def test_no_mailboxes(self, db_session):
+        """An empty id list does nothing."""
+        assert blacklist_monitor.run_blacklist_check_batch([], db_session) == {"checked": 0, "listed": 0, "domains": 0}
+
+    def test_failing_domain_does_not_drop_the_others(self, db_session, monkeypatch, make_mailbox):
+        """A domain whose check raises, or a mailbox without a domain, is skipped; the rest are saved."""
+        good = make_mailbox("a@good.example")
+        bad = make_mailbox("b@bad.example")
+        broken = make_mailbox("no-domain")
+        db_session.commit()
+        ids = [good.mailbox_id, bad.mailbox_id, broken.mailbox_id]
+
+        def fake_check_domain(domain, providers):
+            if domain == "bad.example":
+                raise RuntimeError("resolver exploded")
+            return "192.0.2.1", [{"provider": p, "listed": False, "details": ""} for p in providers]
+
+        monkeypatch.setattr(blacklist_monitor, "_check_domain", fake_check_domain)
+
+        result = blacklist_monitor.run_blacklist_check_batch(ids, db_session)
+
+        assert result == {"checked": 1, "listed": 0, "domains": 2}
+        db_session.expire_all()
+        assert [r.mailbox_id for r in db_session.query(BlacklistCheckResult).all()] == [ids[0]]
+        assert db_session.get(SenderMailbox, ids[0]).last_blacklist_check_at is not None
+        assert db_session.get(SenderMailbox, ids[1]).last_blacklist_check_at is None
+
+    def test_failed_insert_is_rolled_back_to_its_domain(self, db_session, monkeypatch, make_mailbox):
+        """An insert that fails for one domain leaves the other domains' results in place."""
+        good = make_mailbox("a@good.example")
+        bad = make_mailbox("b@bad.example")
+        db_session.commit()
+        ids = [good.mailbox_id, bad.mailbox_id]
+
+        def fake_check_domain(domain, providers):
+            # A list cannot be bound as ip_address, so this domain's INSERT fails
+            ip = ["192.0.2.2"] if domain == "bad.example" else "192.0.2.1"
+            return ip, [{"provider": p, "listed": False, "details": ""} for p in providers]
+
+        monkeypatch.setattr(blacklist_monitor, "_check_domain", fake_check_domain)
+
+        result = blacklist_monitor.run_blacklist_check_batch(ids, db_session)
+
+        assert result["checked"] == 1
+        db_session.expire_all()
+        assert [r.mailbox_id for r in db_session.query(BlacklistCheckResult).all()] == [ids[0]]
+        assert db_session.get(SenderMailbox, ids[1]).last_blacklist_check_at is None
@@ -0,0 +1,84 @@
+"""Unit tests for the warmup content generator."""
+import json
+
+import pytest
+
+from app.db.models.settings import Settings
+from app.services.adapters.ai.groq import GroqAdapter
+from app.services.warmup import content_generator
+from app.services.warmup.content_generator import (
+    BODY_TEMPLATES,
+    generate_warmup_body,
+    generate_warmup_reply,
+    get_ai_adapter,
+    text_to_html,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_adapter_cache(monkeypatch):
+    """Adapters cached by one test must not leak into the next."""
+    monkeypatch.setattr(content_generator, "_adapter_cache", {})
+
+
+class TestGenerateWarmupReply:
+    """Tests for the template fallback of generate_warmup_reply."""
+
+    def test_template_reply(self, monkeypatch):
+        """The chosen template is filled in for both text and HTML."""
+        monkeypatch.setattr("random.choice", lambda seq: seq[-1])
+
+        reply = generate_warmup_reply("Project status", "body", "Jane Doe")
+
+        assert reply == {
+            "subject": "Re: Project status",
+            "body_text": "Thanks Jane! Will take a look.\nBest,\nJane Doe",
+            "body_html": "<p>Thanks Jane! Will take a look.<br>Best,<br>Jane Doe</p>",
+            "ai_generated": False,
+        }
+
+    def test_keeps_existing_reply_prefix(self):
+        """A subject that is already a reply is not prefixed again."""
+        assert generate_warmup_reply("Re: Hello", "body", "Jane")["subject"] == "Re: Hello"
+
+
+class TestGenerateWarmupBody:
+    """Tests for generate_warmup_body."""
+
+    def test_every_category_yields_whole_templates(self):
+        """Each category picks a full template, never a single character."""
+        for category in BODY_TEMPLATES:
+            body = generate_warmup_body("Sam", "Alex", category)
+            assert body.startswith(("Hi Alex,", "Hey Alex,")) and body.endswith("Sam")
+
+
+class TestGetAiAdapter:
+    """Tests for get_ai_adapter."""
+
+    def test_no_api_key(self, db_session):
+        """Without an API key there is no adapter."""
+        assert get_ai_adapter(db_session) is None
+
+    def test_reuses_adapter_until_key_changes(self, db_session):
+        """The same adapter is returned until the provider's API key changes."""
+        key = Settings(key="groq_api_key", value_json=json.dumps("key-1"))
+        db_session.add(key)
+        db_session.commit()
+
+        first = get_ai_adapter(db_session)
+        assert isinstance(first, GroqAdapter) and first.api_key == "key-1"
+        assert get_ai_adapter(db_session) is first
+
+        key.value_json = json.dumps("key-2")
+        db_session.commit()
+
+        second = get_ai_adapter(db_session)
+        assert second is not first and second.api_key == "key-2"
+
+
+class TestTextToHtml:
+    """Tests for text_to_html."""
+
+    def test_paragraphs_and_line_breaks(self):
+        """Blank lines split paragraphs; single newlines become <br>."""
+        assert text_to_html("Hi Alex,\n\nThanks!\n\nBest,\nSam") == "<p>Hi Alex,</p><p>Thanks!</p><p>Best,<br>Sam</p>"
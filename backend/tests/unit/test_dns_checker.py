@@ -0,0 +1,123 @@
+"""Unit tests for the DNS health checker."""
+import threading
+
+import dns.resolver
+import pytest
+
+from app.services.warmup import dns_checker
+
+
+class TestCheckDomainRecords:
+    """Tests for check_domain_records."""
+
+    def test_runs_checks_concurrently(self, monkeypatch):
+        """All four lookups are in flight at once and come back in SPF, DKIM, DMARC, MX order."""
+        barrier = threading.Barrier(4, timeout=5)
+
+        def fake(name):
+            def check(domain, *args):
+                barrier.wait()
+                return {"check": name, "domain": domain, "args": args}
+            return check
+
+        for name in ("spf", "dkim", "dmarc", "mx"):
+            monkeypatch.setattr(dns_checker, f"check_{name}", fake(name))
+
+        results = dns_checker.check_domain_records("exzelon.com", "s1")
+
+        assert [r["check"] for r in results] == ["spf", "dkim", "dmarc", "mx"]
+        assert results[1]["args"] == ("s1",)
+        assert all(r["domain"] == "exzelon.com" for r in results)
+
+
+class _FakeResolver:
+    """Resolver double that records queries and answers with ``respond``."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.lookups = []
+
+    def resolve(self, name, rdtype):
+        self.lookups.append((name, rdtype))
+        return self.respond(name, rdtype)
+
+
+@pytest.fixture
+def use_resolver(monkeypatch):
+    """Install a fake shared resolver answering with the given function."""
+    def install(respond):
+        resolver = _FakeResolver(respond)
+        monkeypatch.setattr(dns_checker, "_get_resolver", lambda: resolver)
+        return resolver
+    return install
+
+
+class _Answer(list):
+    """Minimal stand-in for a dnspython answer with an rrset TTL."""
+
+    def __init__(self, records, ttl):
+        super().__init__(records)
+        self.rrset = type("RRset", (), {"ttl": ttl})()
+
+
+class _Txt:
+    def __init__(self, text):
+        self.text = text
+
+    def to_text(self):
+        return f'"{self.text}"'
+
+
+class TestRecordCache:
+    """Tests for the cached SPF/DKIM/DMARC/MX checks."""
+
+    def test_domain_checked_once_within_ttl(self, use_resolver):
+        """Repeated checks of one domain reuse the first answer."""
+        resolver = use_resolver(lambda name, rdtype: _Answer([_Txt("v=spf1 include:spf.protection.outlook.com -all")], 300))
+
+        first = dns_checker.check_spf("exzelon.com")
+        second = dns_checker.check_spf("exzelon.com")
+
+        assert first == second == {"valid": True, "record": "v=spf1 include:spf.protection.outlook.com -all"}
+        assert resolver.lookups == [("exzelon.com", "TXT")]
+
+    def test_dkim_cached_per_selector(self, use_resolver):
+        """Different DKIM selectors are looked up separately."""
+        resolver = use_resolver(lambda name, rdtype: _Answer([_Txt("v=DKIM1; k=rsa; p=abc")], 300))
+
+        dns_checker.check_dkim("exzelon.com", "s1")
+        dns_checker.check_dkim("exzelon.com", "s1")
+        dns_checker.check_dkim("exzelon.com", "s2")
+
+        assert [name for name, _ in resolver.lookups] == ["s1._domainkey.exzelon.com", "s2._domainkey.exzelon.com"]
+
+    def test_failures_are_not_cached(self, use_resolver):
+        """A failed lookup is retried on the next check."""
+        def fail(name, rdtype):
+            raise dns.resolver.NoNameservers()
+
+        resolver = use_resolver(fail)
+
+        assert dns_checker.check_mx("exzelon.com")["valid"] is False
+        assert dns_checker.check_mx("exzelon.com")["valid"] is False
+        assert len(resolver.lookups) == 2
+
+    def test_ttl_is_clamped(self):
+        """Record TTLs are kept within the configured bounds."""
+        assert dns_checker._record_ttl(_Answer([], 5)) == dns_checker.DNS_RECORD_CACHE_MIN_TTL
+        assert dns_checker._record_ttl(_Answer([], 86400)) == dns_checker.DNS_RECORD_CACHE_MAX_TTL
+        assert dns_checker._record_ttl([]) == dns_checker.DNS_RECORD_CACHE_DEFAULT_TTL
+
+
+class TestGetResolver:
+    """Tests for the shared resolver."""
+
+    def test_built_once_with_bounded_timeouts(self, monkeypatch):
+        """Every check shares one resolver with the configured timeouts."""
+        monkeypatch.setattr(dns_checker, "_resolver", None)
+
+        resolver = dns_checker._get_resolver()
+
+        assert dns_checker._get_resolver() is resolver
+        assert resolver.timeout == dns_checker.DNS_QUERY_TIMEOUT_SECONDS
+        assert resolver.lifetime == dns_checker.DNS_QUERY_LIFETIME_SECONDS
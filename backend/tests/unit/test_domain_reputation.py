@@ -0,0 +1,42 @@
+"""Unit tests for the domain reputation tracker."""
+from sqlalchemy import event
+
+from app.services.warmup.domain_reputation import get_domain_reputation, get_domain_reputation_bulk
+
+
+class TestGetDomainReputationBulk:
+    """Tests for get_domain_reputation_bulk."""
+
+    def test_scores_mailboxes_from_one_query(self, db_session, make_mailbox):
+        """Every mailbox is scored from a single SELECT, in the order asked for."""
+        clean = make_mailbox("clean@exzelon.com", dns_score=100, total_emails_sent=100, bounce_count=1)
+        listed = make_mailbox("listed@other.com", dns_score=100, is_blacklisted=True, total_emails_sent=100, bounce_count=6)
+        unsent = make_mailbox("new@exzelon.com", dns_score=70)
+        db_session.commit()
+        ids = [listed.mailbox_id, 9999, clean.mailbox_id, unsent.mailbox_id]
+        db_session.expire_all()
+
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            reputations = get_domain_reputation_bulk(ids, db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+        assert [(r["mailbox_id"], r["domain"], r["reputation_score"], r["bounce_rate"]) for r in reputations] == [
+            (ids[0], "other.com", 40, 6.0),
+            (ids[2], "exzelon.com", 100, 1.0),
+            (ids[3], "exzelon.com", 70, 0.0),
+        ]
+
+    def test_single_mailbox_api(self, db_session, make_mailbox):
+        """get_domain_reputation returns the bulk row, or an error for unknown ids."""
+        mailbox = make_mailbox("mb@exzelon.com", dns_score=100, total_emails_sent=50, bounce_count=2)
+        db_session.commit()
+
+        assert get_domain_reputation(mailbox.mailbox_id, db_session) == get_domain_reputation_bulk([mailbox.mailbox_id], db_session)[0]
+        assert get_domain_reputation(mailbox.mailbox_id, db_session)["reputation_score"] == 90
+        assert get_domain_reputation(9999, db_session) == {"error": "Mailbox not found"}
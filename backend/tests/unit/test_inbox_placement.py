@@ -0,0 +1,49 @@
+"""Unit tests for inbox placement testing."""
+import json
+import threading
+
+from app.db.models.sender_mailbox import SenderMailbox
+from app.db.models.settings import Settings
+from app.services.warmup import inbox_placement
+
+
+class TestRunPlacementTest:
+    """Tests for run_placement_test."""
+
+    def test_sends_to_every_seed_concurrently(self, db_session, monkeypatch):
+        """Plain and dict seeds are normalized and sent in parallel, results in seed order."""
+        mailbox = SenderMailbox(email="sender@exzelon.com", password="secret")
+        db_session.add(mailbox)
+        db_session.add(Settings(key="warmup_seed_emails_json", value_json=json.dumps([
+            "seed1@gmail.com",
+            {"email": "seed2@outlook.com", "provider": "outlook"},
+            {"email": "seed3@yahoo.com", "provider": "yahoo"},
+        ])))
+        db_session.commit()
+        barrier = threading.Barrier(3, timeout=5)
+        pools = set()
+
+        def fake_send(mb, seed_email, subject=None, smtp_pool=None):
+            barrier.wait()
+            pools.add(smtp_pool)
+            return {"success": seed_email != "seed3@yahoo.com", "error": None if seed_email != "seed3@yahoo.com" else "refused"}
+
+        monkeypatch.setattr(inbox_placement, "send_seed_email", fake_send)
+
+        result = inbox_placement.run_placement_test(mailbox.mailbox_id, db_session)
+
+        assert result["tests_sent"] == 3
+        assert [(r["seed_email"], r["provider"], r["sent"]) for r in result["results"]] == [
+            ("seed1@gmail.com", "unknown", True),
+            ("seed2@outlook.com", "outlook", True),
+            ("seed3@yahoo.com", "yahoo", False),
+        ]
+        assert len(pools) == 1 and None not in pools
+
+    def test_no_seeds(self, db_session):
+        """Without seed emails nothing is sent."""
+        mailbox = SenderMailbox(email="sender@exzelon.com", password="secret")
+        db_session.add(mailbox)
+        db_session.commit()
+
+        assert inbox_placement.run_placement_test(mailbox.mailbox_id, db_session)["error"] == "No seed emails configured"
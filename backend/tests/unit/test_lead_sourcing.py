@@ -0,0 +1,104 @@
+"""Unit tests for lead sourcing pipeline helpers."""
+from datetime import date
+from decimal import Decimal
+
+from openpyxl import load_workbook
+
+from app.db.models.lead import LeadDetails, LeadStatus
+from app.services.pipelines.lead_sourcing import (
+    LEAD_EXPORT_HEADERS,
+    export_leads_to_xlsx,
+    normalize_company_name,
+)
+
+
+class TestNormalizeCompanyName:
+    """Tests for normalize_company_name."""
+
+    def test_strips_legal_suffix(self):
+        """Legal entity suffixes should be removed."""
+        assert normalize_company_name("Acme, Inc.") == "acme"
+
+    def test_keeps_meaningful_words(self):
+        """Descriptive words must not collapse distinct companies."""
+        assert normalize_company_name("ABC Services") != normalize_company_name("ABC Solutions")
+
+
+class TestExportLeadsToXlsx:
+    """Tests for export_leads_to_xlsx."""
+
+    def test_writes_header_and_rows(self, db_session, tmp_path):
+        """Export should stream every lead as one row under the header."""
+        db_session.add(LeadDetails(
+            client_name="Acme Corp",
+            job_title="Plant Manager",
+            state="TX",
+            posting_date=date(2026, 1, 15),
+            salary_min=Decimal("55000.00"),
+            lead_status=LeadStatus.NEW,
+        ))
+        db_session.commit()
+
+        filepath = export_leads_to_xlsx(db_session, str(tmp_path / "leads.xlsx"))
+
+        rows = list(load_workbook(filepath, read_only=True).active.iter_rows(values_only=True))
+        assert rows[0] == LEAD_EXPORT_HEADERS
+        assert len(rows) == 2
+        assert rows[1][1] == "Acme Corp"
+        assert rows[1][4] == "2026-01-15"
+        assert rows[1][6] == 55000.0
+        assert rows[1][14] == "new"
+
+
+class TestImportLeadsFromFile:
+    """Tests for import_leads_from_file."""
+
+    def test_imports_rows_and_skips_duplicates(self, db_session, tmp_path, monkeypatch):
+        """Rows are inserted once; blank and duplicate rows are skipped."""
+        from openpyxl import Workbook
+        from tests.conftest import TestingSessionLocal
+        from app.services.pipelines import lead_sourcing
+
+        monkeypatch.setattr(lead_sourcing, "SessionLocal", TestingSessionLocal)
+        db_session.add(LeadDetails(client_name="Existing LLC", job_title="HR Manager", lead_status=LeadStatus.OPEN))
+        db_session.commit()
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(("Company", "Job Title", "State"))
+        ws.append(("Acme Inc.", "Plant Manager", "TX"))
+        ws.append(("Acme", "Plant Manager", "CA"))
+        ws.append(("Existing", "HR Manager", None))
+        ws.append((None, "Recruiter", "NY"))
+        filepath = tmp_path / "leads.xlsx"
+        wb.save(filepath)
+
+        counters = lead_sourcing.import_leads_from_file(str(filepath))
+
+        assert counters["inserted"] == 1
+        assert counters["skipped"] == 3
+        lead = db_session.query(LeadDetails).filter(LeadDetails.client_name == "Acme Inc.").one()
+        assert lead.state == "TX"
+
+    def test_skips_duplicates_across_chunks(self, db_session, tmp_path, monkeypatch):
+        """A row repeating one from an earlier, already committed chunk is still skipped."""
+        from openpyxl import Workbook
+        from tests.conftest import TestingSessionLocal
+        from app.services.pipelines import lead_sourcing
+
+        monkeypatch.setattr(lead_sourcing, "SessionLocal", TestingSessionLocal)
+        monkeypatch.setattr(lead_sourcing, "IMPORT_CHUNK_SIZE", 1)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(("Company", "Job Title", "State"))
+        ws.append(("Acme Inc.", "Plant Manager", "TX"))
+        ws.append(("Acme", "Plant Manager", "CA"))
+        ws.append(("Beta Co", "Plant Manager", "OH"))
+        filepath = tmp_path / "leads.xlsx"
+        wb.save(filepath)
+
+        counters = lead_sourcing.import_leads_from_file(str(filepath))
+
+        assert (counters["inserted"], counters["skipped"]) == (2, 1)
+        assert db_session.query(LeadDetails).filter(LeadDetails.job_title == "Plant Manager").count() == 2
@@ -0,0 +1,757 @@
+"""Unit tests for the outreach pipelines."""
+import csv
+import json
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.db.models.contact import ContactDetails
+from app.db.models.lead import LeadDetails, LeadStatus
+from app.db.models.outreach import OutreachEvent, OutreachStatus, OutreachChannel
+from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.db.models.suppression import SuppressionList
+from app.services.pipelines import outreach
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def outreach_db(db_session, tmp_path, monkeypatch):
+    """Point the outreach pipelines at the test database and a temp export dir."""
+    monkeypatch.setattr(outreach, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(settings, "EXPORT_PATH", str(tmp_path))
+    return db_session
+
+
+# What the send pipelines need from a mailbox on top of make_mailbox's defaults
+_SENDER = {
+    "warmup_status": WarmupStatus.ACTIVE,
+    "daily_send_limit": 30,
+    "email_signature_json": json.dumps({"sender_name": "Sam Sender"}),
+}
+
+
+def _add_contact(db, email, lead_id=None, client_name="Acme Corp", first_name="Pat"):
+    contact = ContactDetails(
+        lead_id=lead_id,
+        client_name=client_name,
+        first_name=first_name,
+        last_name="Lee",
+        email=email,
+        validation_status="valid",
+    )
+    db.add(contact)
+    db.flush()
+    return contact
+
+
+class TestMailmergePipeline:
+    """Tests for run_outreach_mailmerge_pipeline."""
+
+    def test_exports_eligible_contacts_and_records_events(self, outreach_db):
+        """Suppressed contacts are skipped; eligible ones get a CSV row and a SENT event."""
+        db = outreach_db
+        kept = _add_contact(db, "kept@acme.com", first_name="Zoë")
+        _add_contact(db, "gone@acme.com")
+        db.add(SuppressionList(email="gone@acme.com", reason="unsubscribed"))
+        db.commit()
+
+        counters = outreach.run_outreach_mailmerge_pipeline()
+
+        assert counters == {"eligible": 1, "skipped": 1, "exported": 1}
+        events = db.query(OutreachEvent).all()
+        assert [(e.contact_id, e.channel, e.status) for e in events] == [
+            (kept.contact_id, OutreachChannel.MAILMERGE, OutreachStatus.SENT)
+        ]
+        db.expire_all()
+        assert db.get(ContactDetails, kept.contact_id).last_outreach_date is not None
+
+        csv_files = [p for p in os.listdir(settings.EXPORT_PATH) if p.endswith(".csv")]
+        with open(os.path.join(settings.EXPORT_PATH, csv_files[0]), newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert tuple(rows[0]) == outreach.MAILMERGE_CSV_HEADERS
+        assert rows[1][:3] == ["Zoë", "Lee", "kept@acme.com"]
+
+    def test_cooldown_blocks_second_run(self, outreach_db):
+        """A contact sent in the first run is in cooldown for the second."""
+        db = outreach_db
+        _add_contact(db, "once@acme.com")
+        db.commit()
+
+        assert outreach.run_outreach_mailmerge_pipeline()["exported"] == 1
+        assert outreach.run_outreach_mailmerge_pipeline()["eligible"] == 0
+
+    def test_streams_candidates_in_pages(self, outreach_db, monkeypatch):
+        """Candidates spanning several pages all land in the CSV, in contact order."""
+        db = outreach_db
+        for i in range(5):
+            _add_contact(db, f"m{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+        monkeypatch.setattr(outreach, "ELIGIBILITY_QUERY_CHUNK_SIZE", 2)
+
+        counters = outreach.run_outreach_mailmerge_pipeline()
+
+        assert counters == {"eligible": 5, "skipped": 0, "exported": 5}
+        csv_files = [p for p in os.listdir(settings.EXPORT_PATH) if p.endswith(".csv")]
+        with open(os.path.join(settings.EXPORT_PATH, csv_files[0]), newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert [row[2] for row in rows[1:]] == [f"m{i}@acme.com" for i in range(5)]
+        assert db.query(OutreachEvent).count() == 5
+
+
+class TestSendPipeline:
+    """Tests for run_outreach_send_pipeline."""
+
+    def test_dry_run_records_skipped_events(self, outreach_db, make_mailbox):
+        """Dry runs record SKIPPED events and never call SMTP."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        _add_contact(db, "a@acme.com")
+        db.commit()
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=True, limit=5)
+
+        assert counters["sent"] == 0
+        events = db.query(OutreachEvent).all()
+        assert len(events) == 1
+        assert events[0].status == OutreachStatus.SKIPPED
+        assert events[0].skip_reason == "dry_run"
+
+    def test_send_updates_events_contacts_and_mailbox(self, outreach_db, monkeypatch, make_mailbox):
+        """Successful sends are recorded and counted against the mailbox."""
+        db = outreach_db
+        mailbox = make_mailbox(**_SENDER)
+        first = _add_contact(db, "a@acme.com", first_name="Ann")
+        _add_contact(db, "b@beta.com", client_name="Beta LLC")
+        db.commit()
+
+        sent = []
+
+        def fake_send(sender_mailbox, to_email, subject, body_html, body_text, **kwargs):
+            sent.append((sender_mailbox.email, to_email, subject, body_html))
+            return {"success": True, "message_id": "<x@exzelon.com>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=5)
+
+        assert counters["sent"] == 2
+        assert {to for _, to, _, _ in sent} == {"a@acme.com", "b@beta.com"}
+        ann = next(m for m in sent if m[1] == "a@acme.com")
+        assert ann[2] == "Exciting Opportunity at Acme Corp"
+        assert "Dear Ann," in ann[3] and "Sam Sender" in ann[3]
+
+        db.expire_all()
+        assert db.query(OutreachEvent).filter(OutreachEvent.status == OutreachStatus.SENT).count() == 2
+        assert db.get(ContactDetails, first.contact_id).last_outreach_date is not None
+        assert db.get(SenderMailbox, mailbox.mailbox_id).emails_sent_today == 2
+
+    def test_respects_limit(self, outreach_db, monkeypatch, make_mailbox):
+        """No more than `limit` messages are sent in one run."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(5):
+            _add_contact(db, f"c{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kw: {"success": True, "message_id": "<x@y>", "error": None},
+        )
+
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=2)["sent"] == 2
+
+    def test_skipped_contacts_do_not_starve_later_pages(self, outreach_db, monkeypatch, make_mailbox):
+        """Contacts beyond the first page are still reached when earlier ones are ineligible."""
+        from datetime import datetime, timedelta
+
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(settings.MAX_CONTACTS_PER_COMPANY_PER_JOB):
+            past = _add_contact(db, f"past{i}@capped.com", client_name="Capped Co")
+            past.validation_status = "invalid"
+            db.add(OutreachEvent(
+                contact_id=past.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT,
+                sent_at=datetime.utcnow() - timedelta(days=60)
+            ))
+        for i in range(4):
+            _add_contact(db, f"s{i}@capped.com", client_name="Capped Co")
+        _add_contact(db, "ok@acme.com", client_name="Okay Inc")
+        db.commit()
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kw: {"success": True, "message_id": "<x@y>", "error": None},
+        )
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=1)
+
+        assert counters["sent"] == 1
+        assert counters["skipped"] == 4
+
+    def test_suppressed_and_cooling_contacts_are_excluded_in_sql(self, outreach_db, monkeypatch, make_mailbox):
+        """Suppressed and recently contacted contacts never reach the send loop."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        _add_contact(db, "Blocked@acme.com", client_name="Blocked Co")
+        db.add(SuppressionList(email="blocked@acme.com", reason="manual"))
+        recent = _add_contact(db, "recent@acme.com", client_name="Recent Co")
+        db.add(OutreachEvent(contact_id=recent.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT))
+        _add_contact(db, "ok@acme.com", client_name="Okay Inc")
+        db.commit()
+        sent = []
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kw: sent.append(kw["to_email"]) or {"success": True, "message_id": "<x@y>", "error": None},
+        )
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=5)
+
+        assert sent == ["ok@acme.com"]
+        assert counters["skipped"] == 0
+
+    def test_daily_limit_counts_todays_sends(self, outreach_db, monkeypatch, make_mailbox):
+        """Today's SMTP sends count against the daily limit; mailmerge exports do not."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        old = _add_contact(db, "old@acme.com", client_name="Old Co")
+        merged = _add_contact(db, "merged@acme.com", client_name="Merge Co")
+        _add_contact(db, "new@acme.com", client_name="New Co")
+        db.add(OutreachEvent(contact_id=old.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT))
+        db.add(OutreachEvent(contact_id=merged.contact_id, channel=OutreachChannel.MAILMERGE, status=OutreachStatus.SENT))
+        db.commit()
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kw: {"success": True, "message_id": "<x@y>", "error": None},
+        )
+
+        monkeypatch.setattr(settings, "DAILY_SEND_LIMIT", 1)
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=5)["sent"] == 0
+
+        monkeypatch.setattr(settings, "DAILY_SEND_LIMIT", 2)
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=5)["sent"] == 1
+
+    def test_stops_fetching_pages_once_limit_is_reached(self, outreach_db, monkeypatch, make_mailbox):
+        """Filling the limit on the last contact of a page does not pull the next page."""
+        from datetime import datetime, timedelta
+        from sqlalchemy import event
+
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(6):
+            _add_contact(db, f"l{i}@acme.com", client_name=f"Company {i}")
+        # Cap "Company 0" so the first contact on the first page is skipped
+        monkeypatch.setattr(settings, "MAX_CONTACTS_PER_COMPANY_PER_JOB", 1)
+        past = _add_contact(db, "past@acme.com", client_name="Company 0")
+        past.validation_status = "invalid"
+        db.add(OutreachEvent(
+            contact_id=past.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT,
+            sent_at=datetime.utcnow() - timedelta(days=60)
+        ))
+        db.commit()
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kw: {"success": True, "message_id": "<x@y>", "error": None},
+        )
+        statements = []
+        engine = db.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            # page size is limit * 2, so the first page holds exactly 2 contacts
+            counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=1)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert counters["sent"] == 1
+        page_queries = [sql for sql in statements if "FROM contact_details" in sql and "LIMIT" in sql]
+        assert len(page_queries) == 1
+
+    def test_rotates_mailboxes_within_their_limits(self, outreach_db, monkeypatch, make_mailbox):
+        """Sends alternate across mailboxes and stop using one once its quota is spent."""
+        db = outreach_db
+        small = make_mailbox("small@exzelon.com", **{**_SENDER, "daily_send_limit": 1})
+        big = make_mailbox("big@exzelon.com", **_SENDER)
+        for i in range(4):
+            _add_contact(db, f"r{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+
+        senders = []
+
+        def fake_send(sender_mailbox, **kwargs):
+            senders.append(sender_mailbox.email)
+            return {"success": True, "message_id": "<x@y>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=10)
+
+        assert counters["sent"] == 4
+        assert senders.count("small@exzelon.com") == 1
+        db.expire_all()
+        assert db.get(SenderMailbox, small.mailbox_id).emails_sent_today == 1
+        assert db.get(SenderMailbox, big.mailbox_id).emails_sent_today == 3
+
+    def test_prefers_least_loaded_mailbox(self, outreach_db, monkeypatch, make_mailbox):
+        """A mailbox that already sent more today is only used once the others catch up."""
+        db = outreach_db
+        busy = make_mailbox("busy@exzelon.com", emails_sent_today=3, **_SENDER)
+        make_mailbox("idle@exzelon.com", **_SENDER)
+        for i in range(5):
+            _add_contact(db, f"l{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+
+        senders = []
+
+        def fake_send(sender_mailbox, **kwargs):
+            senders.append(sender_mailbox.email)
+            return {"success": True, "message_id": "<x@y>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=5)["sent"] == 5
+        assert senders.count("idle@exzelon.com") == 4
+        db.expire_all()
+        assert db.get(SenderMailbox, busy.mailbox_id).emails_sent_today == 4
+
+    def test_sends_run_concurrently(self, outreach_db, monkeypatch, make_mailbox):
+        """Messages in one wave are handed to SMTP in parallel."""
+        import threading
+
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(3):
+            _add_contact(db, f"p{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_send(**kwargs):
+            barrier.wait()
+            return {"success": True, "message_id": "<x@y>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=3)["sent"] == 3
+
+    def test_failed_sends_free_their_slot_under_the_limit(self, outreach_db, monkeypatch, make_mailbox):
+        """A failed send does not use up the run limit; a later contact takes its place."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        _add_contact(db, "bounce@acme.com", client_name="Bounce Co")
+        _add_contact(db, "ok1@acme.com", client_name="Okay One")
+        _add_contact(db, "ok2@acme.com", client_name="Okay Two")
+        db.commit()
+
+        def fake_send(to_email, **kwargs):
+            if to_email == "bounce@acme.com":
+                return {"success": False, "message_id": None, "error": "550 rejected"}
+            return {"success": True, "message_id": "<x@y>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=2)
+
+        assert counters["sent"] == 2
+        assert counters["errors"] == 1
+        skipped = db.query(OutreachEvent).filter(OutreachEvent.status == OutreachStatus.SKIPPED).one()
+        assert skipped.skip_reason == "550 rejected"
+
+    def test_signature_rendered_once_per_mailbox(self, outreach_db, monkeypatch, make_mailbox):
+        """Many messages from one mailbox render its signature a single time."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(5):
+            _add_contact(db, f"sig{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+        renders = []
+        real_render = outreach.render_signature_html
+        monkeypatch.setattr(
+            outreach, "render_signature_html",
+            lambda sig_json: renders.append(sig_json) or real_render(sig_json),
+        )
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=True, limit=5)
+
+        assert counters["skipped"] == 0
+        assert len(renders) == 1
+
+
+class TestOutreachForLead:
+    """Tests for run_outreach_for_lead."""
+
+    def test_reaches_fk_and_junction_contacts(self, outreach_db, make_mailbox):
+        """Contacts linked by FK or by the junction table are both targeted."""
+        from app.db.models.lead_contact import LeadContactAssociation
+
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        _add_contact(db, "fk@acme.com", lead_id=lead.lead_id)
+        other = _add_contact(db, "junction@acme.com")
+        db.add(LeadContactAssociation(lead_id=lead.lead_id, contact_id=other.contact_id))
+        _add_contact(db, "unrelated@acme.com")
+        db.commit()
+
+        counters = outreach.run_outreach_for_lead(lead.lead_id, dry_run=True)
+
+        assert counters["skipped"] == 0
+        events = db.query(OutreachEvent).filter(OutreachEvent.lead_id == lead.lead_id).all()
+        assert len(events) == 2
+        assert {e.subject for e in events} == {"Staffing for Plant Manager at Acme Corp"}
+
+    def test_send_records_events_and_contact_dates(self, outreach_db, monkeypatch, make_mailbox):
+        """Real sends write SENT events for the lead and stamp each contact."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        contact = _add_contact(db, "fk@acme.com", lead_id=lead.lead_id)
+        db.commit()
+
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kwargs: {"success": True, "message_id": "<x@exzelon.com>", "error": None}
+        )
+
+        counters = outreach.run_outreach_for_lead(lead.lead_id, dry_run=False)
+
+        assert counters["sent"] == 1
+        db.expire_all()
+        events = db.query(OutreachEvent).filter(OutreachEvent.lead_id == lead.lead_id).all()
+        assert [e.status for e in events] == [OutreachStatus.SENT]
+        assert events[0].sent_at is not None
+        assert db.get(ContactDetails, contact.contact_id).last_outreach_date is not None
+
+    def test_loads_only_the_columns_it_needs(self, outreach_db, make_mailbox):
+        """Contacts are fetched in one statement without unused columns, and nothing is lazy-loaded later."""
+        from sqlalchemy import event
+        from app.db.models.lead_contact import LeadContactAssociation
+
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        _add_contact(db, "fk@acme.com", lead_id=lead.lead_id)
+        other = _add_contact(db, "junction@acme.com")
+        db.add(LeadContactAssociation(lead_id=lead.lead_id, contact_id=other.contact_id))
+        lead_id = lead.lead_id
+        db.commit()
+
+        statements = []
+        engine = db.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            counters = outreach.run_outreach_for_lead(lead_id, dry_run=True)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert counters["skipped"] == 0
+        assert not [sql for sql in statements if "contact_details.last_name" in sql]
+        assert not [sql for sql in statements if "lead_details.skip_reason" in sql]
+
+    def test_per_lead_cap_counts_sends_from_the_same_run(self, outreach_db, monkeypatch, make_mailbox):
+        """A lead with more contacts than the cap only gets the cap's worth of sends in one run."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        for i in range(6):
+            _add_contact(db, f"c{i}@acme.com", lead_id=lead.lead_id)
+        db.commit()
+        monkeypatch.setattr(settings, "MAX_CONTACTS_PER_COMPANY_PER_JOB", 4)
+
+        results = iter([RuntimeError("connection reset")] + [None] * 5)
+
+        def fake_send(**kwargs):
+            result = next(results)
+            if result is not None:
+                raise result
+            return {"success": True, "message_id": "<x@exzelon.com>", "error": None}
+
+        monkeypatch.setattr(outreach, "send_outreach_email", fake_send)
+
+        counters = outreach.run_outreach_for_lead(lead.lead_id, dry_run=False)
+
+        # The failed send gives its slot back, but only after the wave is sent
+        assert counters["sent"] == 3
+        assert counters["errors"] == 1
+        assert counters["skipped"] == 2
+
+    def test_send_pipeline_caps_leads_across_pages(self, outreach_db, monkeypatch, make_mailbox):
+        """Queued sends count against the per-lead cap even when the lead's contacts span pages."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        for i in range(5):
+            _add_contact(db, f"s{i}@acme.com", lead_id=lead.lead_id)
+        db.commit()
+        monkeypatch.setattr(settings, "MAX_CONTACTS_PER_COMPANY_PER_JOB", 1)
+        monkeypatch.setattr(
+            outreach, "send_outreach_email",
+            lambda **kwargs: {"success": True, "message_id": "<x@exzelon.com>", "error": None}
+        )
+
+        # page size is limit * 2 = 4, so the last contact is on a second page
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=2)
+
+        assert counters["sent"] == 1
+        assert counters["skipped"] == 4
+
+
+class TestMessageTemplates:
+    """Tests for the precompiled outreach body templates."""
+
+    def test_html_fields_are_not_escaped(self):
+        """Field values come out raw, as the f-strings these replaced did."""
+        send_html = outreach._SEND_BODY_HTML_TPL.render(first_name="O'Brien", signature_html="<p>Sam</p>")
+        lead_html = outreach._LEAD_BODY_HTML_TPL.render(
+            first_name="O'Brien", company="AT&T", job_title="R&D Lead", signature_html="<p>Sam</p>"
+        )
+
+        assert send_html.startswith("<p>Dear O'Brien,</p>") and "<p>Sam</p>" in send_html
+        assert "AT&T" in lead_html and "R&D Lead" in lead_html and "O'Brien" in lead_html
+
+
+class TestEligibilityContext:
+    """Tests for build_eligibility_context and check_send_eligibility."""
+
+    def test_batched_checks_match_each_rule(self, outreach_db):
+        """Suppression, validation, cooldown and per-lead caps are all applied from one context."""
+        from datetime import datetime, timedelta
+        from app.db.models.email_validation import EmailValidationResult, ValidationStatus
+
+        db = outreach_db
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        ok = _add_contact(db, "ok@acme.com", client_name="Beta LLC")
+        suppressed = _add_contact(db, "Blocked@acme.com", client_name="Beta LLC")
+        unvalidated = _add_contact(db, "pending@acme.com", client_name="Beta LLC")
+        unvalidated.validation_status = "pending"
+        revalidated = _add_contact(db, "checked@acme.com", client_name="Beta LLC")
+        revalidated.validation_status = "pending"
+        cooling = _add_contact(db, "recent@acme.com", client_name="Beta LLC")
+        capped = _add_contact(db, "capped@acme.com", lead_id=lead.lead_id)
+        db.add(SuppressionList(email="blocked@acme.com", reason="unsubscribed"))
+        db.add(EmailValidationResult(
+            email="checked@acme.com", provider="mock", status=ValidationStatus.INVALID,
+            validated_at=datetime.utcnow() - timedelta(days=2)
+        ))
+        db.add(EmailValidationResult(
+            email="checked@acme.com", provider="mock", status=ValidationStatus.VALID,
+            validated_at=datetime.utcnow()
+        ))
+        db.add(OutreachEvent(
+            contact_id=cooling.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT
+        ))
+        for i in range(settings.MAX_CONTACTS_PER_COMPANY_PER_JOB):
+            sibling = _add_contact(db, f"sibling{i}@acme.com", lead_id=lead.lead_id)
+            db.add(OutreachEvent(
+                contact_id=sibling.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT,
+                sent_at=datetime.utcnow() - timedelta(days=365)
+            ))
+        db.commit()
+
+        contacts = [ok, suppressed, unvalidated, revalidated, cooling, capped]
+        ctx = outreach.build_eligibility_context(db, contacts)
+        results = {c.email: outreach.check_send_eligibility(c, ctx) for c in contacts}
+
+        assert results["ok@acme.com"] == (True, "Eligible")
+        assert results["checked@acme.com"] == (True, "Eligible")
+        assert results["Blocked@acme.com"] == (False, "Suppressed: unsubscribed")
+        assert results["pending@acme.com"] == (False, "Email not validated or invalid")
+        assert results["recent@acme.com"][1].startswith("Cooldown: sent on")
+        assert results["capped@acme.com"][1].startswith("Max contacts per lead reached")
+
+    def test_query_count_does_not_grow_with_contacts(self, outreach_db):
+        """Building the context costs the same number of queries for 3 or 30 contacts."""
+        from sqlalchemy import event
+
+        db = outreach_db
+        contacts = []
+        for i in range(30):
+            contact = _add_contact(db, f"q{i}@acme.com", client_name=f"Company {i % 3}")
+            if i % 2:
+                contact.validation_status = "pending"
+            contacts.append(contact)
+        db.commit()
+        contacts = db.query(ContactDetails).order_by(ContactDetails.contact_id).all()
+
+        statements = []
+
+        def count_statement(*args):
+            statements.append(1)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            outreach.build_eligibility_context(db, contacts[:3])
+            small = len(statements)
+            statements.clear()
+            outreach.build_eligibility_context(db, contacts)
+            large = len(statements)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert small == large
+
+    def test_company_cap_applies_to_contacts_without_lead(self, outreach_db):
+        """Legacy contacts without a lead are capped per client_name."""
+        db = outreach_db
+        for i in range(settings.MAX_CONTACTS_PER_COMPANY_PER_JOB):
+            sent = _add_contact(db, f"old{i}@acme.com")
+            db.add(OutreachEvent(contact_id=sent.contact_id, channel=OutreachChannel.SMTP, status=OutreachStatus.SENT))
+        fresh = _add_contact(db, "fresh@acme.com")
+        other = _add_contact(db, "fresh@beta.com", client_name="Beta LLC")
+        db.commit()
+
+        ctx = outreach.build_eligibility_context(db, [fresh, other])
+
+        assert outreach.check_send_eligibility(fresh, ctx) == (False, "Max contacts per company reached")
+        assert outreach.check_send_eligibility(other, ctx) == (True, "Eligible")
+
+    def test_prefiltered_context_skips_sql_enforced_lookups(self, outreach_db):
+        """Candidates from _send_candidate_criteria only need the cap lookups."""
+        from sqlalchemy import event
+
+        db = outreach_db
+        lead = LeadDetails(client_name="Acme Corp", job_title="Plant Manager", lead_status=LeadStatus.OPEN)
+        db.add(lead)
+        db.flush()
+        _add_contact(db, "a@acme.com", lead_id=lead.lead_id)
+        _add_contact(db, "b@beta.com", client_name="Beta LLC")
+        db.commit()
+        contacts = db.query(ContactDetails).all()
+
+        statements = []
+        engine = db.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            ctx = outreach.build_eligibility_context(db, contacts, prefiltered=True)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 2
+        assert not any("suppression_list" in sql for sql in statements)
+        assert all(outreach.check_send_eligibility(c, ctx)[0] for c in contacts)
+
+    def test_suppression_emails_are_stored_lowercase(self, outreach_db):
+        """Mixed-case suppression entries still block the matching contact."""
+        db = outreach_db
+        contact = _add_contact(db, "upper@acme.com")
+        db.add(SuppressionList(email="UPPER@Acme.com", reason="bounced"))
+        db.commit()
+
+        assert db.query(SuppressionList.email).scalar() == "upper@acme.com"
+        ctx = outreach.build_eligibility_context(db, [contact])
+        assert outreach.check_send_eligibility(contact, ctx) == (False, "Suppressed: bounced")
+
+
+class _FakeSMTP:
+    """Stand-in for smtplib.SMTP that records connections and messages."""
+
+    instances = []
+    drop_next = 0
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.quit_called = False
+        _FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, from_addr, to_addr, message):
+        import smtplib
+
+        if _FakeSMTP.drop_next:
+            _FakeSMTP.drop_next -= 1
+            raise smtplib.SMTPServerDisconnected("dropped")
+        self.sent.append(to_addr)
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        pass
+
+
+class TestSmtpSessionPool:
+    """Tests for SMTP session reuse in the send pipelines."""
+
+    @pytest.fixture(autouse=True)
+    def fake_smtp(self, monkeypatch):
+        import smtplib
+
+        _FakeSMTP.instances = []
+        _FakeSMTP.drop_next = 0
+        monkeypatch.setattr(smtplib, "SMTP", _FakeSMTP)
+        monkeypatch.setattr(settings, "SMTP_SEND_CONCURRENCY", 1)
+
+    def test_one_session_per_mailbox_for_the_whole_run(self, outreach_db, make_mailbox):
+        """All messages from one mailbox share a session that is quit at the end."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(3):
+            _add_contact(db, f"smtp{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=5)
+
+        assert counters["sent"] == 3
+        assert len(_FakeSMTP.instances) == 1
+        session = _FakeSMTP.instances[0]
+        assert sorted(session.sent) == ["smtp0@acme.com", "smtp1@acme.com", "smtp2@acme.com"]
+        assert session.quit_called
+
+    def test_reconnects_once_when_the_server_drops_the_session(self, outreach_db, make_mailbox):
+        """A dropped session is replaced and the message is retried on the new one."""
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        _add_contact(db, "retry@acme.com")
+        db.commit()
+        _FakeSMTP.drop_next = 1
+
+        counters = outreach.run_outreach_send_pipeline(dry_run=False, limit=5)
+
+        assert counters["sent"] == 1
+        assert len(_FakeSMTP.instances) == 2
+        assert _FakeSMTP.instances[1].sent == ["retry@acme.com"]
+
+    def test_sessions_are_recycled_after_max_messages(self, outreach_db, monkeypatch, make_mailbox):
+        """A session is quit and replaced once it has carried SMTP_MAX_MESSAGES_PER_CONN messages."""
+        monkeypatch.setattr(settings, "SMTP_MAX_MESSAGES_PER_CONN", 2)
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(3):
+            _add_contact(db, f"cycle{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=5)["sent"] == 3
+
+        assert [len(s.sent) for s in _FakeSMTP.instances] == [2, 1]
+        assert all(s.quit_called for s in _FakeSMTP.instances)
+
+    def test_concurrent_workers_respect_per_mailbox_session_cap(self, outreach_db, monkeypatch, make_mailbox):
+        """Parallel workers never open more sessions on a mailbox than the pool size allows."""
+        monkeypatch.setattr(settings, "SMTP_SEND_CONCURRENCY", 8)
+        monkeypatch.setattr(settings, "SMTP_POOL_SIZE_PER_MAILBOX", 1)
+        db = outreach_db
+        make_mailbox(**_SENDER)
+        for i in range(4):
+            _add_contact(db, f"cap{i}@acme.com", client_name=f"Company {i}")
+        db.commit()
+
+        assert outreach.run_outreach_send_pipeline(dry_run=False, limit=5)["sent"] == 4
+
+        assert len(_FakeSMTP.instances) == 1
@@ -0,0 +1,175 @@
+"""Unit tests for the peer warmup service."""
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models.sender_mailbox import SenderMailbox
+from app.db.models.settings import Settings
+from app.db.models.warmup_email import WarmupEmail, WarmupEmailStatus
+from app.services.warmup import peer_warmup
+
+
+class _FakePool:
+    """Stand-in for SmtpSessionPool that records deliveries."""
+
+    instances = []
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        _FakePool.instances.append(self)
+
+    def sendmail(self, mailbox, to_email, message):
+        self.sent.append((mailbox.email, to_email))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Weekday cycle whose SMTP sessions come from a recording pool."""
+    _FakePool.instances = []
+    monkeypatch.setattr("app.services.warmup.smart_scheduler.should_skip_weekend", lambda db: False)
+    monkeypatch.setattr(peer_warmup, "SmtpSessionPool", _FakePool)
+    return _FakePool.instances
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Weekday cycle with SMTP replaced by a recorder of (sender, receiver) pairs."""
+    sent = []
+    monkeypatch.setattr("app.services.warmup.smart_scheduler.should_skip_weekend", lambda db: False)
+
+    def fake_send(sender_mailbox, receiver_email, subject, body_html, body_text, smtp_pool=None):
+        sent.append((sender_mailbox.email, receiver_email))
+        return {"success": True, "message_id": f"<{len(sent)}@exzelon.com>"}
+
+    monkeypatch.setattr(peer_warmup, "send_warmup_email", fake_send)
+    return sent
+
+
+class TestRunPeerWarmupCycle:
+    """Tests for run_peer_warmup_cycle."""
+
+    def test_reads_pair_limit_once(self, db_session, sent, monkeypatch, make_mailbox):
+        """The per-pair limit is read once per cycle and caps each sender's peers."""
+        for i in range(4):
+            make_mailbox(f"mb{i}@exzelon.com")
+        db_session.add(Settings(key="warmup_peer_max_emails_per_pair", value_json=json.dumps(2)))
+        db_session.commit()
+        reads = []
+        original = peer_warmup._max_emails_per_pair
+        monkeypatch.setattr(peer_warmup, "_max_emails_per_pair", lambda db: reads.append(db) or original(db))
+
+        result = peer_warmup.run_peer_warmup_cycle(db_session)
+
+        assert len(reads) == 1
+        assert result["sent"] == 8 and result["failed"] == 0
+        assert all(sender != receiver for sender, receiver in sent)
+        assert db_session.query(WarmupEmail).count() == 8
+
+    def test_sends_over_one_pool_per_cycle(self, db_session, fake_pool, make_mailbox):
+        """All peer emails of a cycle share one session pool, closed at the end."""
+        for i in range(3):
+            make_mailbox(f"mb{i}@exzelon.com")
+        db_session.commit()
+
+        result = peer_warmup.run_peer_warmup_cycle(db_session)
+
+        assert len(fake_pool) == 1
+        assert fake_pool[0].closed
+        assert len(fake_pool[0].sent) == result["sent"] == 6
+
+    def test_sends_for_mailboxes_in_parallel(self, db_session, monkeypatch, make_mailbox):
+        """Each sender's emails go out from its own worker, alongside the other senders."""
+        for i in range(3):
+            make_mailbox(f"mb{i}@exzelon.com")
+        db_session.commit()
+        monkeypatch.setattr("app.services.warmup.smart_scheduler.should_skip_weekend", lambda db: False)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_send(sender_mailbox, receiver_email, subject, body_html, body_text, smtp_pool=None):
+            barrier.wait()
+            return {"success": True, "message_id": "<1@exzelon.com>"}
+
+        monkeypatch.setattr(peer_warmup, "send_warmup_email", fake_send)
+
+        result = peer_warmup.run_peer_warmup_cycle(db_session)
+
+        assert (result["sent"], result["failed"]) == (6, 0)
+        assert db_session.query(WarmupEmail).count() == 6
+
+    def test_stamps_batch_with_one_utc_time(self, db_session, sent, make_mailbox):
+        """Every email of a cycle records the same UTC send time."""
+        for i in range(3):
+            make_mailbox(f"mb{i}@exzelon.com")
+        db_session.commit()
+        before = datetime.utcnow()
+
+        peer_warmup.run_peer_warmup_cycle(db_session)
+
+        stamps = {sent_at for (sent_at,) in db_session.query(WarmupEmail.sent_at)}
+        assert len(stamps) == 1
+        assert before <= stamps.pop() <= datetime.utcnow()
+
+    def test_caps_sends_at_remaining_daily_limit(self, db_session, sent, make_mailbox):
+        """A sender only gets as many emails as it has left for the day."""
+        make_mailbox("mb0@exzelon.com")
+        make_mailbox("mb1@exzelon.com")
+        limited = make_mailbox("mb2@exzelon.com", daily_send_limit=1)
+        db_session.commit()
+
+        peer_warmup.run_peer_warmup_cycle(db_session)
+
+        assert sum(1 for sender, _ in sent if sender == limited.email) == 1
+        db_session.expire_all()
+        assert db_session.get(SenderMailbox, limited.mailbox_id).emails_sent_today == 1
+
+
+class TestRunAutoReplyCycle:
+    """Tests for run_auto_reply_cycle."""
+
+    def test_loads_mailboxes_in_one_query(self, db_session, fake_pool, make_mailbox):
+        """Both ends of every candidate are fetched together, and inactive receivers are skipped."""
+        a = make_mailbox("a@exzelon.com")
+        b = make_mailbox("b@exzelon.com")
+        c = make_mailbox("c@exzelon.com")
+        c.is_active = False
+        two_hours_ago = datetime.utcnow() - timedelta(hours=2)
+        for sender, receiver in ((a, b), (b, a), (a, c)):
+            db_session.add(WarmupEmail(
+                sender_mailbox_id=sender.mailbox_id,
+                receiver_mailbox_id=receiver.mailbox_id,
+                subject="Quick question",
+                body_text="Hi",
+                status=WarmupEmailStatus.SENT,
+                sent_at=two_hours_ago,
+            ))
+        db_session.add(Settings(key="warmup_auto_reply_rate", value_json=json.dumps(1.0)))
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            result = peer_warmup.run_auto_reply_cycle(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert (result["replied"], result["skipped"], result["failed"]) == (2, 1, 0)
+        assert sorted(fake_pool[0].sent) == [("a@exzelon.com", "b@exzelon.com"), ("b@exzelon.com", "a@exzelon.com")]
+        mailbox_selects = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM sender_mailboxes" in s]
+        assert len(mailbox_selects) == 1
+        email_inserts = [s for s in statements if s.lstrip().startswith("INSERT INTO warmup_emails")]
+        assert len(email_inserts) == 1
+        db_session.expire_all()
+        replies = db_session.query(WarmupEmail).filter(WarmupEmail.subject == "Re: Quick question").all()
+        assert sorted((r.sender_mailbox_id, r.receiver_mailbox_id) for r in replies) == sorted(
+            [(b.mailbox_id, a.mailbox_id), (a.mailbox_id, b.mailbox_id)]
+        )
+        assert all(r.status == WarmupEmailStatus.SENT and r.sent_at is not None for r in replies)
@@ -0,0 +1,90 @@
+"""Unit tests for the warmup report exporter."""
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from app.db.models.sender_mailbox import SenderMailbox
+from app.db.models.warmup_daily_log import WarmupDailyLog
+from app.services.warmup import report_exporter
+
+
+def _add_logs(db, days=3):
+    mailboxes = [SenderMailbox(email=f"mb{i}@exzelon.com", password="secret") for i in range(2)]
+    db.add_all(mailboxes)
+    db.flush()
+    for offset in range(days):
+        for mailbox in mailboxes:
+            db.add(WarmupDailyLog(
+                mailbox_id=mailbox.mailbox_id,
+                log_date=date.today() - timedelta(days=offset),
+                emails_sent=offset,
+                health_score=80.0,
+            ))
+    db.commit()
+    return mailboxes
+
+
+class TestIterCsv:
+    """Tests for iter_csv."""
+
+    def test_streams_rows_in_batches(self, db_session, monkeypatch):
+        """The CSV comes out in chunks of EXPORT_BATCH_SIZE rows with one header."""
+        mailboxes = _add_logs(db_session)
+        monkeypatch.setattr(report_exporter, "EXPORT_BATCH_SIZE", 4)
+
+        chunks = list(report_exporter.iter_csv(None, 30, db_session))
+
+        assert len(chunks) == 2
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        assert len(rows) == 6
+        assert [r["date"] for r in rows] == sorted(r["date"] for r in rows)
+        assert {r["email"] for r in rows} == {mb.email for mb in mailboxes}
+
+    def test_no_trailing_chunk_on_batch_boundary(self, db_session, monkeypatch):
+        """When the rows fill the last batch exactly, no empty chunk follows."""
+        _add_logs(db_session)
+        monkeypatch.setattr(report_exporter, "EXPORT_BATCH_SIZE", 3)
+
+        chunks = list(report_exporter.iter_csv(None, 30, db_session))
+
+        assert len(chunks) == 2 and all(chunks)
+        assert chunks[0].startswith("date,mailbox_id,email,") and not chunks[1].startswith("date,")
+
+    def test_no_data(self, db_session):
+        """An empty report keeps the plain-text notice."""
+        assert report_exporter.export_csv(None, 30, db_session) == "No data available for export"
+
+
+class TestIterJson:
+    """Tests for iter_json."""
+
+    def test_document_matches_rows(self, db_session):
+        """The streamed JSON parses to the report rows plus metadata."""
+        mailboxes = _add_logs(db_session)
+
+        document = json.loads(report_exporter.export_json([mailboxes[0].mailbox_id], 30, db_session))
+
+        assert document["days"] == 30
+        assert document["total_records"] == 3
+        assert document["report"] == report_exporter.build_report_data([mailboxes[0].mailbox_id], 30, db_session)
+
+    def test_non_ascii_and_float_formatting(self, db_session):
+        """Rows keep json.dumps formatting: non-ASCII is escaped and floats use repr."""
+        mailbox = SenderMailbox(email="jörg@exzelon.com", password="secret")
+        db_session.add(mailbox)
+        db_session.flush()
+        db_session.add(WarmupDailyLog(mailbox_id=mailbox.mailbox_id, log_date=date.today(), bounce_rate=1e-05))
+        db_session.commit()
+
+        text = report_exporter.export_json(None, 30, db_session)
+
+        assert '"email": "j\\u00f6rg@exzelon.com"' in text
+        assert '"bounce_rate": 1e-05' in text
+        assert json.loads(text)["report"][0]["email"] == "jörg@exzelon.com"
+
+    def test_empty_report(self, db_session):
+        """With no rows the report is an empty list."""
+        document = json.loads(report_exporter.export_json(None, 7, db_session))
+
+        assert document["report"] == [] and document["total_records"] == 0
@@ -0,0 +1,80 @@
+"""Unit tests for the warmup settings cache."""
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models.settings import Settings
+from app.services.warmup import settings_cache
+
+
+def _count_statements(db, fn):
+    statements = []
+    engine = db.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+class TestSettingsCache:
+    """Tests for settings_cache.get and get_all."""
+
+    def test_decodes_values_and_falls_back_to_default(self, db_session):
+        """JSON values are decoded; missing, empty and non-JSON values use the default."""
+        db_session.add(Settings(key="warmup_ai_temperature", value_json=json.dumps(0.5)))
+        db_session.add(Settings(key="warmup_peer_max_emails_per_pair", value_json="three"))
+        db_session.add(Settings(key="warmup_ai_provider", value_json=""))
+        db_session.commit()
+
+        assert settings_cache.get(db_session, "warmup_ai_temperature") == 0.5
+        assert settings_cache.get(db_session, "warmup_peer_max_emails_per_pair", 3) == 3
+        assert settings_cache.get(db_session, "warmup_ai_provider", "groq") == "groq"
+        assert settings_cache.get(db_session, "missing", 3) == 3
+
+    def test_cached_values_are_read_only(self, db_session):
+        """Callers get a read-only view, so they cannot change the process-wide cache."""
+        db_session.add(Settings(key="warmup_blacklist_providers", value_json=json.dumps(["a.example", "b.example"])))
+        db_session.commit()
+
+        stored = settings_cache.get_all(db_session)
+        with pytest.raises(TypeError):
+            stored["warmup_blacklist_providers"] = []
+        assert settings_cache.get(db_session, "warmup_blacklist_providers") == ("a.example", "b.example")
+
+    def test_reads_are_served_from_memory(self, db_session):
+        """Only the first read in a TTL window hits the database."""
+        assert _count_statements(db_session, lambda: settings_cache.get(db_session, "a")) == 1
+        assert _count_statements(db_session, lambda: settings_cache.get(db_session, "b")) == 0
+
+    def test_committed_writes_invalidate(self, db_session):
+        """Inserting or updating a setting is visible on the next read after commit."""
+        assert settings_cache.get(db_session, "warmup_recovery_wait_days", 3) == 3
+
+        setting = Settings(key="warmup_recovery_wait_days", value_json=json.dumps(5))
+        db_session.add(setting)
+        db_session.commit()
+        assert settings_cache.get(db_session, "warmup_recovery_wait_days", 3) == 5
+
+        setting.value_json = json.dumps(7)
+        db_session.commit()
+        assert settings_cache.get(db_session, "warmup_recovery_wait_days", 3) == 7
+
+    def test_rolled_back_writes_keep_the_cache(self, db_session):
+        """A write that is rolled back does not drop the cached settings."""
+        settings_cache.get(db_session, "a")
+        db_session.add(Settings(key="a", value_json=json.dumps(1)))
+        db_session.flush()
+        db_session.rollback()
+
+        assert _count_statements(db_session, lambda: settings_cache.get(db_session, "a")) == 0
+
+    def test_expires_after_ttl(self, db_session, monkeypatch):
+        """Changes made outside this process are picked up once the TTL lapses."""
+        monkeypatch.setattr(settings_cache, "SETTINGS_CACHE_TTL_SECONDS", 0)
+        settings_cache.get(db_session, "a")
+
+        assert _count_statements(db_session, lambda: settings_cache.get(db_session, "a")) == 1
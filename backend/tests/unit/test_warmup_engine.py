@@ -0,0 +1,137 @@
+"""Unit tests for warmup engine helpers."""
+import json
+
+from sqlalchemy import event
+
+from app.db.models.sender_mailbox import SenderMailbox, WarmupStatus
+from app.db.models.settings import Settings
+from app.services.pipelines import warmup_engine
+from app.services.pipelines.warmup_engine import (
+    WARMUP_CONFIG_SCHEMA,
+    build_warmup_schedule,
+    load_warmup_config,
+    make_limit_fn,
+)
+from tests.conftest import TestingSessionLocal
+
+
+def _default_config():
+    return {name: default for name, (_, default) in WARMUP_CONFIG_SCHEMA.items()}
+
+
+class TestLoadWarmupConfig:
+    """Tests for load_warmup_config."""
+
+    def test_defaults_when_nothing_is_stored(self, db_session):
+        """Every config entry falls back to its schema default."""
+        config = load_warmup_config(db_session)
+
+        assert config == {name: default for name, (_, default) in WARMUP_CONFIG_SCHEMA.items()}
+
+    def test_stored_values_override_and_are_cast(self, db_session):
+        """Stored values win over defaults and are cast to the schema type."""
+        db_session.add(Settings(key="warmup_phase_1_days", value_json=json.dumps("10")))
+        db_session.add(Settings(key="warmup_bounce_rate_bad", value_json=json.dumps(4)))
+        db_session.add(Settings(key="warmup_total_days", value_json=""))
+        db_session.commit()
+
+        config = load_warmup_config(db_session)
+
+        assert config["phase_1_days"] == 10
+        assert config["bounce_rate_bad"] == 4.0 and isinstance(config["bounce_rate_bad"], float)
+        assert config["total_days"] == 30
+
+    def test_loads_in_a_single_query(self, db_session):
+        """All warmup settings are read with one statement."""
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            load_warmup_config(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+
+
+class TestMakeLimitFn:
+    """Tests for make_limit_fn."""
+
+    def test_interpolates_within_each_phase(self):
+        """Limits ramp linearly from each phase's minimum to its maximum."""
+        config = _default_config()
+        config.update({
+            "phase_1_days": 3, "phase_1_min_emails": 2, "phase_1_max_emails": 4,
+            "phase_2_days": 2, "phase_2_min_emails": 5, "phase_2_max_emails": 9,
+            "phase_3_days": 1, "phase_3_min_emails": 10, "phase_3_max_emails": 12,
+            "phase_4_days": 3, "phase_4_min_emails": 20, "phase_4_max_emails": 40,
+        })
+        limit_fn = make_limit_fn(config)
+
+        assert [limit_fn(day) for day in range(1, 11)] == [2, 3, 4, 5, 9, 12, 20, 30, 40, 50]
+
+    def test_schedule_uses_same_limits(self):
+        """The schedule's recommended volumes match the limit function."""
+        config = _default_config()
+        limit_fn = make_limit_fn(config)
+
+        schedule = build_warmup_schedule(config)["schedule"]
+
+        assert [entry["recommended_emails"] for entry in schedule] == [limit_fn(entry["day"]) for entry in schedule]
+
+
+class TestAssessMailbox:
+    """Tests for assess_mailbox."""
+
+    def test_skips_health_score_below_scoring_threshold(self, db_session, monkeypatch):
+        """Mailboxes that have not sent enough emails are not scored."""
+        calls = []
+        monkeypatch.setattr(warmup_engine, "calculate_health_score", lambda mb, cfg: calls.append(mb) or {})
+        mailbox = SenderMailbox(
+            email="new@exzelon.com",
+            password="secret",
+            warmup_status=WarmupStatus.WARMING_UP,
+            is_active=True,
+            warmup_days_completed=0,
+            total_emails_sent=0,
+        )
+
+        result = warmup_engine.assess_mailbox(mailbox, _default_config(), db_session)
+
+        assert calls == []
+        assert result["health_score"] == 0.0
+        assert result["action"].startswith("day_1_")
+
+
+class TestRunWarmupAssessment:
+    """Tests for run_warmup_assessment."""
+
+    def test_streams_mailboxes_and_applies_transitions(self, db_session, monkeypatch):
+        """Every connected active mailbox is assessed across several batches."""
+        monkeypatch.setattr(warmup_engine, "SessionLocal", TestingSessionLocal)
+        monkeypatch.setattr(warmup_engine, "ASSESSMENT_BATCH_SIZE", 2)
+        for i in range(5):
+            db_session.add(SenderMailbox(
+                email=f"mb{i}@exzelon.com",
+                password="secret",
+                warmup_status=WarmupStatus.INACTIVE,
+                is_active=True,
+                connection_status="successful",
+            ))
+        db_session.add(SenderMailbox(
+            email="untested@exzelon.com",
+            password="secret",
+            warmup_status=WarmupStatus.INACTIVE,
+            is_active=True,
+            connection_status="untested",
+        ))
+        db_session.commit()
+
+        result = warmup_engine.run_warmup_assessment()
+
+        assert result["assessed"] == 5 and result["status_changes"] == 5
+        db_session.expire_all()
+        statuses = {mb.email: mb.warmup_status for mb in db_session.query(SenderMailbox).all()}
+        assert list(statuses.values()).count(WarmupStatus.WARMING_UP) == 5
+        assert statuses["untested@exzelon.com"] == WarmupStatus.INACTIVE